@@ -0,0 +1,16 @@
+from invoke import task
+
+from . import common, docker
+
+
+@task
+def api(context, service="django", params="", compose="dev"):
+    """Run the benchmark of every API endpoint."""
+    common.success("Benchmarks running")
+    run(context, service, "api", params, compose)
+
+
+@task
+def run(context, service="django", name="api", params="", compose="dev"):
+    """Run one benchmark from server/benchmarks by its module name."""
+    docker.docker_compose_run(context, service, f"python -m benchmarks.{name} {params}", compose)
@@ -0,0 +1,3 @@
+from .batches import BATCH_SIZE
+
+__all__ = (BATCH_SIZE,)
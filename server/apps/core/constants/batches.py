@@ -0,0 +1,2 @@
+# Rows read, written or held in memory at once by bulk database work.
+BATCH_SIZE = 10_000
@@ -0,0 +1,3 @@
+from .streaming_asgi import StreamingASGIHandler
+
+__all__ = (StreamingASGIHandler,)
@@ -0,0 +1,35 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI handler reading streaming responses in the thread of sync views.
+
+    Django 3.2 iterates streaming content inside the event loop, where the
+    database queries of a lazy iterator are not allowed and would block
+    every other request. Here each part is produced by the thread that ran
+    the view, as Django 4.2 does for sync iterators.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((b"Set-Cookie", cookie.output(header="").encode("ascii").strip()))
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while (part := await next_part(parts, None)) is not None:
+            for chunk, _ in self.chunk_bytes(part):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
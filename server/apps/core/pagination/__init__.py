@@ -0,0 +1,3 @@
+from .keyset import KeysetPagination
+
+__all__ = (KeysetPagination,)
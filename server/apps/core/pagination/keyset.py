@@ -0,0 +1,76 @@
+from bisect import bisect_left, bisect_right
+from typing import Optional, Sequence
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination over the primary key.
+
+    Pages are fetched with ``WHERE id > <cursor> ORDER BY id LIMIT n`` and
+    never run ``COUNT(*)`` or ``OFFSET`` scans, so the cost of a page does
+    not depend on the size of the list or on how deep the client scrolled.
+    """
+
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def window_bounds(self, request) -> tuple[Optional[int], bool, int]:
+        """Position, direction and length of the window that holds the page requested by the cursor.
+
+        The window starts after the position, or ends before it when the
+        cursor goes back, so ids can also be read from an index up to the
+        window length.
+        """
+        cursor = self.decode_cursor(request)
+        offset, reverse, position = cursor if cursor is not None else (0, False, None)
+        return (int(position) if position is not None else None), reverse, offset + self.get_page_size(request) + 1
+
+    def window(self, ids: Sequence[int], request) -> list[int]:
+        """Part of ascending ``ids`` that holds the page requested by the cursor.
+
+        Id lists kept in memory are cut to this window before they reach the
+        database, so a page is fetched by primary keys whatever the length
+        of the list.
+        """
+        position, reverse, size = self.window_bounds(request)
+        if reverse:
+            end = bisect_left(ids, position) if position is not None else len(ids)
+            return list(ids[max(end - size, 0):end])
+        start = bisect_right(ids, position) if position is not None else 0
+        return list(ids[start:start + size])
+
+    def paginate_ids(self, ids: Sequence[int], request, view=None) -> list[int]:
+        """Page of ascending ``ids`` with the same cursors as ``paginate_queryset``.
+
+        Lets id lists kept in memory or in the cache be paginated without
+        a query, so the page can be rendered from cached payloads.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, None, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, position = self.cursor if self.cursor is not None else (0, False, None)
+        window = self.window(ids, request)
+        results = (window[::-1] if reverse else window)[offset:offset + self.page_size + 1]
+        self.page = results[:self.page_size]
+        following = str(results[-1]) if len(results) > len(self.page) else None
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = following is not None
+            self.next_position, self.previous_position = position, following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None or offset > 0
+            self.next_position, self.previous_position = following, position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, int):
+            return str(instance)
+        return super()._get_position_from_instance(instance, ordering)
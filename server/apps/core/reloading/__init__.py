@@ -0,0 +1,3 @@
+from .background_reload import BackgroundReload
+
+__all__ = (BackgroundReload,)
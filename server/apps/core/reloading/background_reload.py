@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from django.db import connection
+
+Value = TypeVar("Value")
+Change = TypeVar("Change")
+
+
+class BackgroundReload(Generic[Value, Change]):
+    """Value of this process loaded from the database and reloaded in the background.
+
+    The value is an instance of ``kind`` built by its ``load`` class
+    method. It is loaded on first use and kept current by applying the
+    committed changes of this process with ``apply``. Changes made by other
+    processes are picked up by a reload in a background thread, started
+    when ``get`` finds the value stale, while readers keep the current
+    value. Changes applied during a reload are replayed on the new value
+    unless ``replay`` tells that the loaded value already includes them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: type[Value],
+        apply: Callable[[Value, Change], None],
+        replay: Optional[Callable[[Value, Change], bool]] = None,
+    ):
+        self.name = name
+        self._kind = kind
+        self._apply = apply
+        self._replay = replay
+        self._value: Optional[Value] = None
+        self._checked_at = 0.0
+        self._pending: Optional[list[Change]] = None
+        self._load_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    @property
+    def value(self) -> Optional[Value]:
+        """Current value, ``None`` if it is not loaded."""
+        return self._value
+
+    def get(self, interval: float, is_stale: Optional[Callable[[Value], bool]] = None) -> Value:
+        """Current value, loaded on first use.
+
+        At most every ``interval`` seconds a reload is started in the
+        background if ``is_stale`` finds the value behind the database, or
+        every time without ``is_stale``.
+        """
+        if self._value is None:
+            with self._load_lock:
+                if self._value is None:
+                    self._value = self._kind.load()
+                    self._checked_at = time.monotonic()
+            return self._value
+        if time.monotonic() - self._checked_at > interval and self._load_lock.acquire(blocking=False):
+            try:
+                self._checked_at = time.monotonic()
+                if self._pending is None and (is_stale is None or is_stale(self._value)):
+                    self._start_reload()
+            finally:
+                self._load_lock.release()
+        return self._value
+
+    def update(self, change: Change) -> None:
+        """Apply a committed change to the value, if it is loaded."""
+        with self._update_lock:
+            if self._value is None:
+                return
+            self._apply(self._value, change)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def reset(self) -> None:
+        """Drop the value, it is loaded again on next use."""
+        self._value = None
+
+    def _start_reload(self) -> None:
+        with self._update_lock:
+            self._pending = []
+        threading.Thread(target=self._reload, name=f"{self.name}-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        try:
+            value = self._kind.load()
+            with self._update_lock:
+                for change in self._pending:
+                    if self._replay is None or self._replay(value, change):
+                        self._apply(value, change)
+                self._value = value
+        finally:
+            with self._update_lock:
+                self._pending = None
+            connection.close()
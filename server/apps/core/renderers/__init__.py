@@ -0,0 +1,7 @@
+from .csv import CSVRenderer
+from .ndjson import NDJSONRenderer
+
+__all__ = (
+    CSVRenderer,
+    NDJSONRenderer,
+)
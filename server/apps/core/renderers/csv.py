@@ -0,0 +1,47 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from rest_framework.renderers import BaseRenderer
+
+# Spreadsheets run cells starting with these characters as formulas.
+FORMULA_PREFIXES = frozenset("=+-@\t\r")
+
+
+class CSVRenderer(BaseRenderer):
+    """Rows as CSV with a header line.
+
+    ``stream`` encodes rows lazily, ``chunk_size`` rows per yielded part,
+    for ``StreamingHttpResponse``. ``render`` serves error responses.
+    String cells that a spreadsheet would run as a formula are prefixed
+    with ``'`` and open as text.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(tuple(rows[0]) if rows else (), (row.values() for row in rows)))
+
+    def stream(self, fields: Sequence[str], rows: Iterable[Sequence], chunk_size: int = 1000) -> Iterator[bytes]:
+        rows = iter(rows)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+            writer.writerows(map(escape_row, chunk))
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+def escape_row(row: Sequence) -> Sequence:
+    # Most rows have nothing to escape and are written as they are.
+    for value in row:
+        if isinstance(value, str) and value[:1] in FORMULA_PREFIXES:
+            return [f"'{value}" if isinstance(value, str) and value[:1] in FORMULA_PREFIXES else value for value in row]
+    return row
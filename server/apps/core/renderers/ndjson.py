@@ -0,0 +1,28 @@
+import json
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Rows as JSON objects, one per line.
+
+    ``stream`` encodes rows lazily, ``chunk_size`` rows per yielded part,
+    for ``StreamingHttpResponse``. ``render`` serves error responses.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(tuple(rows[0]) if rows else (), (row.values() for row in rows)))
+
+    def stream(self, fields: Sequence[str], rows: Iterable[Sequence], chunk_size: int = 1000) -> Iterator[bytes]:
+        encode = self._encoder.encode
+        rows = iter(rows)
+        for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+            yield "".join(f"{encode(dict(zip(fields, row)))}\n" for row in chunk).encode()
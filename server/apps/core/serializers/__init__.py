@@ -0,0 +1,7 @@
+from .sparse_fields import get_sparse_fields
+from .values import ValuesSerializer
+
+__all__ = (
+    ValuesSerializer,
+    get_sparse_fields,
+)
@@ -0,0 +1,21 @@
+from typing import Sequence
+
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_sparse_fields(request, available: Sequence[str]) -> tuple[str, ...]:
+    """Fields asked for with ``?fields=a,b``, in the order of ``available``.
+
+    All fields are returned when the parameter is missing or empty.
+    """
+    requested = {name.strip() for name in request.query_params.get(FIELDS_QUERY_PARAM, "").split(",")} - {""}
+    if not requested:
+        return tuple(available)
+    unknown = requested.difference(available)
+    if unknown:
+        raise serializers.ValidationError(
+            {FIELDS_QUERY_PARAM: [f"Неизвестные поля: {', '.join(sorted(unknown))}"]},
+        )
+    return tuple(name for name in available if name in requested)
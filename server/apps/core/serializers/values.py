@@ -0,0 +1,64 @@
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, Optional, Sequence
+
+from django.db import models
+from rest_framework import serializers
+
+# Fields whose representation of a database value is the value itself.
+PLAIN_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """Representation of a model serializer built from ``values()`` rows.
+
+    The mapper is compiled once per serializer class and set of fields:
+    only their columns and the primary key, which keyset pagination
+    orders by, are fetched. Plain fields are copied from the row and the
+    others go through ``to_representation`` of the serializer field, so
+    no model instance or bound field is created per row.
+    """
+
+    def __init__(self, serializer_class: type[serializers.ModelSerializer], fields: Optional[Sequence[str]] = None):
+        readable = {name: field for name, field in serializer_class().fields.items() if not field.write_only}
+        self.fields = tuple(readable) if fields is None else tuple(fields)
+        sources = tuple(readable[name].source for name in self.fields)
+        if any(source == "*" or "." in source for source in sources):
+            raise ValueError(f"{serializer_class.__name__} has fields not backed by columns")
+        self.columns = tuple(dict.fromkeys((serializer_class.Meta.model._meta.pk.attname, *sources)))
+
+        convert = {
+            name: readable[name].to_representation
+            for name in self.fields
+            if not isinstance(readable[name], PLAIN_FIELDS)
+        }
+        if not convert and sources == self.columns:
+            self._map = dict
+        elif not convert:
+            names = self.fields
+            getter = itemgetter(*sources) if len(sources) > 1 else lambda row: (row[sources[0]],)
+            self._map = lambda row: dict(zip(names, getter(row)))
+        else:
+            pairs = tuple(zip(self.fields, sources, (convert.get(name) for name in self.fields)))
+            self._map = lambda row: {
+                name: row[source] if to_representation is None or row[source] is None
+                else to_representation(row[source])
+                for name, source, to_representation in pairs
+            }
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def compile(cls, serializer_class, fields: Optional[tuple[str, ...]] = None) -> "ValuesSerializer":
+        """Shared serializer for the class and fields, built on first use."""
+        return cls(serializer_class, fields)
+
+    def values(self, queryset: models.QuerySet) -> models.QuerySet:
+        return queryset.values(*self.columns)
+
+    def to_representation(self, rows: Iterable[dict]) -> list[dict]:
+        return [self._map(row) for row in rows]
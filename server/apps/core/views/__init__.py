@@ -0,0 +1,3 @@
+from .async_view import async_view
+
+__all__ = (async_view,)
@@ -0,0 +1,52 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def async_view(view: Callable) -> Callable:
+    """Serve a sync view as an async view on a pool of ``ASYNC_VIEW_THREADS`` threads.
+
+    Under ASGI Django runs every sync view in one thread per process, so
+    a request waiting for the database blocks all others. Django 3.2 has
+    no async ORM, so the view still queries the database synchronously,
+    but up to ``ASYNC_VIEW_THREADS`` requests wait in parallel while the
+    event loop keeps accepting new ones. Every thread keeps its own
+    database connection, reused as ``CONN_MAX_AGE`` allows.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(_run, thread_sensitive=False, executor=_get_executor())(
+            view, request, *args, **kwargs
+        )
+
+    return wrapper
+
+
+def _run(view: Callable, request, *args, **kwargs):
+    # Django opens and closes connections around requests only in the
+    # thread that handles them, so the pool threads do it themselves.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.ASYNC_VIEW_THREADS, thread_name_prefix="async-view")
+    return _executor
@@ -0,0 +1,3 @@
+from .outbox_event import OutboxEventAdmin
+
+__all__ = (OutboxEventAdmin,)
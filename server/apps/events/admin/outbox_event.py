@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from apps.events.models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "event_type",
+        "created_at",
+    )
+    list_filter = ("event_type",)
@@ -0,0 +1,12 @@
+from .base import Broker, Subscription, get_broker, reset_broker
+from .in_process import InProcessBroker
+from .redis_pubsub import RedisBroker
+
+__all__ = (
+    Broker,
+    InProcessBroker,
+    RedisBroker,
+    Subscription,
+    get_broker,
+    reset_broker,
+)
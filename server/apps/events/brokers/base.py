@@ -0,0 +1,98 @@
+import abc
+import asyncio
+import threading
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """Events of one user for one open stream.
+
+    Lives in the event loop of the stream. Events published from other
+    threads are handed over to that loop. A stream that falls more than
+    ``EVENTS_QUEUE_SIZE`` events behind is closed, its client reconnects
+    and reloads the lists instead of reading a long backlog.
+    """
+
+    def __init__(self, broker: "Broker", user_id: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.overflowed = False
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def get(self) -> Optional[dict]:
+        """Next event, or ``None`` if the stream has to be closed."""
+        return await self._queue.get()
+
+    def deliver(self, event: dict) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop of a stream that is gone has been closed.
+            self.close()
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def expire(self) -> None:
+        """Close the stream, its client reconnects and reloads the lists.
+
+        Must be called from the event loop of the stream.
+        """
+        if not self.overflowed:
+            self.overflowed = True
+            self._queue.put_nowait(None)
+
+    def _put(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        if self._queue.qsize() >= settings.EVENTS_QUEUE_SIZE:
+            self.expire()
+        else:
+            self._queue.put_nowait(event)
+
+
+class Broker(abc.ABC):
+    """Pub/sub of events addressed to users.
+
+    ``publish`` may be called from any thread, ``subscribe`` only from
+    the event loop that reads the subscription. ``cross_process`` tells
+    whether events published in one process reach the streams of others.
+    """
+
+    cross_process = False
+
+    @abc.abstractmethod
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        ...
+
+    @abc.abstractmethod
+    def subscribe(self, user_id: int) -> Subscription:
+        ...
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        ...
+
+
+_broker: Optional[Broker] = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Broker:
+    """Broker of this process, an instance of ``EVENTS_BROKER``."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+def reset_broker() -> None:
+    """Drop the broker of this process, it is created again on next use."""
+    global _broker
+    _broker = None
@@ -0,0 +1,46 @@
+import threading
+from collections import defaultdict
+from typing import Iterable
+
+from apps.events.brokers.base import Broker, Subscription
+
+
+class InProcessBroker(Broker):
+    """Delivers events to the streams opened in this process only.
+
+    Enough for a single ASGI process and for tests. Events published by
+    other processes never reach these streams.
+    """
+
+    def __init__(self):
+        self._subscriptions: defaultdict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        with self._lock:
+            subscriptions = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def __len__(self) -> int:
+        """Number of open subscriptions."""
+        with self._lock:
+            return sum(map(len, self._subscriptions.values()))
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import logging
+from typing import Iterable
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+from apps.events.brokers.base import Subscription
+from apps.events.brokers.in_process import InProcessBroker
+
+CHANNEL = "events"
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class RedisBroker(InProcessBroker):
+    """Delivers events to the streams of every process through Redis pub/sub.
+
+    Events are published to one Redis channel. Every event loop with open
+    streams keeps one listener on that channel and hands the events over
+    to its local subscriptions, so the number of Redis connections does
+    not grow with the number of streams. A listener that loses Redis
+    reconnects with a growing delay. Events published meanwhile are lost,
+    so once it is back it expires the streams of its loop and their
+    clients reload the lists.
+    """
+
+    cross_process = True
+
+    def __init__(self, url: str = ""):
+        super().__init__()
+        self._url = url or settings.REDIS_URL
+        self._client = redis.Redis.from_url(self._url)
+        self._listeners: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        self._client.publish(CHANNEL, json.dumps({"user_ids": list(user_ids), "event": event}))
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = super().subscribe(user_id)
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None or listener.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+        return subscription
+
+    async def _listen(self) -> None:
+        delay, lost = RECONNECT_DELAY, False
+        while True:
+            try:
+                async with redis.asyncio.Redis.from_url(self._url) as client, client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    if lost:
+                        self._expire(asyncio.get_running_loop())
+                    delay, lost = RECONNECT_DELAY, False
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            data = json.loads(message["data"])
+                            super().publish(data["user_ids"], data["event"])
+            except (redis.ConnectionError, redis.TimeoutError):
+                logger.exception("Lost the events channel, reconnecting in %.1f s", delay)
+            else:
+                logger.warning("The events channel closed, reconnecting in %.1f s", delay)
+            lost = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            subscriptions = [
+                subscription
+                for subscriptions in self._subscriptions.values()
+                for subscription in subscriptions
+                if subscription.loop is loop
+            ]
+        for subscription in subscriptions:
+            subscription.expire()
@@ -0,0 +1,3 @@
+from .event_types import EventTypes
+
+__all__ = (EventTypes,)
@@ -0,0 +1,9 @@
+class EventTypes:
+    INVITE_CREATED: str = "invite.created"
+    INVITE_ACCEPTED: str = "invite.accepted"
+    INVITE_DECLINED: str = "invite.declined"
+    INVITE_AUTO_ACCEPTED: str = "invite.auto_accepted"
+    FRIENDS_ADDED: str = "friends.added"
+    FRIENDS_REMOVED: str = "friends.removed"
+    # Consumed by the relay, not sent to streams.
+    SUGGESTIONS_STALE: str = "suggestions.stale"
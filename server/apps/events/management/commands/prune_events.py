@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.events.services import prune_events
+
+
+class Command(BaseCommand):
+    help = "Delete outbox events that were not relayed within the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-age", type=int, default=settings.EVENTS_RETENTION, help="Retention, seconds.")
+        parser.add_argument("--batch-size", type=int, default=settings.EVENTS_RELAY_BATCH_SIZE)
+
+    def handle(self, *args, max_age, batch_size, **options):
+        pruned = prune_events(max_age, batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} events"))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.events.brokers import get_broker
+from apps.events.services import prune_events, relay_events
+
+# How often, in seconds, relay_events --follow prunes stale events.
+PRUNE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Deliver outbox events to their consumers in batches, at least once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.EVENTS_RELAY_BATCH_SIZE)
+        parser.add_argument("--follow", action="store_true", help="Keep polling the outbox for new events.")
+        parser.add_argument(
+            "--in-process",
+            action="store_true",
+            help="Allow a broker that reaches only the streams of this process, which serves none.",
+        )
+
+    def handle(self, *args, batch_size, follow, in_process, **options):
+        if not get_broker().cross_process and not in_process:
+            raise CommandError(
+                f"{settings.EVENTS_BROKER} would drop the events of the streams, they are served by other "
+                "processes. Set EVENTS_BROKER=apps.events.brokers.RedisBroker or pass --in-process."
+            )
+        relayed = 0
+        pruned_at = 0.0
+        while True:
+            delivered = relay_events(batch_size)
+            relayed += delivered
+            if delivered < batch_size:
+                if not follow:
+                    break
+                if time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                    prune_events(settings.EVENTS_RETENTION, batch_size)
+                    pruned_at = time.monotonic()
+                time.sleep(settings.EVENTS_RELAY_INTERVAL)
+        self.stdout.write(self.style.SUCCESS(f"Relayed {relayed} events"))
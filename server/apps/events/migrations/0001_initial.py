@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=32, verbose_name='Тип события')),
+                ('payload', models.JSONField(verbose_name='Данные события')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Время создания')),
+            ],
+            options={
+                'verbose_name': 'Исходящее событие',
+                'verbose_name_plural': 'Исходящие события',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """Domain event written in the same transaction as the change it describes.
+
+    An event exists if and only if its change is committed. The
+    ``relay_events`` command delivers events to consumers and deletes
+    them, so the table only holds the events that are not delivered yet.
+    """
+
+    # Rows are short-lived but their ids are never reused.
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(
+        max_length=32,
+        verbose_name="Тип события",
+    )
+    payload = models.JSONField(
+        verbose_name="Данные события",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Время создания",
+    )
+
+    class Meta:
+        verbose_name = "Исходящее событие"
+        verbose_name_plural = "Исходящие события"
+
+    def __str__(self) -> str:
+        return f"{self.id}, {self.event_type}"
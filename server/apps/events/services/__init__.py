@@ -0,0 +1,8 @@
+from .outbox import prune_events, record_event, record_events, relay_events
+
+__all__ = (
+    prune_events,
+    record_event,
+    record_events,
+    relay_events,
+)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from typing import Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.events.models import OutboxEvent
+from apps.events.signals import events_relayed
+
+
+def record_event(event_type: str, **payload) -> None:
+    """Write an event to the outbox in the current transaction."""
+    OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def record_events(event_type: str, payloads: Iterable[dict]) -> None:
+    """Write events of one type to the outbox in one query."""
+    OutboxEvent.objects.bulk_create(OutboxEvent(event_type=event_type, payload=payload) for payload in payloads)
+
+
+def relay_events(batch_size: int) -> int:
+    """Deliver up to ``batch_size`` oldest events and delete them from the outbox.
+
+    Receivers of ``events_relayed`` get the whole batch inside the
+    transaction that deletes it. If one of them fails or the transaction
+    does not commit, the batch stays in the outbox and is delivered again,
+    so receivers must tolerate repeated events. Rows locked by another
+    relay are skipped, several relays may drain the outbox in parallel.
+    Return the number of delivered events.
+    """
+    with transaction.atomic():
+        events = list(OutboxEvent.objects.select_for_update(skip_locked=True).order_by("id")[:batch_size])
+        if events:
+            events_relayed.send(sender=OutboxEvent, events=events)
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+    return len(events)
+
+
+def prune_events(max_age: int, batch_size: int) -> int:
+    """Delete events older than ``max_age`` seconds that were never relayed.
+
+    Keeps the outbox bounded when the relay is down or a receiver keeps
+    failing. Deletes in batches of ``batch_size`` oldest events, rows
+    locked by a relay are skipped. Return the number of deleted events.
+    """
+    created_before = timezone.now() - timedelta(seconds=max_age)
+    pruned = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(created_at__lt=created_before)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            OutboxEvent.objects.filter(id__in=ids).delete()
+        pruned += len(ids)
+        if len(ids) < batch_size:
+            return pruned
@@ -0,0 +1,7 @@
+from .outbox import events_relayed
+from .streams import publish_to_streams
+
+__all__ = (
+    events_relayed,
+    publish_to_streams,
+)
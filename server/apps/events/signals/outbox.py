@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by the relay with ``events``, a batch of outbox events in id order,
+# before the batch is deleted from the outbox.
+events_relayed = Signal()
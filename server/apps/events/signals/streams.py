@@ -0,0 +1,23 @@
+from django.dispatch import receiver
+
+from apps.events.brokers import get_broker
+from apps.events.constants import EventTypes
+from apps.events.models import OutboxEvent
+from apps.events.signals.outbox import events_relayed
+
+
+@receiver(events_relayed)
+def publish_to_streams(events: list[OutboxEvent], **kwargs) -> None:
+    broker = get_broker()
+    for event in events:
+        if event.event_type == EventTypes.SUGGESTIONS_STALE:
+            continue
+        payload = dict(event.payload)
+        if "friends" in payload:
+            # Both sides of every friendship hear about it.
+            user_id = payload.pop("user")
+            broker.publish((user_id,), {"type": event.event_type, **payload})
+            for friend_id in payload["friends"]:
+                broker.publish((friend_id,), {"type": event.event_type, "friends": [user_id]})
+        else:
+            broker.publish((payload["owner"], payload["target"]), {"type": event.event_type, **payload})
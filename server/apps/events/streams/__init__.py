@@ -0,0 +1,7 @@
+from .event_stream import EventStream, authenticate, format_event
+
+__all__ = (
+    EventStream,
+    authenticate,
+    format_event,
+)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from typing import Optional
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.events.brokers import get_broker
+from apps.users.authentication import get_token_user
+
+EVENTS_PATH = "/api/events/"
+HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    # Keeps nginx from buffering the stream.
+    (b"x-accel-buffering", b"no"),
+]
+KEEPALIVE = b": keepalive\n\n"
+
+
+class EventStream:
+    """ASGI app streaming events of the current user as server-sent events.
+
+    Requests to other paths are passed on to ``app``. The access token is
+    taken from the ``Authorization`` header or, for ``EventSource`` that
+    cannot send headers, from the ``token`` query parameter. The user is
+    checked once when the stream opens, as by ``CachedJWTAuthentication``,
+    through the principal cache. An idle stream holds no database
+    connection.
+    """
+
+    def __init__(self, app, path: str = EVENTS_PATH):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+        elif scope["method"] != "GET":
+            await _respond(send, 405, "Метод не разрешен")
+        elif (user_id := await sync_to_async(authenticate)(scope)) is None:
+            await _respond(send, 401, "Учетные данные не были предоставлены или неверны")
+        else:
+            await self.stream(user_id, receive, send)
+
+    async def stream(self, user_id: int, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": HEADERS})
+        await send({"type": "http.response.body", "body": KEEPALIVE, "more_body": True})
+        subscription = get_broker().subscribe(user_id)
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(subscription.get())
+                await asyncio.wait(
+                    (next_event, disconnected),
+                    timeout=settings.EVENTS_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not next_event.done():
+                    next_event.cancel()
+                    body = KEEPALIVE
+                elif (event := next_event.result()) is not None:
+                    body = format_event(event)
+                else:
+                    break
+                if not disconnected.done():
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+        finally:
+            subscription.close()
+            if not disconnected.done():
+                disconnected.cancel()
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def authenticate(scope) -> Optional[int]:
+    """Id of the user from the access token of the request, if it is valid and not revoked."""
+    headers = dict(scope["headers"])
+    token = parse_qs(scope["query_string"].decode()).get("token", [None])[0]
+    if b"authorization" in headers:
+        parts = headers[b"authorization"].decode().split()
+        if len(parts) == 2 and parts[0] in api_settings.AUTH_HEADER_TYPES:
+            token = parts[1]
+    if token is None:
+        return None
+    try:
+        return get_token_user(AccessToken(token)).id
+    except (TokenError, AuthenticationFailed):
+        return None
+    finally:
+        # Like at the end of a request, so open streams keep no connection past CONN_MAX_AGE.
+        close_old_connections()
+
+
+def format_event(event: dict) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode()
+
+
+async def _wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _respond(send, status: int, message: str) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps({"detail": message}, ensure_ascii=False).encode()})
@@ -0,0 +1,380 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import timedelta
+
+import pytest
+import redis
+import redis.asyncio
+from django.core.management import CommandError, call_command
+from django.urls import reverse_lazy
+from django.utils import timezone
+from rest_framework import status
+
+from apps.events.brokers import Broker, RedisBroker, get_broker, redis_pubsub, reset_broker
+from apps.events.constants import EventTypes
+from apps.events.models import OutboxEvent
+from apps.events.services import prune_events, record_events, relay_events
+from apps.events.signals import events_relayed
+from apps.events.streams import EventStream
+from apps.friends.factories import InviteFactory
+from apps.users.authentication import get_access_token
+from apps.users.factories import UserFactory
+
+EVENT = {"type": EventTypes.INVITE_CREATED, "invite": 1, "owner": 1, "target": 2}
+
+
+@pytest.fixture
+def broker(settings):
+    settings.EVENTS_BROKER = "apps.events.brokers.InProcessBroker"
+    reset_broker()
+    yield get_broker()
+    reset_broker()
+
+
+def test_broker_is_abstract() -> None:
+    """Тест на то, что брокер без методов публикации и подписки не создается."""
+    class PublishOnly(Broker):
+        def publish(self, user_ids, event):
+            pass
+
+    with pytest.raises(TypeError):
+        Broker()
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+
+def test_in_process_broker(broker) -> None:
+    """Тест на доставку событий подписчикам из другого потока."""
+    async def main():
+        subscription, other = broker.subscribe(1), broker.subscribe(2)
+        thread = threading.Thread(target=broker.publish, args=([1, 3], EVENT))
+        thread.start()
+        thread.join()
+        assert await asyncio.wait_for(subscription.get(), 1) == EVENT
+        assert other._queue.empty()
+        subscription.close()
+        assert len(broker) == 1
+        other.close()
+        assert len(broker) == 0
+
+    asyncio.run(main())
+
+
+def test_subscription_overflow(broker, settings) -> None:
+    """Тест на закрытие подписки, которая отстала от событий."""
+    settings.EVENTS_QUEUE_SIZE = 2
+
+    async def main():
+        subscription = broker.subscribe(1)
+        for _ in range(settings.EVENTS_QUEUE_SIZE + 2):
+            broker.publish([1], EVENT)
+        await asyncio.sleep(0)
+        assert [await subscription.get() for _ in range(3)] == [EVENT, EVENT, None]
+
+    asyncio.run(main())
+
+
+class FakeRedis:
+    """Redis of one process for ``RedisBroker``, its connection can be dropped.
+
+    ``failures`` next connections fail, ``drop`` breaks the open one.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.failures = 0
+        self._messages = asyncio.Queue()
+
+    def from_url(self, url):
+        return self
+
+    def publish(self, channel, data):
+        self._messages.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    def drop(self):
+        self._messages.put_nowait(None)
+
+    def pubsub(self):
+        return self
+
+    async def subscribe(self, channel):
+        if self.failures:
+            self.failures -= 1
+            raise redis.ConnectionError("Error connecting to fake redis")
+        self.connections += 1
+
+    async def listen(self):
+        yield {"type": "subscribe", "channel": redis_pubsub.CHANNEL, "data": 1}
+        while (message := await self._messages.get()) is not None:
+            yield message
+        raise redis.ConnectionError("Connection closed by server.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", fake.from_url)
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", fake.from_url)
+    return fake
+
+
+async def wait_for_connections(fake, count):
+    while fake.connections < count:
+        await asyncio.sleep(0.001)
+
+
+def test_redis_broker(fake_redis) -> None:
+    """Тест на доставку событий через канал Redis."""
+    async def main():
+        broker = RedisBroker("redis://fake")
+        subscription, other = broker.subscribe(1), broker.subscribe(2)
+        await asyncio.wait_for(wait_for_connections(fake_redis, 1), 1)
+        broker.publish([1, 3], EVENT)
+        assert await asyncio.wait_for(subscription.get(), 1) == EVENT
+        assert other._queue.empty()
+        assert fake_redis.connections == 1
+
+    asyncio.run(main())
+
+
+def test_redis_broker_reconnect(fake_redis, monkeypatch, caplog) -> None:
+    """Тест на переподключение к Redis с растущей задержкой после обрыва связи."""
+    monkeypatch.setattr(redis_pubsub, "RECONNECT_DELAY", 0.01)
+    monkeypatch.setattr(redis_pubsub, "MAX_RECONNECT_DELAY", 0.02)
+
+    async def main():
+        broker = RedisBroker("redis://fake")
+        subscription = broker.subscribe(1)
+        await asyncio.wait_for(wait_for_connections(fake_redis, 1), 1)
+        fake_redis.failures = 2
+        fake_redis.drop()
+        await asyncio.wait_for(wait_for_connections(fake_redis, 2), 1)
+        # Events published while disconnected are lost, so the stream is closed.
+        assert await asyncio.wait_for(subscription.get(), 1) is None
+        assert len(broker) == 1
+
+        subscription.close()
+        subscription = broker.subscribe(1)
+        broker.publish([1], EVENT)
+        assert await asyncio.wait_for(subscription.get(), 1) == EVENT
+
+    with caplog.at_level(logging.WARNING, logger=redis_pubsub.__name__):
+        asyncio.run(main())
+    assert [record.args for record in caplog.records] == [(0.01,), (0.02,), (0.02,)]
+    assert all(record.exc_info for record in caplog.records)
+
+
+async def call(app, path="/api/events/", method="GET", headers=(), query_string=b"", events=(), delivered=0):
+    """Run the ASGI app until it responds.
+
+    ``events`` are published once a stream is open, then the stream is
+    read until ``delivered`` of them have been sent.
+    """
+    scope = {
+        "type": "http",
+        "path": path,
+        "method": method,
+        "headers": list(headers),
+        "query_string": query_string,
+    }
+    received = asyncio.Queue()
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    task = asyncio.ensure_future(app(scope, received.get, send))
+    if events:
+        while not len(get_broker()):
+            await asyncio.sleep(0.01)
+        for user_id, event in events:
+            get_broker().publish([user_id], event)
+        while len(sent) < 2 + delivered:
+            await asyncio.sleep(0.01)
+    await received.put({"type": "http.disconnect"})
+    await asyncio.wait_for(task, 1)
+    return sent
+
+
+@pytest.fixture
+def app():
+    async def fallback(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+
+    return EventStream(fallback)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_event_stream(broker, settings, app) -> None:
+    """Тест на поток событий текущего пользователя."""
+    settings.EVENTS_KEEPALIVE = 60
+    user, other = UserFactory.create_batch(size=2)
+    token = get_access_token(user)
+
+    async def main():
+        sent = await call(
+            app,
+            query_string=f"token={token}".encode(),
+            events=[(other.id, EVENT), (user.id, EVENT)],
+            delivered=1,
+        )
+        assert sent[0]["status"] == status.HTTP_200_OK
+        assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+        assert sent[1]["body"] == b": keepalive\n\n"
+        assert sent[2]["body"].decode() == f"event: {EVENT['type']}\ndata: {json.dumps(EVENT)}\n\n"
+        assert len(sent) == 3
+        assert len(broker) == 0
+
+        sent = await call(
+            app,
+            headers=[(b"authorization", f"JWT {token}".encode())],
+            events=[(user.id, EVENT)],
+            delivered=1,
+        )
+        assert sent[2]["body"].startswith(b"event: invite.created\n")
+
+        sent = await call(app)
+        assert sent[0]["status"] == status.HTTP_401_UNAUTHORIZED
+        sent = await call(app, query_string=b"token=wrong")
+        assert sent[0]["status"] == status.HTTP_401_UNAUTHORIZED
+        sent = await call(app, method="POST")
+        assert sent[0]["status"] == status.HTTP_405_METHOD_NOT_ALLOWED
+        sent = await call(app, path="/api/users/")
+        assert sent[0]["status"] == status.HTTP_204_NO_CONTENT
+
+    asyncio.run(main())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_event_stream_revoked_token(broker, app) -> None:
+    """Тест на отказ в потоке событий по токену до смены пароля."""
+    user = UserFactory.create()
+    token = get_access_token(user)
+    user.set_password("new-password")
+    user.save()
+
+    sent = asyncio.run(call(app, query_string=f"token={token}".encode()))
+    assert sent[0]["status"] == status.HTTP_401_UNAUTHORIZED
+    assert len(broker) == 0
+
+    user.is_active = False
+    user.save()
+    sent = asyncio.run(call(app, query_string=f"token={get_access_token(user)}".encode()))
+    assert sent[0]["status"] == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_invite_and_friendship_events(broker, api_client) -> None:
+    """Тест на события о заявках и дружбе."""
+    user1, user2, user3 = UserFactory.create_batch(size=3)
+    loop = asyncio.new_event_loop()
+
+    async def subscribe(user_id):
+        return broker.subscribe(user_id)
+
+    async def drain(subscription):
+        await asyncio.sleep(0)
+        events = []
+        while not subscription._queue.empty():
+            events.append(await subscription.get())
+        return events
+
+    subscriptions = {user.id: loop.run_until_complete(subscribe(user.id)) for user in (user1, user2, user3)}
+    api_client.force_authenticate(user=user1)
+    invite = api_client.post(reverse_lazy("api:invites-list"), data={"target": user2.id}).data
+    api_client.post(reverse_lazy("api:invites-list"), data={"target": user3.id})
+    api_client.force_authenticate(user=user2)
+    response = api_client.patch(
+        reverse_lazy("api:invites-accept", kwargs={"pk": invite["id"]}),
+        data={"is_accept": True},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    api_client.force_authenticate(user=user3)
+    api_client.post(reverse_lazy("api:invites-list"), data={"target": user1.id})
+    response = api_client.delete(reverse_lazy("api:users-delete-friend", kwargs={"pk": user1.id}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert OutboxEvent.objects.count() == 7
+    assert not any(loop.run_until_complete(drain(subscription)) for subscription in subscriptions.values())
+
+    with pytest.raises(CommandError):
+        call_command("relay_events", batch_size=2)
+    call_command("relay_events", batch_size=2, in_process=True)
+    assert not OutboxEvent.objects.exists()
+    events = {user_id: loop.run_until_complete(drain(subscription)) for user_id, subscription in subscriptions.items()}
+    loop.close()
+    assert [event["type"] for event in events[user2.id]] == [
+        EventTypes.INVITE_CREATED,
+        EventTypes.INVITE_ACCEPTED,
+        EventTypes.FRIENDS_ADDED,
+    ]
+    assert events[user2.id][0] == {
+        "type": EventTypes.INVITE_CREATED,
+        "invite": invite["id"],
+        "owner": user1.id,
+        "target": user2.id,
+    }
+    assert events[user2.id][2]["friends"] == [user1.id]
+    assert [event["type"] for event in events[user3.id]] == [
+        EventTypes.INVITE_CREATED,
+        EventTypes.INVITE_AUTO_ACCEPTED,
+        EventTypes.FRIENDS_ADDED,
+        EventTypes.FRIENDS_REMOVED,
+    ]
+    assert [event["type"] for event in events[user1.id]] == [
+        EventTypes.INVITE_CREATED,
+        EventTypes.INVITE_CREATED,
+        EventTypes.INVITE_ACCEPTED,
+        EventTypes.FRIENDS_ADDED,
+        EventTypes.INVITE_AUTO_ACCEPTED,
+        EventTypes.FRIENDS_ADDED,
+        EventTypes.FRIENDS_REMOVED,
+    ]
+
+
+@pytest.mark.django_db
+def test_relay_at_least_once(broker) -> None:
+    """Тест на повторную доставку событий после сбоя получателя."""
+    user1, user2 = UserFactory.create_batch(size=2)
+    invite = InviteFactory(owner=user1, target=user2)
+    delivered = []
+
+    def fail(events, **kwargs):
+        delivered.extend(event.id for event in events)
+        raise RuntimeError
+
+    events_relayed.connect(fail)
+    try:
+        with pytest.raises(RuntimeError):
+            relay_events(batch_size=10)
+    finally:
+        events_relayed.disconnect(fail)
+    event = OutboxEvent.objects.get()
+    assert delivered == [event.id]
+    assert event.event_type == EventTypes.INVITE_CREATED
+    assert event.payload == {"invite": invite.id, "owner": user1.id, "target": user2.id}
+
+    assert relay_events(batch_size=10) == 1
+    assert relay_events(batch_size=10) == 0
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_prune_events() -> None:
+    """Тест на удаление событий, которые не были доставлены за время хранения."""
+    record_events(EventTypes.INVITE_CREATED, [EVENT] * 4)
+    stale, fresh = OutboxEvent.objects.order_by("id")[:3], OutboxEvent.objects.order_by("-id")[0]
+    OutboxEvent.objects.filter(id__in=[event.id for event in stale]).update(
+        created_at=timezone.now() - timedelta(hours=2),
+    )
+    assert prune_events(max_age=3600, batch_size=2) == 3
+    assert list(OutboxEvent.objects.values_list("id", flat=True)) == [fresh.id]
+    call_command("prune_events", max_age=0)
+    assert not OutboxEvent.objects.exists()
@@ -0,0 +1,8 @@
+from .limits import MAX_BULK_ACCEPT_INVITES, MAX_BULK_INVITE_TARGETS
+from .messages import InviteMessages
+
+__all__ = (
+    InviteMessages,
+    MAX_BULK_ACCEPT_INVITES,
+    MAX_BULK_INVITE_TARGETS,
+)
@@ -0,0 +1,2 @@
+MAX_BULK_INVITE_TARGETS = 500
+MAX_BULK_ACCEPT_INVITES = 500
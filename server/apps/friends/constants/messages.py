@@ -0,0 +1,8 @@
+class InviteMessages:
+    SELF_INVITE: str = "Нельзя отправить заявку самому себе"
+    FRIEND_INVITE: str = "Нельзя отправить заявку пользователю, который уже является вашим другом"
+    DUPLICATE_INVITE: str = "Заявка этому пользователю уже отправлена"
+    UNKNOWN_TARGET: str = "Пользователь не найден"
+    ANSWERED: str = "Статус заявки изменен"
+    ALREADY_ANSWERED: str = "На данную заявку уже дали ответ"
+    UNKNOWN_INVITE: str = "Заявка не найдена"
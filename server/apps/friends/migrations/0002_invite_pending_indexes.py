@@ -0,0 +1,65 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def delete_duplicate_pending_invites(apps, schema_editor):
+    Invite = apps.get_model("friends", "Invite")
+    User = apps.get_model("users", "User")
+    duplicates = list(
+        Invite.objects.filter(is_accept=None)
+        .values("owner", "target")
+        .annotate(first_id=Min("id"), count=Count("id"))
+        .filter(count__gt=1),
+    )
+    affected = set()
+    for duplicate in duplicates:
+        Invite.objects.filter(
+            owner=duplicate["owner"],
+            target=duplicate["target"],
+            is_accept=None,
+        ).exclude(id=duplicate["first_id"]).delete()
+        affected.update((duplicate["owner"], duplicate["target"]))
+    if not affected:
+        return
+    pending = Invite.objects.filter(is_accept=None).order_by()
+    User.objects.filter(id__in=affected).update(
+        incoming_invites_count=Coalesce(
+            Subquery(
+                pending.filter(target=OuterRef("pk")).values("target").annotate(count=Count("*")).values("count"),
+            ),
+            0,
+        ),
+        outgoing_invites_count=Coalesce(
+            Subquery(
+                pending.filter(owner=OuterRef("pk")).values("owner").annotate(count=Count("*")).values("count"),
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0001_initial'),
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(condition=models.Q(('is_accept__isnull', True)), fields=['target', 'id'], name='friends_invite_pending_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(condition=models.Q(('is_accept__isnull', True)), fields=['owner', 'id'], name='friends_invite_pending_out_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_pending_invites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='invite',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_accept__isnull', True)), fields=('owner', 'target'), name='friends_invite_unique_pending'),
+        ),
+    ]
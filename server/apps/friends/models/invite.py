@@ -24,6 +24,25 @@ class Invite(models.Model):
     class Meta:
         verbose_name = "Заявка в друзья"
         verbose_name_plural = "Заявки в друзья"
+        indexes = (
+            models.Index(
+                fields=("target", "id"),
+                condition=models.Q(is_accept__isnull=True),
+                name="friends_invite_pending_in_idx",
+            ),
+            models.Index(
+                fields=("owner", "id"),
+                condition=models.Q(is_accept__isnull=True),
+                name="friends_invite_pending_out_idx",
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=("owner", "target"),
+                condition=models.Q(is_accept__isnull=True),
+                name="friends_invite_unique_pending",
+            ),
+        )
 
     def __str__(self) -> str:
-        return f"{self.target.id}, {self.is_accept} {self.owner.id}"
+        return f"{self.target_id}, {self.is_accept} {self.owner_id}"
@@ -1,3 +1,3 @@
-from .invite import InviteAcceptSerializer, InviteSerializer
+from .invite import InviteAcceptSerializer, InviteBulkAcceptSerializer, InviteBulkCreateSerializer, InviteSerializer
 
-__all__ = (InviteSerializer, InviteAcceptSerializer)
+__all__ = (InviteSerializer, InviteAcceptSerializer, InviteBulkAcceptSerializer, InviteBulkCreateSerializer)
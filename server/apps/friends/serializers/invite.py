@@ -1,8 +1,10 @@
 from rest_framework import serializers
 
+from apps.friends.constants import MAX_BULK_ACCEPT_INVITES, MAX_BULK_INVITE_TARGETS, InviteMessages
 from apps.friends.models import Invite
 from apps.users.models import User
 from apps.users.serializers import UserSerializer
+from apps.users.services import annotate_friend_status, is_friend
 
 
 class InviteAcceptSerializer(serializers.Serializer):
@@ -16,9 +18,18 @@ class InviteAcceptSerializer(serializers.Serializer):
         return is_accept
 
 
+class InviteTargetField(serializers.PrimaryKeyRelatedField):
+
+    def get_queryset(self):
+        # Friendship is checked in the database: the friend graph of this
+        # process may lag behind changes made by other processes.
+        return annotate_friend_status(User.objects.all(), self.context["request"].user, use_graph=False)
+
+
 class InviteSerializer(serializers.ModelSerializer):
-    target = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    target = InviteTargetField()
     is_accept = serializers.BooleanField(allow_null=True, default=None)
+    owner = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Invite
@@ -26,6 +37,7 @@ class InviteSerializer(serializers.ModelSerializer):
             "id",
             "target",
             "is_accept",
+            "owner",
         )
 
     def validate_is_accept(self, is_accept):
@@ -37,17 +49,46 @@ class InviteSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         if attrs["target"] == self.context["request"].user:
-            raise serializers.ValidationError(
-                "Нельзя отправить заявку самому себе",
-            )
-        if self.context["request"].user.friends.filter(id=attrs["target"].id).exists():
-            raise serializers.ValidationError(
-                "Нельзя отправить заявку пользователю, который уже является вашим другом",
-            )
+            raise serializers.ValidationError(InviteMessages.SELF_INVITE)
+        if is_friend(self.context["request"].user, attrs["target"]):
+            raise serializers.ValidationError(InviteMessages.FRIEND_INVITE)
+        if attrs["target"].has_outgoing_invite:
+            raise serializers.ValidationError(InviteMessages.DUPLICATE_INVITE)
         return attrs
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
+        users = self.context.get("users")
+        if users is not None:
+            # Payloads fetched in bulk by the view, usually from the cache.
+            data['target'] = users[instance.target_id]
+            data['owner'] = users[instance.owner_id]
+            return data
         data['target'] = UserSerializer(instance.target).data
         data['owner'] = UserSerializer(instance.owner).data
         return data
+
+
+class InviteBulkCreateSerializer(serializers.Serializer):
+    targets = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BULK_INVITE_TARGETS,
+    )
+
+
+class InviteBulkAcceptSerializer(InviteAcceptSerializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BULK_ACCEPT_INVITES,
+        required=False,
+    )
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs["all"] == ("ids" in attrs):
+            raise serializers.ValidationError(
+                "Нужно передать либо список заявок, либо all",
+            )
+        return attrs
@@ -0,0 +1,8 @@
+from .invite import accept_invite, accept_invites, create_invites, resolve_created_invite
+
+__all__ = (
+    accept_invite,
+    accept_invites,
+    create_invites,
+    resolve_created_invite,
+)
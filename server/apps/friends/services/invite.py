@@ -0,0 +1,186 @@
+from typing import Collection, Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from apps.events.constants import EventTypes
+from apps.events.services import record_event, record_events
+from apps.friends.constants import MAX_BULK_ACCEPT_INVITES, InviteMessages
+from apps.friends.models import Invite
+from apps.users.models import Friendship, User
+from apps.users.services import (
+    add_friends,
+    annotate_friend_status,
+    bulk_add_friends,
+    change_pending_invites_counters,
+    lock_users,
+    shift_counters,
+)
+
+
+def accept_invite(invite: Invite, is_accept: bool) -> bool:
+    """Answer a pending invite and make the users friends if it is accepted.
+
+    Return ``False`` if the invite has already been answered, possibly by a
+    concurrent request.
+    """
+    with transaction.atomic(savepoint=False):
+        lock_users(invite.owner_id, invite.target_id)
+        if not Invite.objects.filter(id=invite.id, is_accept=None).update(is_accept=is_accept):
+            return False
+        invite.is_accept = is_accept
+        change_pending_invites_counters(invite.owner_id, invite.target_id, -1)
+        _record(EventTypes.INVITE_ACCEPTED if is_accept else EventTypes.INVITE_DECLINED, invite)
+        if is_accept:
+            add_friends(invite.owner, invite.target)
+    return True
+
+
+def accept_invites(
+    user: User,
+    is_accept: bool,
+    invite_ids: Optional[Collection[int]] = None,
+    limit: int = MAX_BULK_ACCEPT_INVITES,
+) -> tuple[dict[int, str], bool]:
+    """Answer many incoming invites of the user in a fixed number of queries.
+
+    Answer up to ``limit`` oldest pending incoming invites if
+    ``invite_ids`` is ``None``. Return the result of every answered or
+    requested invite by its id, and whether pending invites beyond the
+    limit were left unanswered.
+    """
+    invites = Invite.objects.filter(target=user)
+    has_more = False
+    if invite_ids is not None:
+        invites = invites.filter(id__in=invite_ids)
+    with transaction.atomic(savepoint=False):
+        if invite_ids is None:
+            # One invite over the limit tells whether others remain.
+            oldest = list(invites.filter(is_accept=None).order_by("id").values_list("id", "owner")[:limit + 1])
+            has_more = len(oldest) > limit
+            invites = invites.filter(id__in=[invite_id for invite_id, _ in oldest[:limit]])
+            owner_ids = {owner_id for _, owner_id in oldest[:limit]}
+        else:
+            owner_ids = set(invites.filter(is_accept=None).values_list("owner", flat=True))
+        lock_users(user.id, *owner_ids)
+        # Invites of owners that were not locked above appeared concurrently
+        # and are left for the next request.
+        pending = dict(invites.filter(is_accept=None, owner__in=owner_ids).values_list("id", "owner"))
+        Invite.objects.filter(id__in=pending).update(is_accept=is_accept)
+        answered_owner_ids = list(pending.values())
+        shift_counters(answered_owner_ids, outgoing_invites_count=-1)
+        shift_counters((user.id,), incoming_invites_count=-len(answered_owner_ids))
+        record_events(
+            EventTypes.INVITE_ACCEPTED if is_accept else EventTypes.INVITE_DECLINED,
+            (
+                _payload(Invite(id=invite_id, owner_id=owner_id, target_id=user.id))
+                for invite_id, owner_id in pending.items()
+            ),
+        )
+        if is_accept:
+            bulk_add_friends(user, answered_owner_ids)
+    results = dict.fromkeys(pending, InviteMessages.ANSWERED)
+    if invite_ids is not None:
+        existing = set(invites.values_list("id", flat=True)) if len(pending) < len(invite_ids) else set()
+        for invite_id in invite_ids:
+            if invite_id not in results:
+                results[invite_id] = (
+                    InviteMessages.ALREADY_ANSWERED if invite_id in existing else InviteMessages.UNKNOWN_INVITE
+                )
+    return results, has_more
+
+
+def resolve_created_invite(invite: Invite) -> None:
+    """Count a new pending invite or accept it together with a counter-invite."""
+    with transaction.atomic(savepoint=False):
+        lock_users(invite.owner_id, invite.target_id)
+        answered = Invite.objects.filter(owner=invite.target_id, target=invite.owner_id, is_accept=None).update(
+            is_accept=True,
+        )
+        if not answered:
+            if Friendship.objects.between(invite.owner_id, invite.target_id).exists():
+                # The users became friends after the invite had been validated.
+                Invite.objects.filter(id=invite.id).update(is_accept=True)
+                invite.is_accept = True
+                _record(EventTypes.INVITE_AUTO_ACCEPTED, invite)
+            else:
+                change_pending_invites_counters(invite.owner_id, invite.target_id, 1)
+                _record(EventTypes.INVITE_CREATED, invite)
+            return
+        Invite.objects.filter(id=invite.id).update(is_accept=True)
+        invite.is_accept = True
+        # The new invite never becomes pending, so only the counters of the
+        # answered counter-invite go down.
+        change_pending_invites_counters(invite.target_id, invite.owner_id, -answered)
+        _record(EventTypes.INVITE_AUTO_ACCEPTED, invite)
+        add_friends(invite.owner, invite.target)
+
+
+def create_invites(owner: User, target_ids: Iterable[int]) -> tuple[list[Invite], dict[int, str]]:
+    """Send invites from the owner to many users in a fixed number of queries.
+
+    Targets that cannot be invited are returned with the reason instead.
+    Targets that have already invited the owner become friends right away.
+    """
+    target_ids = list(dict.fromkeys(target_ids))
+    skipped = {}
+    if owner.id in target_ids:
+        target_ids.remove(owner.id)
+        skipped[owner.id] = InviteMessages.SELF_INVITE
+    with transaction.atomic(savepoint=False):
+        lock_users(owner.id, *target_ids)
+        targets = {
+            target.id: target
+            # The locked rows are the source of truth here, not the friend graph.
+            for target in annotate_friend_status(User.objects.filter(id__in=target_ids), owner, use_graph=False)
+        }
+        invites = []
+        for target_id in target_ids:
+            target = targets.get(target_id)
+            if target is None:
+                skipped[target_id] = InviteMessages.UNKNOWN_TARGET
+            elif target.is_friend:
+                skipped[target_id] = InviteMessages.FRIEND_INVITE
+            elif target.has_outgoing_invite:
+                skipped[target_id] = InviteMessages.DUPLICATE_INVITE
+            else:
+                invites.append(Invite(owner=owner, target=target, is_accept=target.has_incoming_invite or None))
+        # Unlike save(), bulk_create() does not send post_save, so counters
+        # and mutual invites are resolved here for the whole batch.
+        Invite.objects.bulk_create(invites)
+        if invites and not connection.features.can_return_rows_from_bulk_insert:
+            _fetch_created_ids(owner, invites)
+        pending_ids = [invite.target_id for invite in invites if invite.is_accept is None]
+        mutual_ids = [invite.target_id for invite in invites if invite.is_accept]
+        Invite.objects.filter(owner__in=mutual_ids, target=owner, is_accept=None).update(is_accept=True)
+        shift_counters(pending_ids, incoming_invites_count=1)
+        shift_counters(mutual_ids, outgoing_invites_count=-1)
+        shift_counters(
+            (owner.id,),
+            outgoing_invites_count=len(pending_ids),
+            incoming_invites_count=-len(mutual_ids),
+        )
+        bulk_add_friends(owner, mutual_ids)
+        record_events(EventTypes.INVITE_CREATED, (_payload(invite) for invite in invites if invite.is_accept is None))
+        record_events(EventTypes.INVITE_AUTO_ACCEPTED, (_payload(invite) for invite in invites if invite.is_accept))
+    return invites, skipped
+
+
+def _fetch_created_ids(owner: User, invites: list[Invite]) -> None:
+    # The owner is locked, so the latest invite to each target is the new one.
+    ids = dict(
+        Invite.objects.filter(owner=owner, target__in=[invite.target_id for invite in invites])
+        .order_by()
+        .values_list("target")
+        .annotate(Max("id")),
+    )
+    for invite in invites:
+        invite.id = ids[invite.target_id]
+
+
+def _record(event_type: str, invite: Invite) -> None:
+    record_event(event_type, **_payload(invite))
+
+
+def _payload(invite: Invite) -> dict:
+    return {"invite": invite.id, "owner": invite.owner_id, "target": invite.target_id}
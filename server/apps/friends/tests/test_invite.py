@@ -1,14 +1,38 @@
 import pytest
+from django.db import IntegrityError, transaction
 from django.urls import reverse_lazy
 from rest_framework import status
 
 from apps.friends.factories import InviteFactory
 from apps.friends.models import Invite
+from apps.friends.services import accept_invites
 from apps.users.factories import UserFactory
+from apps.users.models import Friendship
+from apps.users.services import add_friends
 
 pytestmark = pytest.mark.django_db
 COUNT_USERS_FRIENDS = 2
 COUNT_USERS_FRIENDS_OTHER = 3
+COUNT_BULK_TARGETS = 20
+# Writes that make friends run more queries than the shared QUERY_BUDGET of reads,
+# a fixed number however many invites or friends they touch.
+# Target, savepoint, insert, lock both users, accept a counter invite, friendship
+# check, invite counters, event, release.
+CREATE_INVITE_QUERY_BUDGET = 9
+# Invite, lock both users, answer, invite counters, event, then adding the friend:
+# lock, friendship check, friends of both users, lock and shift their suggestions,
+# insert the friendship, friends counters, event.
+ACCEPT_INVITE_QUERY_BUDGET = 13
+# Savepoint, lock the targets, owner, insert the invites, fetch their ids on SQLite,
+# accept counter invites, three counter updates, then adding the friends: lock,
+# friends on both sides in two queries, create, lock and shift the suggestions,
+# trim them, insert the friendships, two counter updates, three events, release.
+CREATE_INVITES_BULK_QUERY_BUDGET = 23
+# Pending invites, lock the owners, invites again under the lock, answer them, two
+# counter updates, event, then adding the friends: lock, friends on both sides in
+# two queries, create the suggestions (in two batches on SQLite), lock and shift
+# them, trim them, insert the friendships, two counter updates, event.
+ACCEPT_INVITES_BULK_QUERY_BUDGET = 19
 
 
 def test_create_invite_to_friend_auth(api_client) -> None:
@@ -221,3 +245,256 @@ def test_accept_invite_to_friend_auth_and_change_status_after(api_client) -> Non
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert response.data["message"] == "На данную заявку уже дали ответ"
+
+
+def test_invite_query_budget(api_client, assert_query_budget) -> None:
+    """Тест на бюджет запросов к базе для эндпоинтов заявок."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    api_client.force_authenticate(user=user2)
+    with assert_query_budget(CREATE_INVITE_QUERY_BUDGET):
+        response = api_client.post(
+            reverse_lazy("api:invites-list"),
+            data={
+                "target": user1.id,
+            },
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    api_client.force_authenticate(user=user1)
+    with assert_query_budget(1):
+        response = api_client.get(
+            reverse_lazy("api:invites-detail", kwargs={'pk': response.data["id"]}),
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+    with assert_query_budget(ACCEPT_INVITE_QUERY_BUDGET):
+        response = api_client.patch(
+            reverse_lazy("api:invites-accept", kwargs={"pk": response.data["id"]}),
+            data={
+                "is_accept": True,
+            },
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_create_invite_to_friend_twice(api_client) -> None:
+    """Тест на повторную отправку заявки тому же пользователю."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    api_client.force_authenticate(user=user2)
+    response = api_client.post(
+        reverse_lazy("api:invites-list"),
+        data={
+            "target": user1.id,
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = api_client.post(
+        reverse_lazy("api:invites-list"),
+        data={
+            "target": user1.id,
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert str(response.data["non_field_errors"][0]) == "Заявка этому пользователю уже отправлена"
+    assert Invite.objects.filter(owner=user2, target=user1).count() == 1
+
+
+def test_unique_pending_invite_constraint() -> None:
+    """Тест на ограничение базы данных: одна ожидающая заявка на пару пользователей."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    InviteFactory.create(owner=user1, target=user2, is_accept=False)
+    InviteFactory.create(owner=user1, target=user2)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Invite.objects.create(owner=user1, target=user2)
+
+
+def test_create_invites_bulk(api_client) -> None:
+    """Тест на массовую отправку заявок в друзья."""
+    owner, friend, invited, inviter, target1, target2 = UserFactory.create_batch(size=6)
+    add_friends(owner, friend)
+    InviteFactory.create(owner=owner, target=invited)
+    InviteFactory.create(owner=inviter, target=owner)
+    unknown_id = target2.id + 1
+    api_client.force_authenticate(user=owner)
+    response = api_client.post(
+        reverse_lazy("api:invites-bulk"),
+        data={
+            "targets": [target1.id, friend.id, invited.id, inviter.id, owner.id, target2.id, unknown_id, target1.id],
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [
+        (invite["target"]["id"], invite["is_accept"]) for invite in response.data["created"]
+    ] == [(target1.id, None), (inviter.id, True), (target2.id, None)]
+    assert all(invite["id"] for invite in response.data["created"])
+    assert response.data["skipped"] == {
+        friend.id: "Нельзя отправить заявку пользователю, который уже является вашим другом",
+        invited.id: "Заявка этому пользователю уже отправлена",
+        owner.id: "Нельзя отправить заявку самому себе",
+        unknown_id: "Пользователь не найден",
+    }
+    assert Friendship.objects.between(owner.id, inviter.id).exists()
+    assert not Invite.objects.filter(is_accept=None, owner=inviter).exists()
+    assert Invite.objects.filter(owner=owner, is_accept=None).count() == 3
+
+    owner.refresh_from_db()
+    assert (owner.friends_count, owner.incoming_invites_count, owner.outgoing_invites_count) == (2, 0, 3)
+    inviter.refresh_from_db()
+    assert (inviter.friends_count, inviter.incoming_invites_count, inviter.outgoing_invites_count) == (1, 0, 0)
+    for target in (target1, target2):
+        target.refresh_from_db()
+        assert (target.friends_count, target.incoming_invites_count, target.outgoing_invites_count) == (0, 1, 0)
+
+
+def test_create_invites_bulk_failed(api_client) -> None:
+    """Тест на массовую отправку заявок с неверными данными."""
+    user = UserFactory.create()
+    response = api_client.post(
+        reverse_lazy("api:invites-bulk"),
+        data={
+            "targets": [user.id],
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.force_authenticate(user=user)
+    for targets in ([], [0], "all"):
+        response = api_client.post(
+            reverse_lazy("api:invites-bulk"),
+            data={
+                "targets": targets,
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Invite.objects.exists()
+
+
+def test_create_invites_bulk_query_budget(api_client, assert_query_budget) -> None:
+    """Тест на независимость числа запросов от количества адресатов заявок."""
+    owner = UserFactory.create()
+    targets = UserFactory.create_batch(size=COUNT_BULK_TARGETS)
+    for target in targets[::2]:
+        InviteFactory.create(owner=target, target=owner)
+    api_client.force_authenticate(user=owner)
+    with assert_query_budget(CREATE_INVITES_BULK_QUERY_BUDGET):
+        response = api_client.post(
+            reverse_lazy("api:invites-bulk"),
+            data={
+                "targets": [target.id for target in targets],
+            },
+            format="json",
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(response.data["created"]) == COUNT_BULK_TARGETS
+    assert Friendship.objects.count() == COUNT_BULK_TARGETS // 2
+
+
+def test_accept_invites_bulk(api_client) -> None:
+    """Тест на массовое принятие входящих заявок в друзья."""
+    user, other = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    invites = [InviteFactory.create(target=user) for _ in range(COUNT_USERS_FRIENDS_OTHER)]
+    answered = InviteFactory.create(target=user, is_accept=False)
+    foreign = InviteFactory.create(owner=user, target=other)
+    api_client.force_authenticate(user=user)
+    response = api_client.patch(
+        reverse_lazy("api:invites-bulk-accept"),
+        data={
+            "ids": [invites[0].id, invites[1].id, answered.id, foreign.id],
+            "is_accept": True,
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == {
+        invites[0].id: "Статус заявки изменен",
+        invites[1].id: "Статус заявки изменен",
+        answered.id: "На данную заявку уже дали ответ",
+        foreign.id: "Заявка не найдена",
+    }
+    assert set(user.friends) == {invites[0].owner, invites[1].owner}
+    assert Invite.objects.get(id=invites[2].id).is_accept is None
+    assert Invite.objects.get(id=foreign.id).is_accept is None
+
+    user.refresh_from_db()
+    assert (user.friends_count, user.incoming_invites_count, user.outgoing_invites_count) == (2, 1, 1)
+    for invite in invites[:2]:
+        invite.owner.refresh_from_db()
+        assert (invite.owner.friends_count, invite.owner.outgoing_invites_count) == (1, 0)
+
+
+def test_decline_all_invites_bulk(api_client) -> None:
+    """Тест на массовое отклонение всех входящих заявок в друзья."""
+    user = UserFactory.create()
+    invites = [InviteFactory.create(target=user) for _ in range(COUNT_USERS_FRIENDS_OTHER)]
+    api_client.force_authenticate(user=user)
+    response = api_client.patch(
+        reverse_lazy("api:invites-bulk-accept"),
+        data={
+            "all": True,
+            "is_accept": False,
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data["results"]) == {invite.id for invite in invites}
+    assert response.data["has_more"] is False
+    assert not Invite.objects.filter(is_accept=None).exists()
+    assert not Friendship.objects.exists()
+    user.refresh_from_db()
+    assert user.incoming_invites_count == 0
+
+
+def test_accept_all_invites_limit() -> None:
+    """Тест на ответ только на самые старые заявки при ответе на все заявки."""
+    user = UserFactory.create()
+    invites = [InviteFactory.create(target=user) for _ in range(COUNT_USERS_FRIENDS_OTHER)]
+    results, has_more = accept_invites(user, True, limit=COUNT_USERS_FRIENDS)
+    assert list(results) == [invite.id for invite in invites[:COUNT_USERS_FRIENDS]]
+    assert has_more is True
+    assert list(Invite.objects.filter(is_accept=None)) == invites[COUNT_USERS_FRIENDS:]
+    user.refresh_from_db()
+    assert (user.friends_count, user.incoming_invites_count) == (COUNT_USERS_FRIENDS, 1)
+
+    results, has_more = accept_invites(user, True, limit=COUNT_USERS_FRIENDS)
+    assert list(results) == [invites[-1].id]
+    assert has_more is False
+
+
+def test_accept_invites_bulk_failed(api_client) -> None:
+    """Тест на массовое принятие заявок с неверными данными."""
+    user = UserFactory.create()
+    invite = InviteFactory.create(target=user)
+    api_client.force_authenticate(user=user)
+    for data in (
+        {"is_accept": True},
+        {"ids": [invite.id], "all": True, "is_accept": True},
+        {"ids": [], "is_accept": True},
+        {"ids": [invite.id]},
+    ):
+        response = api_client.patch(reverse_lazy("api:invites-bulk-accept"), data=data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Invite.objects.get(id=invite.id).is_accept is None
+
+
+def test_accept_invites_bulk_query_budget(api_client, assert_query_budget) -> None:
+    """Тест на независимость числа запросов от количества принимаемых заявок."""
+    user = UserFactory.create()
+    for _ in range(COUNT_BULK_TARGETS):
+        InviteFactory.create(target=user)
+    api_client.force_authenticate(user=user)
+    with assert_query_budget(ACCEPT_INVITES_BULK_QUERY_BUDGET):
+        response = api_client.patch(
+            reverse_lazy("api:invites-bulk-accept"),
+            data={
+                "all": True,
+                "is_accept": True,
+            },
+            format="json",
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == COUNT_BULK_TARGETS
+    assert Friendship.objects.count() == COUNT_BULK_TARGETS
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection, connections
+from django.db.models import Exists, F, OuterRef
+from django.urls import reverse_lazy
+from rest_framework import status, test
+
+from apps.friends.factories import InviteFactory
+from apps.friends.models import Invite
+from apps.users.factories import UserFactory
+from apps.users.models import Friendship, Suggestion, User
+from apps.users.services import actual_counters, iter_mutual_counts
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="Нужны блокировки строк PostgreSQL"),
+]
+COUNT_THREADS = 8
+COUNT_PAIRS = 10
+
+
+def run_parallel(*calls) -> list:
+    """Запускает вызовы одновременно, каждый в своем потоке и соединении с базой."""
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        barrier.wait()
+        try:
+            return call()
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return list(executor.map(run, calls))
+
+
+def send_invite(owner, target):
+    def call():
+        client = test.APIClient()
+        client.force_authenticate(user=owner)
+        return client.post(reverse_lazy("api:invites-list"), data={"target": target.id}).status_code
+    return call
+
+
+def answer_invite(target, invite, is_accept):
+    def call():
+        client = test.APIClient()
+        client.force_authenticate(user=target)
+        return client.patch(
+            reverse_lazy("api:invites-accept", kwargs={"pk": invite.id}),
+            data={"is_accept": is_accept},
+        ).status_code
+    return call
+
+
+def assert_invariants() -> None:
+    """Проверяет согласованность заявок, дружбы и счетчиков."""
+    assert not Invite.objects.filter(
+        Exists(Invite.objects.filter(owner=OuterRef("target"), target=OuterRef("owner"), is_accept=None)),
+        is_accept=None,
+    ).exists()
+    for owner_id, target_id in Invite.objects.filter(is_accept=True).values_list("owner", "target"):
+        assert Friendship.objects.between(owner_id, target_id).exists()
+    counters = actual_counters()
+    assert not User.objects.annotate(
+        **{f"actual_{name}": expression for name, expression in counters.items()},
+    ).exclude(**{name: F(f"actual_{name}") for name in counters}).exists()
+    assert set(Suggestion.objects.values_list("user", "candidate", "mutual_count")) == set(
+        iter_mutual_counts(Friendship.objects.values_list("user", "friend")),
+    )
+
+
+def test_parallel_accepts() -> None:
+    """Тест на одновременные ответы на одну заявку."""
+    owner, target = UserFactory.create_batch(size=2)
+    invite = InviteFactory.create(owner=owner, target=target)
+
+    results = run_parallel(
+        *(answer_invite(target, invite, number % 2 == 0) for number in range(COUNT_THREADS)),
+    )
+    assert results.count(status.HTTP_200_OK) == 1
+    assert results.count(status.HTTP_400_BAD_REQUEST) == COUNT_THREADS - 1
+    invite.refresh_from_db()
+    assert Friendship.objects.between(owner.id, target.id).exists() is invite.is_accept
+    assert_invariants()
+
+
+def test_parallel_duplicate_invites() -> None:
+    """Тест на одновременную отправку одинаковых заявок."""
+    owner, target = UserFactory.create_batch(size=2)
+
+    results = run_parallel(*(send_invite(owner, target) for _ in range(COUNT_THREADS)))
+    assert results.count(status.HTTP_201_CREATED) == 1
+    assert results.count(status.HTTP_400_BAD_REQUEST) == COUNT_THREADS - 1
+    assert Invite.objects.filter(owner=owner, target=target, is_accept=None).count() == 1
+    assert_invariants()
+
+
+def test_parallel_mutual_invites() -> None:
+    """Тест на одновременную отправку взаимных заявок."""
+    users = UserFactory.create_batch(size=COUNT_PAIRS * 2)
+    pairs = list(zip(users[::2], users[1::2]))
+
+    results = run_parallel(
+        *(send_invite(user1, user2) for user1, user2 in pairs),
+        *(send_invite(user2, user1) for user1, user2 in pairs),
+    )
+    assert results == [status.HTTP_201_CREATED] * len(results)
+    assert not Invite.objects.filter(is_accept=None).exists()
+    for user1, user2 in pairs:
+        assert Friendship.objects.between(user1.id, user2.id).exists()
+    assert_invariants()
+
+
+def test_parallel_accepts_and_mutual_invites() -> None:
+    """Тест на одновременное принятие заявки и отправку встречной заявки."""
+    users = UserFactory.create_batch(size=COUNT_PAIRS * 2)
+    pairs = list(zip(users[::2], users[1::2]))
+    invites = [InviteFactory.create(owner=user1, target=user2) for user1, user2 in pairs]
+
+    run_parallel(
+        *(answer_invite(user2, invite, True) for (_, user2), invite in zip(pairs, invites)),
+        *(send_invite(user2, user1) for user1, user2 in pairs),
+    )
+    assert not Invite.objects.filter(is_accept=None).exists()
+    for user1, user2 in pairs:
+        assert Friendship.objects.between(user1.id, user2.id).exists()
+    assert_invariants()
@@ -1,42 +1,92 @@
-from rest_framework import permissions, response, status
+from django.db import IntegrityError, transaction
+from rest_framework import permissions, response, serializers, status
 from rest_framework.decorators import action
 
 from apps.core.viewsets import CreateReadViewSet
+from apps.friends.constants import InviteMessages
 from apps.friends.models import Invite
 from apps.friends.permissions import InvitePermission
-from apps.friends.serializers import InviteAcceptSerializer, InviteSerializer
+from apps.friends.serializers import (
+    InviteAcceptSerializer,
+    InviteBulkAcceptSerializer,
+    InviteBulkCreateSerializer,
+    InviteSerializer,
+)
+from apps.friends.services import accept_invite, accept_invites, create_invites
 
 
 class InviteViewSet(CreateReadViewSet):
     serializer_class = InviteSerializer
-    queryset = Invite.objects.all()
+    queryset = Invite.objects.select_related("owner", "target")
     permission_classes = (permissions.IsAuthenticated, InvitePermission)
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(owner=self.request.user)
+        except IntegrityError:
+            # A concurrent request has created the same pending invite
+            # after this one was validated.
+            raise serializers.ValidationError(
+                {"non_field_errors": [InviteMessages.DUPLICATE_INVITE]},
+            )
+
+    @action(methods=("POST",), detail=False, url_path="bulk", url_name="bulk")
+    def create_bulk(self, request, *args, **kwargs):
+        serializer = InviteBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                invites, skipped = create_invites(request.user, serializer.data["targets"])
+        except IntegrityError:
+            # A concurrent single invite to one of the targets won the race.
+            raise serializers.ValidationError(
+                {"non_field_errors": [InviteMessages.DUPLICATE_INVITE]},
+            )
+        return response.Response(
+            data={
+                "created": self.get_serializer(invites, many=True).data,
+                "skipped": skipped,
+            },
+            status=status.HTTP_201_CREATED,
+        )
 
     @action(methods=("PATCH",), detail=True)
     def accept(self, request, *args, **kwargs):
         invite = self.get_object()
         if invite.is_accept in (True, False):
             return response.Response(
-                data={"message": "На данную заявку уже дали ответ"},
+                data={"message": InviteMessages.ALREADY_ANSWERED},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if invite.target.id == request.user.id:
+        if invite.target_id == request.user.id:
             serializer = InviteAcceptSerializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            invite.is_accept = serializer.data["is_accept"]
-            invite.save()
-            if invite.is_accept is True:
-                invite.target.friends.add(invite.owner)
-                invite.owner.friends.add(invite.target)
+            if not accept_invite(invite, serializer.data["is_accept"]):
+                return response.Response(
+                    data={"message": InviteMessages.ALREADY_ANSWERED},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             return response.Response(
-                data={"message": "Статус заявки изменен"},
+                data={"message": InviteMessages.ANSWERED},
                 status=status.HTTP_200_OK,
             )
-        if invite.owner.id == request.user.id:
+        if invite.owner_id == request.user.id:
             return response.Response(
                 data={"message": "Отправитель заявки не может изменить ее статус"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+    @action(methods=("PATCH",), detail=False, url_path="bulk-accept", url_name="bulk-accept")
+    def accept_bulk(self, request, *args, **kwargs):
+        serializer = InviteBulkAcceptSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, has_more = accept_invites(
+            request.user,
+            serializer.validated_data["is_accept"],
+            serializer.validated_data.get("ids"),
+        )
+        return response.Response(
+            data={"results": results, "has_more": has_more},
+            status=status.HTTP_200_OK,
+        )
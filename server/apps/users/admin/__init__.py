@@ -1,3 +1,9 @@
+from .friendship import FriendshipAdmin
+from .suggestion import SuggestionAdmin
 from .user import UserAdmin
 
-__all__ = (UserAdmin,)
+__all__ = (
+    FriendshipAdmin,
+    SuggestionAdmin,
+    UserAdmin,
+)
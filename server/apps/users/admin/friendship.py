@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from apps.users.models import Friendship
+
+
+@admin.register(Friendship)
+class FriendshipAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "friend",
+    )
+    raw_id_fields = (
+        "user",
+        "friend",
+    )
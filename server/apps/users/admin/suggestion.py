@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from apps.users.models import Suggestion
+
+
+@admin.register(Suggestion)
+class SuggestionAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "candidate",
+        "mutual_count",
+    )
+    raw_id_fields = (
+        "user",
+        "candidate",
+    )
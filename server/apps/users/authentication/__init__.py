@@ -0,0 +1,13 @@
+from .cached_backend import CachedModelBackend
+from .cached_jwt import AUTH_VERSION_CLAIM, CachedJWTAuthentication, get_auth_version, get_token_user
+from .token import VersionedTokenObtainPairSerializer, get_access_token
+
+__all__ = (
+    AUTH_VERSION_CLAIM,
+    CachedJWTAuthentication,
+    CachedModelBackend,
+    VersionedTokenObtainPairSerializer,
+    get_access_token,
+    get_auth_version,
+    get_token_user,
+)
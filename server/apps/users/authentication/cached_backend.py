@@ -0,0 +1,18 @@
+from typing import Optional
+
+from django.contrib.auth.backends import ModelBackend
+
+from apps.users.models import User
+from apps.users.services.cache import get_principal
+
+
+class CachedModelBackend(ModelBackend):
+    """Model backend reading the user of a session through the principal cache.
+
+    Django compares the session auth hash with the cached password, so
+    sessions are still logged out by a password change.
+    """
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        user = get_principal(user_id)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,48 @@
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.users.models import User
+from apps.users.services.cache import get_principal
+
+AUTH_VERSION_CLAIM = "auth_version"
+AUTH_VERSION_SALT = "apps.users.authentication.auth_version"
+
+
+def get_auth_version(user: User) -> str:
+    """Changes with the password of the user.
+
+    Keyed with the secret key, so the token, which the client can read,
+    does not carry anything derived from the password hash alone.
+    """
+    return salted_hmac(AUTH_VERSION_SALT, user.password, algorithm="sha256").hexdigest()
+
+
+def get_token_user(validated_token) -> User:
+    """Active user of the token, read through the principal cache.
+
+    Tokens without the auth version, or issued before the last password
+    change, are rejected.
+    """
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    user = get_principal(user_id)
+    if user is None:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    if validated_token.get(AUTH_VERSION_CLAIM) != get_auth_version(user):
+        raise AuthenticationFailed(_('Token was issued before a password change'), code='token_revoked')
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication reading the user through the principal cache."""
+
+    def get_user(self, validated_token) -> User:
+        return get_token_user(validated_token)
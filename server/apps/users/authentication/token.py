@@ -0,0 +1,22 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.authentication.cached_jwt import AUTH_VERSION_CLAIM, get_auth_version
+from apps.users.models import User
+
+
+def get_access_token(user: User) -> AccessToken:
+    """Access token of the user carrying its auth version, as issued by ``/api/token/``."""
+    token = AccessToken.for_user(user)
+    token[AUTH_VERSION_CLAIM] = get_auth_version(user)
+    return token
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair carrying the auth version checked by ``CachedJWTAuthentication``."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[AUTH_VERSION_CLAIM] = get_auth_version(user)
+        return token
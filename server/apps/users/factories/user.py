@@ -1,4 +1,4 @@
-from factory import Faker, django
+from factory import Faker, Sequence, django
 
 from apps.users.models import User
 
@@ -6,7 +6,7 @@ PASSWORD = "root123"
 
 
 class UserFactory(django.DjangoModelFactory):
-    username = Faker("user_name")
+    username = Sequence(lambda number: f"user{number}")
     email = Faker("email")
     password = PASSWORD
 
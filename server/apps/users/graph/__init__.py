@@ -0,0 +1,8 @@
+from .friend_graph import FriendGraph, get_friend_graph, reset_friend_graph, update_friend_graph
+
+__all__ = (
+    FriendGraph,
+    get_friend_graph,
+    reset_friend_graph,
+    update_friend_graph,
+)
@@ -0,0 +1,181 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from apps.core.constants import BATCH_SIZE
+from apps.core.reloading import BackgroundReload
+from apps.users.models import Friendship, FriendshipVersion
+
+# User ids are 32-bit ``AutoField`` values.
+TYPECODE = "i"
+EMPTY = array(TYPECODE)
+
+
+class FriendGraph:
+    """Friend network held in memory as sorted adjacency arrays.
+
+    Every user is mapped to an ``array('i')`` of friend ids in ascending
+    order, so a friendship costs two 4-byte slots instead of two Python
+    ints. Lookups use binary search and mutual friends are found by
+    intersecting two arrays. Updates insert or delete ids in a copy of the
+    array of a user and replace it, so concurrent readers never see a
+    half-updated list.
+
+    ``versions`` maps every shard of the friendship version to the version
+    the graph is known to match. A shard only moves on with updates that
+    directly follow it, so a graph that missed a change stays behind the
+    database versions.
+    """
+
+    def __init__(self, adjacency: Optional[dict[int, array]] = None, versions: Optional[dict[int, int]] = None):
+        self._adjacency = adjacency if adjacency is not None else {}
+        self._lock = threading.Lock()
+        self.versions = versions if versions is not None else {}
+
+    @classmethod
+    def load(cls) -> "FriendGraph":
+        """Load all friendships from the database in one pass.
+
+        The versions are read before the edges. A change committed in between
+        may already be in the edges, but it leaves the graph behind the
+        database versions and triggers another reload instead of being lost.
+        """
+        versions = FriendshipVersion.objects.current()
+        adjacency = defaultdict(lambda: array(TYPECODE))
+        # Edges ordered by (user, friend) append every list in ascending order:
+        # a user gets its smaller friends while the loop goes over them and
+        # its bigger friends from its own rows afterwards.
+        edges = Friendship.objects.order_by("user", "friend").values_list("user", "friend")
+        for user_id, friend_id in edges.iterator(chunk_size=BATCH_SIZE):
+            adjacency[user_id].append(friend_id)
+            adjacency[friend_id].append(user_id)
+        return cls(dict(adjacency), versions)
+
+    def __len__(self) -> int:
+        """Number of users with friends."""
+        return len(self._adjacency)
+
+    def friend_ids(self, user_id: int) -> array:
+        return self._adjacency.get(user_id, EMPTY)
+
+    def degree(self, user_id: int) -> int:
+        return len(self.friend_ids(user_id))
+
+    def is_friend(self, user_id: int, other_id: int) -> bool:
+        friend_ids, other_friend_ids = self.friend_ids(user_id), self.friend_ids(other_id)
+        if len(other_friend_ids) < len(friend_ids):
+            friend_ids, other_id = other_friend_ids, user_id
+        position = bisect_left(friend_ids, other_id)
+        return position < len(friend_ids) and friend_ids[position] == other_id
+
+    def mutual_friend_ids(self, user_id: int, other_id: int) -> list[int]:
+        """Sorted ids of friends of both users."""
+        friend_ids, other_friend_ids = sorted((self.friend_ids(user_id), self.friend_ids(other_id)), key=len)
+        return sorted(set(friend_ids).intersection(other_friend_ids))
+
+    def add_friends(
+        self,
+        user_id: int,
+        friend_ids: Iterable[int],
+        version: Optional[tuple[int, int]] = None,
+    ) -> None:
+        friend_ids = set(friend_ids)
+        with self._lock:
+            self._update(user_id, friend_ids, set())
+            for friend_id in friend_ids:
+                self._update(friend_id, {user_id}, set())
+            self._follow(version)
+
+    def remove_friends(
+        self,
+        user_id: int,
+        friend_ids: Iterable[int],
+        version: Optional[tuple[int, int]] = None,
+    ) -> None:
+        friend_ids = set(friend_ids)
+        with self._lock:
+            self._update(user_id, set(), friend_ids)
+            for friend_id in friend_ids:
+                self._update(friend_id, set(), {user_id})
+            self._follow(version)
+
+    def _follow(self, version: Optional[tuple[int, int]]) -> None:
+        if version is not None:
+            shard, value = version
+            if value == self.versions.get(shard, 0) + 1:
+                self.versions[shard] = value
+
+    def _update(self, user_id: int, added: set[int], removed: set[int]) -> None:
+        friend_ids = self.friend_ids(user_id)[:]
+        for friend_id in removed:
+            position = bisect_left(friend_ids, friend_id)
+            if position < len(friend_ids) and friend_ids[position] == friend_id:
+                del friend_ids[position]
+        for friend_id in added:
+            position = bisect_left(friend_ids, friend_id)
+            if position == len(friend_ids) or friend_ids[position] != friend_id:
+                friend_ids.insert(position, friend_id)
+        if friend_ids:
+            self._adjacency[user_id] = friend_ids
+        else:
+            self._adjacency.pop(user_id, None)
+
+
+# ``(added, user id, friend ids, version)`` of a committed friendship change.
+Change = tuple[bool, int, list[int], Optional[tuple[int, int]]]
+
+
+def _apply(graph: FriendGraph, change: Change) -> None:
+    added, user_id, friend_ids, version = change
+    (graph.add_friends if added else graph.remove_friends)(user_id, friend_ids, version)
+
+
+def _is_missing(graph: FriendGraph, change: Change) -> bool:
+    """Whether a reloaded graph does not include the change yet."""
+    version = change[3]
+    return version is None or version[1] > graph.versions.get(version[0], 0)
+
+
+def _is_stale(graph: FriendGraph) -> bool:
+    return FriendshipVersion.objects.current() != graph.versions
+
+
+_graph: BackgroundReload[FriendGraph, Change] = BackgroundReload(
+    "friend-graph",
+    FriendGraph,
+    apply=_apply,
+    replay=_is_missing,
+)
+
+
+def get_friend_graph() -> Optional[FriendGraph]:
+    """Friend graph of this process or ``None`` if it is disabled.
+
+    The graph is loaded on first use and kept current by the friendship
+    signals of this process. Every ``FRIEND_GRAPH_CHECK_INTERVAL`` seconds
+    its versions are compared with the friendship versions in the database;
+    a graph behind them is reloaded in a background thread while requests
+    keep reading the current one.
+    """
+    if not settings.FRIEND_GRAPH_ENABLED:
+        return None
+    return _graph.get(settings.FRIEND_GRAPH_CHECK_INTERVAL, is_stale=_is_stale)
+
+
+def update_friend_graph(
+    added: bool,
+    user_id: int,
+    friend_ids: Iterable[int],
+    version: Optional[tuple[int, int]],
+) -> None:
+    """Apply a committed friendship change to the graph of this process, if it is loaded."""
+    _graph.update((added, user_id, list(friend_ids), version))
+
+
+def reset_friend_graph() -> None:
+    """Drop the graph of this process, it is loaded again on next use."""
+    _graph.reset()
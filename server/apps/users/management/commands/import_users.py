@@ -0,0 +1,220 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterator, Optional
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from apps.users.models import User
+
+FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def hash_passwords(passwords: list[Optional[str]]) -> list[str]:
+    """Hashes of the passwords, unusable ones for the empty passwords."""
+    return [make_password(password or None) for password in passwords]
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV or JSON Lines file with username, password, email, first_name and "
+        "last_name, hashing passwords on all cores. Existing usernames and invalid rows are skipped. "
+        "An interrupted import resumes after the last inserted batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='File to import, "-" for the standard input.')
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Guessed from the file extension by default.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes hashing passwords.")
+        parser.add_argument("--checkpoint", help='Progress file, "<path>.checkpoint" by default.')
+
+    def handle(self, *args, path, format, batch_size, workers, checkpoint, verbosity, **options):
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if format is None:
+            format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        if checkpoint is None and path != "-":
+            checkpoint = f"{path}.checkpoint"
+        done = read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f"Resuming after {done} rows")
+
+        started = time.perf_counter()
+        imported = existing = invalid = 0
+        with open_input(path) as source, ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+            records = islice(read_records(source, format), done, None)
+            batches = iter(lambda: list(islice(records, batch_size)), [])
+            for batch, passwords in hashed_batches(executor, batches, workers):
+                valid, inserted = insert_users(batch, passwords)
+                imported += inserted
+                existing += valid - inserted
+                invalid += len(batch) - valid
+                done += len(batch)
+                write_checkpoint(checkpoint, done)
+                if verbosity > 1:
+                    self.stdout.write(f"{done} rows, {imported / (time.perf_counter() - started):.0f} rows/s")
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} rows in {elapsed:.1f} s ({imported / elapsed:.0f} rows/s), "
+            f"skipped {existing} existing and {invalid} invalid rows",
+        ))
+
+
+def hashed_batches(executor, batches: Iterator[list[dict]], workers: int) -> Iterator[tuple[list[dict], list[str]]]:
+    """Batches with hashes of their passwords, split between the workers.
+
+    The next batch is hashed while the current one is inserted, so at most
+    two batches are held in memory.
+    """
+    pending = deque()
+    for batch in batches:
+        chunk_size = -(-len(batch) // workers)
+        pending.append((
+            batch,
+            [
+                executor.submit(hash_passwords, [get_password(record) for record in batch[start:start + chunk_size]])
+                for start in range(0, len(batch), chunk_size)
+            ],
+        ))
+        if len(pending) > 1:
+            yield collect(*pending.popleft())
+    while pending:
+        yield collect(*pending.popleft())
+
+
+def collect(batch: list[dict], futures: list) -> tuple[list[dict], list[str]]:
+    return batch, [password for future in futures for password in future.result()]
+
+
+def insert_users(records: list[Optional[dict]], passwords: list[str]) -> tuple[int, int]:
+    """Insert the valid records at once and return their number and the number of inserted rows.
+
+    Records with existing usernames are valid but not inserted.
+    """
+    rows = [
+        {"password": password, **{field: record.get(field) or "" for field in FIELDS}}
+        for record, password in zip(records, passwords)
+        if is_valid(record)
+    ]
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            inserted = copy_users(rows)
+        else:
+            # Ids grow, so the inserted rows are those after the last id, found through the primary key.
+            last_id = User.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+            User.objects.bulk_create((User(**row) for row in rows), ignore_conflicts=True)
+            inserted = User.objects.filter(id__gt=last_id).count()
+    return len(rows), inserted
+
+
+def copy_users(rows: list[dict]) -> int:
+    """Insert the rows with COPY, skipping existing usernames, and return the number of inserted rows.
+
+    COPY cannot skip conflicting rows, so they are copied into a temporary
+    table first and moved with one INSERT ... ON CONFLICT DO NOTHING. The
+    other columns get the defaults of the model, computed once per batch.
+    """
+    fields = [field for field in User._meta.concrete_fields if not field.primary_key]
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    template = User()
+    defaults = {
+        field.attname: copy_text(field.get_db_prep_save(getattr(template, field.attname), connection))
+        for field in fields
+    }
+    data = io.StringIO()
+    for row in rows:
+        data.write("\t".join(copy_text(row[name]) if name in row else defaults[name] for name in defaults))
+        data.write("\n")
+    data.seek(0)
+    table = User._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMPORARY TABLE import_users AS SELECT {columns} FROM {table} WITH NO DATA")
+        cursor.copy_expert(f"COPY import_users ({columns}) FROM STDIN", data)
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM import_users ON CONFLICT DO NOTHING")
+        inserted = cursor.rowcount
+        cursor.execute("DROP TABLE import_users")
+    return inserted
+
+
+def copy_text(value) -> str:
+    """Value in the text format of COPY."""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def is_valid(record) -> bool:
+    """Whether the record has a username, string fields within their lengths and a string password, if any."""
+    if not isinstance(record, dict) or not isinstance(record.get("password"), (str, type(None))):
+        return False
+    return bool(record.get("username")) and all(
+        isinstance(record.get(field) or "", str)
+        and len(record.get(field) or "") <= User._meta.get_field(field).max_length
+        for field in FIELDS
+    )
+
+
+def get_password(record) -> Optional[str]:
+    """Password to hash, none for invalid records, which are not inserted."""
+    return record.get("password") if is_valid(record) else None
+
+
+def read_records(source, format: str) -> Iterator[Optional[dict]]:
+    """Records of the source, ``None`` for lines that are not JSON objects, so they count as invalid rows."""
+    if format == "csv":
+        yield from csv.DictReader(source)
+        return
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield record if isinstance(record, dict) else None
+
+
+@contextmanager
+def open_input(path: str):
+    if path == "-":
+        yield sys.stdin
+        return
+    try:
+        source = open(path, newline="", encoding="utf-8")
+    except OSError as error:
+        raise CommandError(f"Cannot read {path}: {error}")
+    with source:
+        yield source
+
+
+def read_checkpoint(checkpoint: Optional[str]) -> int:
+    if not checkpoint or not os.path.exists(checkpoint):
+        return 0
+    with open(checkpoint) as progress:
+        return int(progress.read())
+
+
+def write_checkpoint(checkpoint: Optional[str], done: int) -> None:
+    """Record the rows read so far, replacing the file at once so a crash never leaves it half written."""
+    if not checkpoint:
+        return
+    with open(f"{checkpoint}.tmp", "w") as progress:
+        progress.write(str(done))
+    os.replace(f"{checkpoint}.tmp", checkpoint)
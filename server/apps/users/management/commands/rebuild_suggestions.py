@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.services import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute friend suggestions from the friendship edges. "
+        "Run it while friendships are not being changed."
+    )
+
+    def handle(self, *args, **options):
+        created = rebuild_suggestions()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} suggestions"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from apps.users.models import User
+from apps.users.services import actual_counters, invalidate_users, lists_changed
+
+
+class Command(BaseCommand):
+    help = "Recompute friends and pending invites counters and repair the drifted ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report drifted users.")
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        counters = actual_counters()
+        drifted = (
+            User.objects
+            .annotate(**{f"actual_{name}": expression for name, expression in counters.items()})
+            .exclude(**{name: F(f"actual_{name}") for name in counters})
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        repaired = 0
+        last_id = 0
+        while batch := list(drifted.filter(id__gt=last_id)[:batch_size]):
+            last_id = batch[-1]
+            repaired += len(batch)
+            if not dry_run:
+                with transaction.atomic():
+                    User.objects.filter(id__in=batch).update(**counters, **lists_changed())
+                    invalidate_users(batch)
+        action = "Found" if dry_run else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{action} {repaired} users with drifted counters"))
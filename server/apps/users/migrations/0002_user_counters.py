@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(count=Count("*")).values("count")),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Invite = apps.get_model("friends", "Invite")
+    User.objects.update(
+        friends_count=_count(User.friends.through.objects.filter(from_user=OuterRef("pk")), "from_user"),
+        incoming_invites_count=_count(Invite.objects.filter(target=OuterRef("pk"), is_accept=None), "target"),
+        outgoing_invites_count=_count(Invite.objects.filter(owner=OuterRef("pk"), is_accept=None), "owner"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('friends', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='friends_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество друзей'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='incoming_invites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество входящих заявок'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='outgoing_invites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество исходящих заявок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
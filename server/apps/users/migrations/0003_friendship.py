@@ -0,0 +1,102 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:26
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from apps.core.constants import BATCH_SIZE
+
+
+def _bulk_create(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(count=Count("*")).values("count")),
+        0,
+    )
+
+
+def copy_friendships(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Friendship = apps.get_model("users", "Friendship")
+    pairs = (
+        User.friends.through.objects
+        .exclude(from_user=F("to_user"))
+        .annotate(low=Least("from_user", "to_user"), high=Greatest("from_user", "to_user"))
+        .order_by()
+        .values_list("low", "high")
+        .distinct()
+    )
+    _bulk_create(
+        Friendship,
+        (Friendship(user_id=low, friend_id=high) for low, high in pairs.iterator(chunk_size=BATCH_SIZE)),
+    )
+    # Directed rows without their mirror become full friendships, so the
+    # counters are recomputed from the new table.
+    User.objects.update(
+        friends_count=(
+            _count(Friendship.objects.filter(user=OuterRef("pk")), "user")
+            + _count(Friendship.objects.filter(friend=OuterRef("pk")), "friend")
+        ),
+    )
+
+
+def uncopy_friendships(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Friendship = apps.get_model("users", "Friendship")
+    Through = User.friends.through
+    pairs = Friendship.objects.values_list("user", "friend").iterator(chunk_size=BATCH_SIZE)
+    _bulk_create(
+        Through,
+        (
+            Through(from_user_id=from_user, to_user_id=to_user)
+            for low, high in pairs
+            for from_user, to_user in ((low, high), (high, low))
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Friendship',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('friend', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Друг')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Дружба',
+                'verbose_name_plural': 'Дружба',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['friend', 'user'], name='users_friendship_reverse_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.UniqueConstraint(fields=('user', 'friend'), name='users_friendship_unique_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.CheckConstraint(check=models.Q(('user__lt', django.db.models.expressions.F('friend'))), name='users_friendship_ordered_pair'),
+        ),
+        migrations.RunPython(copy_friendships, uncopy_friendships),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_friendship'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='friends',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:54
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.core.constants import BATCH_SIZE
+
+
+def fill_suggestions(apps, schema_editor):
+    Friendship = apps.get_model("users", "Friendship")
+    Suggestion = apps.get_model("users", "Suggestion")
+    friends = defaultdict(list)
+    for user_id, friend_id in Friendship.objects.values_list("user", "friend").iterator(chunk_size=BATCH_SIZE):
+        friends[user_id].append(friend_id)
+        friends[friend_id].append(user_id)
+    batch = []
+    for user_id, user_friends in friends.items():
+        counts = Counter(candidate_id for friend_id in user_friends for candidate_id in friends[friend_id])
+        del counts[user_id]
+        for candidate_id, mutual_count in counts.items():
+            batch.append(Suggestion(user_id=user_id, candidate_id=candidate_id, mutual_count=mutual_count))
+            if len(batch) == BATCH_SIZE:
+                Suggestion.objects.bulk_create(batch)
+                batch = []
+    Suggestion.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_user_friends'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Suggestion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mutual_count', models.PositiveIntegerField(default=0, verbose_name='Количество общих друзей')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Кандидат')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Рекомендация',
+                'verbose_name_plural': 'Рекомендации',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='suggestion',
+            index=models.Index(condition=models.Q(('mutual_count__gt', 0)), fields=['user', '-mutual_count', 'candidate'], name='users_suggestion_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='suggestion',
+            constraint=models.UniqueConstraint(fields=('user', 'candidate'), name='users_suggestion_unique_pair'),
+        ),
+        migrations.RunPython(fill_suggestions, migrations.RunPython.noop),
+    ]
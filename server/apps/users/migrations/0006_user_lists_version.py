@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 12:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_suggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='lists_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время изменения списков друзей и заявок'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='lists_version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Версия списков друзей и заявок'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-18 13:05
+
+from django.db import migrations
+
+# Expression indexes in the "C" collation serve both prefix LIKE and the
+# ORDER BY of prefix search, the trigram GiST index serves nearest
+# neighbour search by word similarity, where the pg_trgm extension is
+# available. Other databases search users with the in-memory prefix index
+# instead. The indexes are built CONCURRENTLY, so the migration does not
+# block writes to users and cannot run in a transaction.
+INDEXES = {
+    "users_user_username_prefix_idx": '(lower(username) COLLATE "C", id)',
+    "users_user_first_name_prefix_idx": '(lower(first_name) COLLATE "C", id)',
+    "users_user_last_name_prefix_idx": '(lower(last_name) COLLATE "C", id)',
+}
+TRIGRAM_INDEXES = {
+    "users_user_names_trgm_idx": (
+        "USING gist ((lower(username || ' ' || first_name || ' ' || last_name)) gist_trgm_ops)"
+    ),
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    indexes = dict(INDEXES)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            indexes.update(TRIGRAM_INDEXES)
+    for name, definition in indexes.items():
+        # A concurrent build that failed leaves an invalid index behind.
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid",
+                [name],
+            )
+            if cursor.fetchone():
+                schema_editor.execute(f"DROP INDEX CONCURRENTLY {name}")
+        schema_editor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON users_user {definition}")
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in (*INDEXES, *TRIGRAM_INDEXES):
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0006_user_lists_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendshipVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия дружбы',
+                'verbose_name_plural': 'Версия дружбы',
+            },
+        ),
+    ]
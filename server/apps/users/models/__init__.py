@@ -1,3 +1,11 @@
+from .friendship import Friendship
+from .friendship_version import FriendshipVersion
+from .suggestion import Suggestion
 from .user import User
 
-__all__ = (User,)
+__all__ = (
+    Friendship,
+    FriendshipVersion,
+    Suggestion,
+    User,
+)
@@ -0,0 +1,86 @@
+from typing import Optional
+
+from django.db import models
+from django.db.models.functions import Greatest, Least
+
+
+class FriendshipQuerySet(models.QuerySet):
+
+    def between(self, user_id, other_id) -> models.QuerySet:
+        """Edge of the unordered pair; ids may be values or expressions."""
+        return self.filter(user=Least(user_id, other_id), friend=Greatest(user_id, other_id))
+
+    def of(self, user_id: int) -> models.QuerySet:
+        return self.filter(models.Q(user=user_id) | models.Q(friend=user_id))
+
+    def friend_ids(self, user_id: int) -> models.QuerySet:
+        """Ids of all friends of the user, usable as an ``__in`` subquery."""
+        return self.filter(user=user_id).values("friend").union(
+            self.filter(friend=user_id).values("user"),
+            all=True,
+        )
+
+    def friend_id_window(self, user_id: int, position: Optional[int], reverse: bool, size: int) -> list[int]:
+        """Ascending ids of at most ``size`` friends after ``position``, or before it if ``reverse``.
+
+        Each direction of the edges is read from its own index with its own
+        ``LIMIT``, so the cost does not depend on the number of friends.
+        """
+        lookup, order = ("lt", "-") if reverse else ("gt", "")
+        ids = []
+        for own, other in (("user", "friend"), ("friend", "user")):
+            edges = self.filter(**{own: user_id})
+            if position is not None:
+                edges = edges.filter(**{f"{other}__{lookup}": position})
+            ids += edges.order_by(f"{order}{other}").values_list(other, flat=True)[:size]
+        ids.sort()
+        return ids[-size:] if reverse else ids[:size]
+
+
+class Friendship(models.Model):
+    """Friendship of two users stored as a single edge.
+
+    Each unordered pair is stored once with ``user_id < friend_id``, so a
+    friendship is created or removed with one write and indexed once per
+    direction instead of twice.
+    """
+
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+        verbose_name="Пользователь",
+    )
+    friend = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+        verbose_name="Друг",
+    )
+
+    objects = FriendshipQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Дружба"
+        verbose_name_plural = "Дружба"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "friend"),
+                name="users_friendship_unique_pair",
+            ),
+            models.CheckConstraint(
+                check=models.Q(user__lt=models.F("friend")),
+                name="users_friendship_ordered_pair",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("friend", "user"),
+                name="users_friendship_reverse_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.user_id}, {self.friend_id}"
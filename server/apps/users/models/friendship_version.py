@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+
+
+class FriendshipVersionQuerySet(models.QuerySet):
+
+    def current(self) -> dict[int, int]:
+        """Version of every shard that has been bumped."""
+        return dict(self.values_list("id", "value"))
+
+    def bump(self, user_id: int) -> tuple[int, int]:
+        """Increment the version of the shard of the user in the current transaction.
+
+        Return the shard and its new version. The shard row stays locked
+        until the transaction ends, so the versions of a shard follow the
+        commit order of its transactions, while transactions of users in
+        other shards do not wait for each other.
+        """
+        shard = user_id % settings.FRIEND_GRAPH_VERSION_SHARDS + 1
+        if not self.filter(id=shard).update(value=F("value") + 1):
+            self.get_or_create(id=shard)
+            self.filter(id=shard).update(value=F("value") + 1)
+        return shard, self.filter(id=shard).values_list("value", flat=True).get()
+
+
+class FriendshipVersion(models.Model):
+    """Counter of one shard, bumped in every transaction that changes friendships.
+
+    Transactions are spread over ``FRIEND_GRAPH_VERSION_SHARDS`` rows by
+    user id, the id of a row is its shard. Processes holding the friend
+    graph compare the versions of all shards with those of their graph to
+    notice changes made elsewhere.
+    """
+
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name="Версия",
+    )
+
+    objects = FriendshipVersionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Версия дружбы"
+        verbose_name_plural = "Версия дружбы"
+
+    def __str__(self) -> str:
+        return str(self.value)
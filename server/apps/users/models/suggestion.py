@@ -0,0 +1,49 @@
+from django.db import models
+
+
+class Suggestion(models.Model):
+    """Friend of friends of the user with the number of their mutual friends.
+
+    The friendship services keep the best ``SUGGESTIONS_PER_USER``
+    candidates of every user with their ``mutual_count`` up to date and
+    delete rows without mutual friends, so suggestions are read with one
+    index range scan instead of a two-hop join over the friendship edges.
+    """
+
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+        verbose_name="Пользователь",
+    )
+    candidate = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Кандидат",
+    )
+    mutual_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество общих друзей",
+    )
+
+    class Meta:
+        verbose_name = "Рекомендация"
+        verbose_name_plural = "Рекомендации"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "candidate"),
+                name="users_suggestion_unique_pair",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("user", "-mutual_count", "candidate"),
+                name="users_suggestion_rank_idx",
+                condition=models.Q(mutual_count__gt=0),
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.user_id}, {self.candidate_id}"
@@ -1,12 +1,27 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .friendship import Friendship
+
 
 class User(AbstractUser):
-    friends = models.ManyToManyField(
-        "users.User",
-        related_name="+",
-        verbose_name="Друзья",
+    friends_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество друзей",
+    )
+    incoming_invites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество входящих заявок",
+    )
+    outgoing_invites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество исходящих заявок",
+    )
+    # Bumped together with the counters, so clients polling the friend and
+    # invite lists can be answered with 304 Not Modified.
+    lists_version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Версия списков друзей и заявок",
     )
 
     class Meta:
@@ -15,3 +30,11 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return self.username
+
+    @property
+    def friends(self) -> models.QuerySet:
+        return User.objects.filter(id__in=Friendship.objects.friend_ids(self.id))
+
+    def mutual_friends(self, other: "User") -> models.QuerySet:
+        """Friends of both users, found by two semi-joins over the friendship edges."""
+        return self.friends.filter(id__in=Friendship.objects.friend_ids(other.id))
@@ -0,0 +1,8 @@
+from .prefix_index import PrefixIndex, get_prefix_index, reset_prefix_index, update_prefix_index
+
+__all__ = (
+    PrefixIndex,
+    get_prefix_index,
+    reset_prefix_index,
+    update_prefix_index,
+)
@@ -0,0 +1,116 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Optional
+
+from django.conf import settings
+
+from apps.core.constants import BATCH_SIZE
+from apps.core.reloading import BackgroundReload
+from apps.users.models import User
+
+SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+class PrefixIndex:
+    """Lowercased usernames, first and last names held in sorted lists.
+
+    Stands in for the prefix indexes of PostgreSQL on other databases.
+    Every field has its own list of ``(name, user id)`` pairs, so the
+    users whose name starts with a prefix are a contiguous run found by
+    binary search, in the same order as in PostgreSQL.
+    """
+
+    def __init__(self):
+        self._names = {field: [] for field in SEARCH_FIELDS}
+        self._users: dict[int, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> "PrefixIndex":
+        index = cls()
+        for user_id, *names in User.objects.values_list("id", *SEARCH_FIELDS).iterator(chunk_size=BATCH_SIZE):
+            names = tuple(name.lower() for name in names)
+            index._users[user_id] = names
+            for field, name in zip(SEARCH_FIELDS, names):
+                index._names[field].append((name, user_id))
+        for names in index._names.values():
+            names.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def search(self, field: str, prefix: str, limit: int) -> list[int]:
+        """Ids of up to ``limit`` users whose ``field`` starts with ``prefix`` given in lower case."""
+        # Updates insert into the same lists, the walk must not see one half done.
+        with self._lock:
+            names = self._names[field]
+            found = []
+            position = bisect_left(names, (prefix, 0))
+            while len(found) < limit and position < len(names) and names[position][0].startswith(prefix):
+                found.append(names[position][1])
+                position += 1
+        return found
+
+    def update(self, user_id: int, *names: str) -> None:
+        """Index the user under new names, replacing the old ones."""
+        names = tuple(name.lower() for name in names)
+        with self._lock:
+            self._remove(user_id)
+            self._users[user_id] = names
+            for field, name in zip(SEARCH_FIELDS, names):
+                insort(self._names[field], (name, user_id))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._remove(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        old_names = self._users.pop(user_id, None)
+        if old_names is None:
+            return
+        for field, name in zip(SEARCH_FIELDS, old_names):
+            names = self._names[field]
+            del names[bisect_left(names, (name, user_id))]
+
+
+# ``(user id, names)`` of committed names, ``None`` names for a removed user.
+Change = tuple[int, Optional[tuple[str, ...]]]
+
+
+def _apply(index: PrefixIndex, change: Change) -> None:
+    user_id, names = change
+    if names is None:
+        index.remove(user_id)
+    else:
+        index.update(user_id, *names)
+
+
+# Replaying a change the load already read sets the same names again.
+_index: BackgroundReload[PrefixIndex, Change] = BackgroundReload("prefix-index", PrefixIndex, apply=_apply)
+
+
+def get_prefix_index(load: bool = True) -> Optional[PrefixIndex]:
+    """Prefix index of this process, or ``None`` if it is not loaded and ``load`` is off.
+
+    Loaded on first use and kept current by the user signals of this
+    process. Changes made by other processes are picked up by reloading it
+    in a background thread every ``USER_SEARCH_INDEX_TTL`` seconds, while
+    searches keep reading the current one.
+    """
+    if not load:
+        return _index.value
+    return _index.get(settings.USER_SEARCH_INDEX_TTL)
+
+
+def update_prefix_index(user_id: int, names: Optional[tuple[str, ...]]) -> None:
+    """Apply committed names of a user to the index of this process, if it is loaded.
+
+    ``None`` names remove the user from the index.
+    """
+    _index.update((user_id, names))
+
+
+def reset_prefix_index() -> None:
+    """Drop the index of this process, it is loaded again on next use."""
+    _index.reset()
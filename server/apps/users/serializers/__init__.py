@@ -1,3 +1,13 @@
+from .friend_status import DistanceQuerySerializer, FriendStatusesQuerySerializer
+from .search import UserSearchQuerySerializer
+from .suggestion import SuggestionSerializer, SuggestionsQuerySerializer
 from .user import UserSerializer
 
-__all__ = (UserSerializer,)
+__all__ = (
+    DistanceQuerySerializer,
+    FriendStatusesQuerySerializer,
+    SuggestionSerializer,
+    SuggestionsQuerySerializer,
+    UserSearchQuerySerializer,
+    UserSerializer,
+)
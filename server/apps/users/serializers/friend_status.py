@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+MAX_FRIEND_STATUSES_IDS = 200
+DEFAULT_DISTANCE_DEPTH = 3
+MAX_DISTANCE_DEPTH = 6
+
+
+class FriendStatusesQuerySerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_FRIEND_STATUSES_IDS,
+    )
+
+
+class DistanceQuerySerializer(serializers.Serializer):
+    max_depth = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_DISTANCE_DEPTH,
+        default=DEFAULT_DISTANCE_DEPTH,
+    )
+    path = serializers.BooleanField(default=False)
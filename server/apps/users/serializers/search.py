@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Every page is ranked from the first result, so deep pages are not served.
+MAX_SEARCH_OFFSET = 1000
+
+
+class UserSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(
+        max_length=150,
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_SEARCH_LIMIT,
+        default=DEFAULT_SEARCH_LIMIT,
+    )
+    offset = serializers.IntegerField(
+        min_value=0,
+        max_value=MAX_SEARCH_OFFSET,
+        default=0,
+    )
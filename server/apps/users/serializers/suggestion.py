@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from apps.users.models import Suggestion
+from apps.users.serializers.user import UserSerializer
+
+DEFAULT_SUGGESTIONS_LIMIT = 20
+MAX_SUGGESTIONS_LIMIT = 100
+
+
+class SuggestionsQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_SUGGESTIONS_LIMIT,
+        default=DEFAULT_SUGGESTIONS_LIMIT,
+    )
+
+
+class SuggestionSerializer(serializers.ModelSerializer):
+    candidate = UserSerializer()
+
+    class Meta:
+        model = Suggestion
+        fields = (
+            "candidate",
+            "mutual_count",
+        )
@@ -14,6 +14,14 @@ class UserSerializer(serializers.ModelSerializer):
             "password",
             "first_name",
             "last_name",
+            "friends_count",
+            "incoming_invites_count",
+            "outgoing_invites_count",
+        )
+        read_only_fields = (
+            "friends_count",
+            "incoming_invites_count",
+            "outgoing_invites_count",
         )
 
     def create(self, validated_data):
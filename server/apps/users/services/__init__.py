@@ -0,0 +1,48 @@
+from .cache import (
+    get_friend_id_window,
+    get_friend_ids,
+    get_principal,
+    get_user_payloads,
+    invalidate_users,
+    user_cache_keys,
+)
+from .counters import actual_counters, change_pending_invites_counters, lists_changed, shift_counters
+from .distance import find_path
+from .friend_status import annotate_friend_status, get_friend_statuses, is_friend, resolve_friend_status
+from .friendship import add_friends, bulk_add_friends, lock_users, remove_friends
+from .search import search_users
+from .suggestions import (
+    get_suggestions,
+    iter_mutual_counts,
+    rebuild_suggestions,
+    rebuild_user_suggestions,
+    shift_mutual_counts,
+)
+
+__all__ = (
+    actual_counters,
+    add_friends,
+    annotate_friend_status,
+    bulk_add_friends,
+    change_pending_invites_counters,
+    find_path,
+    get_friend_id_window,
+    get_friend_ids,
+    get_friend_statuses,
+    get_principal,
+    get_suggestions,
+    get_user_payloads,
+    invalidate_users,
+    is_friend,
+    iter_mutual_counts,
+    lists_changed,
+    lock_users,
+    rebuild_suggestions,
+    rebuild_user_suggestions,
+    remove_friends,
+    resolve_friend_status,
+    search_users,
+    shift_counters,
+    shift_mutual_counts,
+    user_cache_keys,
+)
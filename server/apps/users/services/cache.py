@@ -0,0 +1,124 @@
+from typing import Iterable, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.serializers import ValuesSerializer
+from apps.users.graph import get_friend_graph
+from apps.users.models import Friendship, User
+from apps.users.serializers.user import UserSerializer
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"users:user:{user_id}"
+
+
+def friend_ids_cache_key(user_id: int, lists_version: int) -> str:
+    return f"users:friend-ids:{user_id}:{lists_version}"
+
+
+def principal_cache_key(user_id: int) -> str:
+    return f"users:principal:{user_id}"
+
+
+def user_cache_keys(user_ids: Iterable[int]) -> list[str]:
+    """Cache keys of the user payloads and principals."""
+    user_ids = list(user_ids)
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    keys += [principal_cache_key(user_id) for user_id in user_ids]
+    return keys
+
+
+def get_user_payloads(user_ids: Iterable[int]) -> dict[int, dict]:
+    """Serialized users by id, read through the cache.
+
+    Missing payloads are fetched in one query and cached for
+    ``USER_CACHE_TIMEOUT`` seconds. Unknown ids are left out.
+    """
+    keys = {user_cache_key(user_id): user_id for user_id in user_ids}
+    payloads = {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+    missing = [user_id for user_id in keys.values() if user_id not in payloads]
+    if missing:
+        serializer = ValuesSerializer.compile(UserSerializer)
+        fetched = {
+            payload["id"]: payload
+            for payload in serializer.to_representation(serializer.values(User.objects.filter(id__in=missing)))
+        }
+        cache.set_many(
+            {user_cache_key(user_id): payload for user_id, payload in fetched.items()},
+            settings.USER_CACHE_TIMEOUT,
+        )
+        payloads.update(fetched)
+    return payloads
+
+
+def get_principal(user_id: int) -> Optional[User]:
+    """User authenticating a request, read through the cache.
+
+    Cached for ``AUTH_CACHE_TIMEOUT`` seconds and dropped together with the
+    user payload, so saving the user, a new password or deactivation, and
+    every change of its lists version are seen by the next request.
+    """
+    if not settings.AUTH_CACHE_TIMEOUT:
+        return User.objects.filter(id=user_id).first()
+    key = principal_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def get_friend_ids(user_id: int, lists_version: int) -> Sequence[int]:
+    """Ascending ids of friends of the user at ``lists_version`` or later.
+
+    Read from the friend graph if it is enabled, otherwise through the
+    cache, which is filled with one query on a miss. Every friendship
+    change bumps the lists version and so moves the user to a new cache
+    key: a read that started before the change can only fill the key of
+    the old version, never the one an ETag of the new version refers to.
+    """
+    graph = get_friend_graph()
+    if graph is not None:
+        return graph.friend_ids(user_id)
+    key = friend_ids_cache_key(user_id, lists_version)
+    friend_ids = cache.get(key)
+    if friend_ids is None:
+        friend_ids = sorted(row["friend"] for row in Friendship.objects.friend_ids(user_id))
+        cache.set(key, friend_ids, settings.USER_CACHE_TIMEOUT)
+    return friend_ids
+
+
+def get_friend_id_window(
+    user: User,
+    lists_version: int,
+    position: Optional[int],
+    reverse: bool,
+    size: int,
+) -> Sequence[int]:
+    """Ascending friend ids of the user that hold the window of a page.
+
+    ``lists_version`` is the version of the user's lists read for the
+    ETag, see ``get_friend_ids``. See ``KeysetPagination.window_bounds``. Lists of users with up to
+    ``FRIEND_IDS_CACHE_MAX_DEGREE`` friends, or from the friend graph, are
+    returned whole. Bigger lists are never loaded at once: only the window
+    is read from the friendship indexes.
+    """
+    if get_friend_graph() is None and user.friends_count > settings.FRIEND_IDS_CACHE_MAX_DEGREE:
+        return Friendship.objects.friend_id_window(user.id, position, reverse, size)
+    return get_friend_ids(user.id, lists_version)
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    """Drop cached payloads of the users.
+
+    Inside a transaction the keys are dropped once it commits, so a read
+    made before the commit cannot put the old rows back. A read that
+    started before the commit and finished after it may still cache the old
+    payload, which then lives for ``USER_CACHE_TIMEOUT`` seconds at most.
+    """
+    keys = user_cache_keys(user_ids)
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,56 @@
+from typing import Iterable
+
+from django.db.models import Case, Count, F, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.friends.models import Invite
+from apps.users.models import Friendship, User
+from apps.users.services.cache import invalidate_users
+
+
+def change_pending_invites_counters(owner_id: int, target_id: int, delta: int) -> None:
+    """Shift pending invite counters of the invite owner and target by ``delta``."""
+    User.objects.filter(id__in=(owner_id, target_id)).update(
+        outgoing_invites_count=Case(
+            When(id=owner_id, then=Greatest(F("outgoing_invites_count") + delta, 0)),
+            default=F("outgoing_invites_count"),
+        ),
+        incoming_invites_count=Case(
+            When(id=target_id, then=Greatest(F("incoming_invites_count") + delta, 0)),
+            default=F("incoming_invites_count"),
+        ),
+        **lists_changed(),
+    )
+    invalidate_users((owner_id, target_id))
+
+
+def shift_counters(user_ids: Iterable[int], **deltas: int) -> None:
+    """Shift the given counters of every user in ``user_ids`` by the same deltas."""
+    changes = {name: Greatest(F(name) + delta, 0) for name, delta in deltas.items() if delta}
+    if changes:
+        User.objects.filter(id__in=user_ids).update(**changes, **lists_changed())
+        invalidate_users(user_ids)
+
+
+def lists_changed() -> dict:
+    """Update arguments that mark friend and invite lists of the updated users as changed."""
+    return {"lists_version": F("lists_version") + 1}
+
+
+def actual_counters() -> dict:
+    """Expressions recomputing every counter from the source tables."""
+    return {
+        "friends_count": (
+            _count(Friendship.objects.filter(user=OuterRef("pk")), "user")
+            + _count(Friendship.objects.filter(friend=OuterRef("pk")), "friend")
+        ),
+        "incoming_invites_count": _count(Invite.objects.filter(target=OuterRef("pk"), is_accept=None), "target"),
+        "outgoing_invites_count": _count(Invite.objects.filter(owner=OuterRef("pk"), is_accept=None), "owner"),
+    }
+
+
+def _count(queryset, group_by: str) -> Coalesce:
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(count=Count("*")).values("count")),
+        0,
+    )
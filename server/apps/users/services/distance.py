@@ -0,0 +1,88 @@
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from apps.users.graph import get_friend_graph
+from apps.users.models import Friendship
+
+# Frontier ids sent to the database in one query.
+FRONTIER_BATCH_SIZE = 5_000
+
+
+def find_path(
+    user_id: int,
+    target_id: int,
+    max_depth: int,
+    max_edges: Optional[int] = None,
+) -> tuple[Optional[list[int]], bool]:
+    """One shortest chain of friends from the user to the target, both included.
+
+    Runs a bidirectional breadth-first search that always expands the
+    smaller frontier, one whole level per query batch, so a hub user on
+    one side does not make the other side explode. Return the chain, or
+    ``None`` if the users are more than ``max_depth`` friendships apart,
+    and whether the search gave up without an answer after reading
+    ``max_edges`` (``DISTANCE_MAX_EDGES`` by default) friendships.
+    """
+    if user_id == target_id:
+        return [user_id], False
+    budget = settings.DISTANCE_MAX_EDGES if max_edges is None else max_edges
+    parents = ({user_id: None}, {target_id: None})
+    frontiers = [[user_id], [target_id]]
+    for _ in range(max_depth):
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        visited, other_visited = parents[side], parents[1 - side]
+        frontier = []
+        # One friendship more than the budget is read to tell that it ran out.
+        for node_id, friend_id in _expand(frontiers[side], budget + 1):
+            budget -= 1
+            if budget < 0:
+                return None, True
+            if friend_id in visited:
+                continue
+            visited[friend_id] = node_id
+            if friend_id in other_visited:
+                return _chain(parents[0], friend_id)[::-1] + _chain(parents[1], friend_id)[1:], False
+            frontier.append(friend_id)
+        if not frontier:
+            return None, False
+        frontiers[side] = frontier
+    return None, False
+
+
+def _expand(node_ids: list[int], limit: int) -> Iterator[tuple[int, int]]:
+    """Yield ``(node, friend)`` for every friend of every node.
+
+    At most ``limit`` friendships are read from the database.
+    """
+    graph = get_friend_graph()
+    if graph is not None:
+        for node_id in node_ids:
+            for friend_id in graph.friend_ids(node_id):
+                yield node_id, friend_id
+        return
+    for start in range(0, len(node_ids), FRONTIER_BATCH_SIZE):
+        if limit <= 0:
+            return
+        batch = node_ids[start:start + FRONTIER_BATCH_SIZE]
+        edges = Friendship.objects.filter(Q(user__in=batch) | Q(friend__in=batch)).values_list("user", "friend")
+        edges = list(edges[:limit])
+        limit -= len(edges)
+        yield from _directed(edges, set(batch))
+
+
+def _directed(edges: Iterable[tuple[int, int]], node_ids: set[int]) -> Iterator[tuple[int, int]]:
+    for low, high in edges:
+        if low in node_ids:
+            yield low, high
+        if high in node_ids:
+            yield high, low
+
+
+def _chain(parents: dict[int, Optional[int]], node_id: Optional[int]) -> list[int]:
+    chain = []
+    while node_id is not None:
+        chain.append(node_id)
+        node_id = parents[node_id]
+    return chain
@@ -0,0 +1,83 @@
+from typing import Iterable
+
+from django.db.models import Exists, OuterRef, QuerySet, Value
+
+from apps.friends.models import Invite
+from apps.users.constants import FriendStatuses
+from apps.users.graph import get_friend_graph
+from apps.users.models import Friendship, User
+
+
+def annotate_friend_status(queryset: QuerySet, viewer: User, use_graph: bool = True) -> QuerySet:
+    """Annotate users with friendship flags relative to ``viewer``.
+
+    All flags are computed with ``EXISTS`` subqueries, so fetching a user
+    together with its status costs a single round-trip. When the friend
+    graph is enabled and ``use_graph`` is set, friendship is looked up in
+    the graph instead; read it with ``is_friend``.
+    """
+    annotations = {
+        "has_incoming_invite": Exists(
+            Invite.objects.filter(
+                owner=OuterRef("pk"),
+                target=viewer,
+                is_accept=None,
+            ),
+        ),
+        "has_outgoing_invite": Exists(
+            Invite.objects.filter(
+                owner=viewer,
+                target=OuterRef("pk"),
+                is_accept=None,
+            ),
+        ),
+    }
+    if not use_graph or get_friend_graph() is None:
+        annotations["is_friend"] = Exists(Friendship.objects.between(Value(viewer.id), OuterRef("pk")))
+    return queryset.annotate(**annotations)
+
+
+def is_friend(viewer: User, user: User) -> bool:
+    """Whether a user fetched with ``annotate_friend_status`` is a friend of ``viewer``."""
+    if hasattr(user, "is_friend"):
+        return user.is_friend
+    return get_friend_graph().is_friend(viewer.id, user.id)
+
+
+def resolve_friend_status(viewer: User, user: User) -> str:
+    """Map flags added by ``annotate_friend_status`` to ``FriendStatuses``."""
+    return _status_from_flags(
+        is_friend(viewer, user),
+        user.has_incoming_invite,
+        user.has_outgoing_invite,
+    )
+
+
+def get_friend_statuses(viewer: User, ids: Iterable[int]) -> dict[int, str]:
+    """Resolve statuses of many users relative to ``viewer`` in one query.
+
+    Unknown ids and the viewer itself are left out of the result.
+    """
+    graph = get_friend_graph()
+    rows = annotate_friend_status(
+        User.objects.filter(id__in=ids).exclude(id=viewer.id),
+        viewer,
+    )
+    if graph is None:
+        rows = rows.values_list("id", "is_friend", "has_incoming_invite", "has_outgoing_invite")
+    else:
+        rows = (
+            (user_id, graph.is_friend(viewer.id, user_id), *flags)
+            for user_id, *flags in rows.values_list("id", "has_incoming_invite", "has_outgoing_invite")
+        )
+    return {user_id: _status_from_flags(*flags) for user_id, *flags in rows}
+
+
+def _status_from_flags(is_friend: bool, has_incoming_invite: bool, has_outgoing_invite: bool) -> str:
+    if is_friend:
+        return FriendStatuses.IS_FRIENDS
+    if has_incoming_invite:
+        return FriendStatuses.IS_INCOMING
+    if has_outgoing_invite:
+        return FriendStatuses.IS_OUTGOING
+    return FriendStatuses.NOT_FRIENDS
@@ -0,0 +1,106 @@
+from typing import Collection, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.dispatch import Signal
+
+from apps.events.constants import EventTypes
+from apps.events.services import record_event
+from apps.users.models import Friendship, FriendshipVersion, User
+from apps.users.services.counters import lists_changed, shift_counters
+from apps.users.services.suggestions import shift_mutual_counts
+from apps.users.signals import friends_added, friends_removed
+
+
+def lock_users(*ids: int) -> None:
+    """Serialize friendship changes of the given users until the transaction ends.
+
+    Rows are locked in id order, so concurrent operations on the same pair
+    cannot deadlock. ``FOR NO KEY UPDATE`` does not conflict with the key
+    share locks that inserts referencing these users take.
+    """
+    list(User.objects.select_for_update(no_key=True).filter(id__in=ids).order_by("id").values_list("id"))
+
+
+def add_friends(user: User, other: User) -> bool:
+    """Make two users friends. Return ``False`` if they already were."""
+    with transaction.atomic(savepoint=False):
+        lock_users(user.id, other.id)
+        if Friendship.objects.between(user.id, other.id).exists():
+            return False
+        shift_mutual_counts(user.id, (other.id,), 1)
+        Friendship.objects.create(user_id=min(user.id, other.id), friend_id=max(user.id, other.id))
+        User.objects.filter(id__in=(user.id, other.id)).update(
+            friends_count=F("friends_count") + 1,
+            **lists_changed(),
+        )
+        record_event(EventTypes.FRIENDS_ADDED, user=user.id, friends=[other.id])
+        _send_on_commit(friends_added, user, [other.id], _bump_version(user))
+    return True
+
+
+def bulk_add_friends(user: User, other_ids: Collection[int]) -> list[int]:
+    """Make the user friends with every user in ``other_ids`` in a fixed number of queries.
+
+    Return ids of the new friends, skipping users who already were friends.
+    """
+    with transaction.atomic(savepoint=False):
+        lock_users(user.id, *other_ids)
+        existing = set(
+            Friendship.objects.filter(
+                Q(user=user.id, friend__in=other_ids) | Q(user__in=other_ids, friend=user.id),
+            ).values_list("user", "friend"),
+        )
+        added = [
+            other_id for other_id in other_ids
+            if (min(user.id, other_id), max(user.id, other_id)) not in existing
+        ]
+        shift_mutual_counts(user.id, added, 1)
+        Friendship.objects.bulk_create(
+            Friendship(user_id=min(user.id, other_id), friend_id=max(user.id, other_id))
+            for other_id in added
+        )
+        shift_counters(added, friends_count=1)
+        shift_counters((user.id,), friends_count=len(added))
+        if added:
+            record_event(EventTypes.FRIENDS_ADDED, user=user.id, friends=added)
+            _send_on_commit(friends_added, user, added, _bump_version(user))
+    return added
+
+
+def remove_friends(user: User, other: User) -> bool:
+    """Break friendship of two users. Return ``False`` if they were not friends."""
+    with transaction.atomic(savepoint=False):
+        lock_users(user.id, other.id)
+        deleted, _ = Friendship.objects.between(user.id, other.id).delete()
+        if not deleted:
+            return False
+        shift_mutual_counts(user.id, (other.id,), -1)
+        User.objects.filter(id__in=(user.id, other.id)).update(
+            friends_count=Greatest(F("friends_count") - 1, 0),
+            **lists_changed(),
+        )
+        record_event(EventTypes.FRIENDS_REMOVED, user=user.id, friends=[other.id])
+        _send_on_commit(friends_removed, user, [other.id], _bump_version(user))
+    return True
+
+
+def _bump_version(user: User) -> Optional[tuple[int, int]]:
+    """New friendship version of the shard of the user when the friend graph is enabled.
+
+    Taken last, so the version row is locked for the shortest time.
+    """
+    return FriendshipVersion.objects.bump(user.id) if settings.FRIEND_GRAPH_ENABLED else None
+
+
+def _send_on_commit(
+    signal: Signal,
+    user: User,
+    friend_ids: list[int],
+    version: Optional[tuple[int, int]],
+) -> None:
+    transaction.on_commit(
+        lambda: signal.send(sender=Friendship, user_id=user.id, friend_ids=friend_ids, version=version),
+    )
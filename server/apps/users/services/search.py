@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+from django.db import connection
+
+from apps.users.search import get_prefix_index
+from apps.users.search.prefix_index import SEARCH_FIELDS
+
+# Shorter queries have too few trigrams to be matched by similarity.
+FUZZY_MIN_LENGTH = 3
+
+PREFIX_SQL = """
+    SELECT id FROM users_user
+    WHERE lower({field}) COLLATE "C" LIKE %s
+    ORDER BY lower({field}) COLLATE "C", id
+    LIMIT %s
+"""
+# The expression must stay the same as in the trigram index.
+FUZZY_SQL = """
+    SELECT id FROM users_user
+    WHERE %s <%% lower(username || ' ' || first_name || ' ' || last_name)
+    ORDER BY %s <<-> lower(username || ' ' || first_name || ' ' || last_name)
+    LIMIT %s
+"""
+
+
+@lru_cache(maxsize=None)
+def has_trigram_search() -> bool:
+    """Whether the pg_trgm extension is installed in the database."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_users(query: str, limit: int) -> list[int]:
+    """Ids of up to ``limit`` users matching the query, best matches first.
+
+    Users whose username starts with the query come first, then users
+    whose first name and then last name does, each group in alphabetical
+    order. On PostgreSQL with pg_trgm the rest is filled with users whose
+    names contain a word similar to the query, nearest first. Every step is one index
+    scan that stops after ``limit`` rows, and the next step is skipped once
+    enough users are found.
+    """
+    query = query.strip().lower()
+    found = {}
+    if connection.vendor == "postgresql":
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with connection.cursor() as cursor:
+            for field in SEARCH_FIELDS:
+                cursor.execute(PREFIX_SQL.format(field=field), (pattern, limit))
+                found.update(dict.fromkeys(user_id for user_id, in cursor.fetchall()))
+                if len(found) >= limit:
+                    break
+            else:
+                if len(query) >= FUZZY_MIN_LENGTH and has_trigram_search():
+                    cursor.execute(FUZZY_SQL, (query, query, limit))
+                    found.update(dict.fromkeys(user_id for user_id, in cursor.fetchall()))
+    else:
+        index = get_prefix_index()
+        for field in SEARCH_FIELDS:
+            found.update(dict.fromkeys(index.search(field, query, limit)))
+            if len(found) >= limit:
+                break
+    return list(found)[:limit]
@@ -0,0 +1,234 @@
+import heapq
+from collections import Counter, defaultdict
+from typing import Collection, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, QuerySet, Value, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, RowNumber
+
+from apps.core.constants import BATCH_SIZE
+from apps.events.constants import EventTypes
+from apps.events.services import record_event
+from apps.friends.models import Invite
+from apps.users.models import Friendship, Suggestion, User
+
+
+def shift_mutual_counts(user_id: int, other_ids: Collection[int], delta: int) -> None:
+    """Update suggestions after friendships of the user with ``other_ids`` are added or removed.
+
+    ``delta`` is 1 for added and -1 for removed friendships. Must be called
+    with all these users locked while the friendships are absent: before
+    they are added or after they are removed.
+
+    Rows that drop to zero are deleted, and users who got new rows are
+    trimmed to their best ``SUGGESTIONS_PER_USER`` candidates. A candidate
+    trimmed away earlier comes back with only the mutual friends added
+    since, so counts outside the best ones are lower bounds until
+    ``rebuild_suggestions``.
+
+    A change that reads or shifts more than ``SUGGESTIONS_MAX_FAN_OUT``
+    rows is not applied here. It is recorded in the outbox instead and the
+    relay recomputes suggestions of these users with
+    ``rebuild_user_suggestions``.
+    """
+    if not other_ids:
+        return
+    other_ids = set(other_ids)
+    friend_ids = []
+    # How many of the other users each of their friends becomes a mutual friend with the user through.
+    through = Counter()
+    edges = Friendship.objects.filter(Q(user__in=(user_id, *other_ids)) | Q(friend__in=(user_id, *other_ids)))
+    edges = list(edges.values_list("user", "friend")[:settings.SUGGESTIONS_MAX_FAN_OUT + 1])
+    for low, high in edges:
+        for source, target in ((low, high), (high, low)):
+            if source == user_id:
+                friend_ids.append(target)
+            elif source in other_ids:
+                through[target] += 1
+    fan_out = 2 * (len(through) + len(other_ids) * (len(friend_ids) + len(other_ids)))
+    if max(len(edges), fan_out) > settings.SUGGESTIONS_MAX_FAN_OUT:
+        record_event(EventTypes.SUGGESTIONS_STALE, users=[user_id, *sorted(other_ids)])
+        return
+
+    # Each other user gets the user's current friends and the rest of the
+    # other users as mutual friends; the user gets the friends of the
+    # other users with the multiplicity counted above.
+    by_multiplicity = defaultdict(list)
+    for candidate_id, multiplicity in through.items():
+        by_multiplicity[multiplicity].append(candidate_id)
+    shifted = defaultdict(Q)
+    shifted[delta] |= Q(user__in=other_ids, candidate__in=(*friend_ids, *other_ids))
+    shifted[delta] |= Q(user__in=(*friend_ids, *other_ids), candidate__in=other_ids)
+    for multiplicity, candidate_ids in by_multiplicity.items():
+        shifted[delta * multiplicity] |= Q(user=user_id, candidate__in=candidate_ids)
+        shifted[delta * multiplicity] |= Q(user__in=candidate_ids, candidate=user_id)
+
+    if delta > 0:
+        rows = sorted(
+            {(user_id, candidate_id) for candidate_id in through}
+            | {(candidate_id, user_id) for candidate_id in through}
+            | {
+                (other_id, candidate_id)
+                for other_id in other_ids
+                for candidate_id in (*friend_ids, *other_ids)
+                if candidate_id != other_id
+            }
+            | {
+                (candidate_id, other_id)
+                for other_id in other_ids
+                for candidate_id in friend_ids
+            },
+        )
+        Suggestion.objects.bulk_create(
+            (Suggestion(user_id=user, candidate_id=candidate) for user, candidate in rows),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+    # Rows are locked in id order, so concurrent updates of overlapping
+    # suggestions cannot deadlock.
+    touched = Q()
+    for condition in shifted.values():
+        touched |= condition
+    list(Suggestion.objects.select_for_update().filter(touched).order_by("id").values_list("id"))
+    for shift, condition in shifted.items():
+        Suggestion.objects.filter(condition).update(mutual_count=Greatest(F("mutual_count") + shift, 0))
+    if delta > 0:
+        trim_suggestions({user for user, _ in rows})
+    else:
+        Suggestion.objects.filter(touched, mutual_count=0).delete()
+
+
+def trim_suggestions(user_ids: Collection[int]) -> None:
+    """Delete suggestions of the users beyond the best ``SUGGESTIONS_PER_USER`` of each, in one query.
+
+    Rows locked by other transactions are skipped, a later change of these
+    users trims them.
+    """
+    if not user_ids:
+        return
+    ranked = Suggestion.objects.filter(user__in=user_ids).annotate(
+        place=Window(
+            RowNumber(),
+            partition_by=F("user"),
+            order_by=(F("mutual_count").desc(), F("candidate").asc()),
+        ),
+    )
+    sql, params = ranked.values("id", "place").query.sql_with_params()
+    beyond = RawSQL(f"SELECT id FROM ({sql}) ranked WHERE place > %s", (*params, settings.SUGGESTIONS_PER_USER))
+    Suggestion.objects.filter(
+        id__in=Suggestion.objects.select_for_update(skip_locked=True).filter(id__in=beyond).values("id"),
+    ).delete()
+
+
+def get_suggestions(user: User, limit: int) -> QuerySet:
+    """Best friend suggestions for the user ranked by the number of mutual friends.
+
+    Friends and users with a pending invite in either direction are skipped.
+    """
+    return (
+        Suggestion.objects
+        .filter(user=user, mutual_count__gt=0)
+        .filter(~Exists(Friendship.objects.between(Value(user.id), OuterRef("candidate"))))
+        .filter(~Exists(Invite.objects.filter(owner=user, target=OuterRef("candidate"), is_accept=None)))
+        .filter(~Exists(Invite.objects.filter(owner=OuterRef("candidate"), target=user, is_accept=None)))
+        .select_related("candidate")
+        .order_by("-mutual_count", "candidate")[:limit]
+    )
+
+
+def iter_mutual_counts(
+    edges: Iterable[tuple[int, int]],
+    limit: Optional[int] = None,
+) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(user, candidate, mutual_count)`` of every pair with common friends.
+
+    Only the best ``limit`` candidates of every user are yielded if it is
+    given. The whole friend graph is held in memory while counting.
+    """
+    friends = defaultdict(list)
+    for user_id, friend_id in edges:
+        friends[user_id].append(friend_id)
+        friends[friend_id].append(user_id)
+    for user_id, user_friends in friends.items():
+        counts = Counter(candidate_id for friend_id in user_friends for candidate_id in friends[friend_id])
+        del counts[user_id]
+        for candidate_id, mutual_count in (counts.items() if limit is None else _best(counts, limit)):
+            yield user_id, candidate_id, mutual_count
+
+
+def rebuild_user_suggestions(user_ids: Iterable[int]) -> None:
+    """Recompute suggestions of the users, and of every user towards them, from the friendship edges.
+
+    Mutual friends of a pair are the same in both directions, so the rows
+    of both directions get one count. Each user keeps its best
+    ``SUGGESTIONS_PER_USER`` candidates. Rows are inserted and locked in the
+    same order as by ``shift_mutual_counts``. A friendship of two friends
+    of a user committed while its suggestions are recomputed may be lost
+    until ``rebuild_suggestions``.
+    """
+    for user_id in sorted(set(user_ids)):
+        friend_ids = {
+            high if low == user_id else low
+            for low, high in Friendship.objects.of(user_id).values_list("user", "friend")
+        }
+        mutual_counts = Counter()
+        edges = Friendship.objects.filter(Q(user__in=friend_ids) | Q(friend__in=friend_ids))
+        for low, high in edges.values_list("user", "friend").iterator(chunk_size=BATCH_SIZE):
+            for source, target in ((low, high), (high, low)):
+                if source in friend_ids and target != user_id:
+                    mutual_counts[target] += 1
+        best = dict(_best(mutual_counts))
+        by_count = defaultdict(list)
+        for candidate_id, mutual_count in mutual_counts.items():
+            by_count[mutual_count].append(candidate_id)
+
+        with transaction.atomic():
+            Suggestion.objects.bulk_create(
+                (
+                    Suggestion(user_id=user, candidate_id=candidate)
+                    for user, candidate in sorted(
+                        {(user_id, candidate_id) for candidate_id in best}
+                        | {(candidate_id, user_id) for candidate_id in mutual_counts},
+                    )
+                ),
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            rows = Suggestion.objects.filter(Q(user=user_id) | Q(candidate=user_id))
+            list(rows.select_for_update().order_by("id").values_list("id"))
+            rows.filter(user=user_id).exclude(candidate__in=best).delete()
+            rows.filter(candidate=user_id).exclude(user__in=mutual_counts).delete()
+            for mutual_count, candidate_ids in by_count.items():
+                rows.filter(Q(user__in=candidate_ids) | Q(candidate__in=candidate_ids)).update(
+                    mutual_count=mutual_count,
+                )
+            trim_suggestions(list(mutual_counts))
+
+
+def rebuild_suggestions() -> int:
+    """Recompute the best suggestions of every user from the friendship edges.
+
+    Return the number of suggestions.
+    """
+    edges = Friendship.objects.values_list("user", "friend").iterator(chunk_size=BATCH_SIZE)
+    created = 0
+    with transaction.atomic():
+        Suggestion.objects.all().delete()
+        batch = []
+        for user_id, candidate_id, mutual_count in iter_mutual_counts(edges, settings.SUGGESTIONS_PER_USER):
+            batch.append(Suggestion(user_id=user_id, candidate_id=candidate_id, mutual_count=mutual_count))
+            if len(batch) == BATCH_SIZE:
+                Suggestion.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        Suggestion.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def _best(counts: Counter, limit: Optional[int] = None) -> list[tuple[int, int]]:
+    """Best ``(candidate, mutual_count)`` pairs, most mutual friends first, then by candidate id."""
+    limit = settings.SUGGESTIONS_PER_USER if limit is None else limit
+    return heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,17 @@
+from .friend_graph import add_friends_to_graph, remove_friends_from_graph
+from .friendship import friends_added, friends_removed
+from .suggestions import rebuild_stale_suggestions
+from .user_cache import invalidate_friends_cache, invalidate_user_cache
+from .user_search import index_user_names, unindex_user_names
+
+__all__ = (
+    add_friends_to_graph,
+    friends_added,
+    friends_removed,
+    index_user_names,
+    invalidate_friends_cache,
+    invalidate_user_cache,
+    rebuild_stale_suggestions,
+    remove_friends_from_graph,
+    unindex_user_names,
+)
@@ -0,0 +1,14 @@
+from django.dispatch import receiver
+
+from apps.users.graph import update_friend_graph
+from apps.users.signals.friendship import friends_added, friends_removed
+
+
+@receiver(friends_added)
+def add_friends_to_graph(user_id, friend_ids, version=None, **kwargs) -> None:
+    update_friend_graph(True, user_id, friend_ids, version)
+
+
+@receiver(friends_removed)
+def remove_friends_from_graph(user_id, friend_ids, version=None, **kwargs) -> None:
+    update_friend_graph(False, user_id, friend_ids, version)
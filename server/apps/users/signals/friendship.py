@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent after the transaction that added or removed friendships of the user
+# with ``friend_ids`` is committed. ``version`` is the shard and friendship
+# version set by the transaction, ``None`` while the friend graph is disabled.
+friends_added = Signal()
+friends_removed = Signal()
@@ -0,0 +1,17 @@
+from django.dispatch import receiver
+
+from apps.events.constants import EventTypes
+from apps.events.models import OutboxEvent
+from apps.events.signals import events_relayed
+from apps.users.services.suggestions import rebuild_user_suggestions
+
+
+@receiver(events_relayed)
+def rebuild_stale_suggestions(events: list[OutboxEvent], **kwargs) -> None:
+    user_ids = {
+        user_id
+        for event in events if event.event_type == EventTypes.SUGGESTIONS_STALE
+        for user_id in event.payload["users"]
+    }
+    if user_ids:
+        rebuild_user_suggestions(user_ids)
@@ -0,0 +1,21 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.models import User
+from apps.users.services.cache import invalidate_users, user_cache_keys
+from apps.users.signals.friendship import friends_added, friends_removed
+
+
+@receiver(friends_added)
+@receiver(friends_removed)
+def invalidate_friends_cache(user_id, friend_ids, **kwargs) -> None:
+    # Friendship signals are sent after the commit already. Friend ids are
+    # cached under the lists version, which the change has bumped.
+    cache.delete_many(user_cache_keys((user_id, *friend_ids)))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(instance, **kwargs) -> None:
+    invalidate_users((instance.id,))
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.models import User
+from apps.users.search import get_prefix_index, update_prefix_index
+
+
+@receiver(post_save, sender=User)
+def index_user_names(instance, **kwargs) -> None:
+    if get_prefix_index(load=False) is not None:
+        user_id, names = instance.id, (instance.username, instance.first_name, instance.last_name)
+        transaction.on_commit(lambda: update_prefix_index(user_id, names))
+
+
+@receiver(post_delete, sender=User)
+def unindex_user_names(instance, **kwargs) -> None:
+    if get_prefix_index(load=False) is not None:
+        user_id = instance.id
+        transaction.on_commit(lambda: update_prefix_index(user_id, None))
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.views import async_view
+from apps.friends.factories import InviteFactory
+from apps.users.factories import UserFactory
+from apps.users.services import add_friends
+from apps.users.viewsets import UserViewSet
+
+COUNT_USERS = 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_match_sync_views() -> None:
+    """Тест на совпадение ответов асинхронных и синхронных представлений."""
+    user, *others = UserFactory.create_batch(size=COUNT_USERS)
+    add_friends(user, others[0])
+    add_friends(user, others[1])
+    InviteFactory(owner=others[2], target=user)
+    InviteFactory(owner=user, target=others[3])
+    factory = APIRequestFactory()
+    cases = (
+        ("friends_list", {}, {}),
+        ("incoming_invites", {}, {}),
+        ("outgoing_invites", {}, {}),
+        ("get_friend_status", {}, {"pk": others[2].id}),
+        ("get_friend_statuses", {"ids": [other.id for other in others]}, {}),
+    )
+    for action, query, kwargs in cases:
+        view = UserViewSet.as_view({"get": action}, detail="pk" in kwargs)
+        responses = []
+        for handler in (view, async_to_sync(async_view(view))):
+            request = factory.get("/", data=query)
+            force_authenticate(request, user=user)
+            response = handler(request, **kwargs)
+            response.render()
+            responses.append(response)
+        sync_response, async_response = responses
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.content == sync_response.content
+
+    view = UserViewSet.as_view({"get": "friends_list"})
+    request = factory.get("/")
+    force_authenticate(request, user=user)
+    request = factory.get("/", HTTP_IF_NONE_MATCH=view(request)["ETag"])
+    force_authenticate(request, user=user)
+    assert async_to_sync(async_view(view))(request).status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_run_in_parallel() -> None:
+    """Тест на параллельное выполнение асинхронных представлений."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def view(request):
+        # Fails with BrokenBarrierError unless both requests wait at once.
+        barrier.wait()
+        return HttpResponse(threading.current_thread().name)
+
+    async def main():
+        return await asyncio.gather(async_view(view)(None), async_view(view)(None))
+
+    first, second = asyncio.run(main())
+    assert first.content != second.content
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse_lazy
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.authentication import get_access_token
+from apps.users.factories import UserFactory
+from apps.users.factories.user import PASSWORD
+
+pytestmark = pytest.mark.django_db
+
+
+def obtain_token(api_client, user) -> str:
+    response = api_client.post(reverse_lazy("api:token_obtain_pair"), {"username": user.username, "password": PASSWORD})
+    return response.data["access"]
+
+
+def test_cached_jwt_authentication(api_client, django_assert_num_queries, django_capture_on_commit_callbacks) -> None:
+    """Тест на аутентификацию по JWT через кэш пользователей."""
+    user = UserFactory.create()
+    user.set_password(PASSWORD)
+    user.save()
+    api_client.credentials(HTTP_AUTHORIZATION=f"JWT {obtain_token(api_client, user)}")
+
+    url = reverse_lazy("api:users-friends")
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    # Only the lists version for the ETag is read from the database.
+    with django_assert_num_queries(1):
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.set_password(f"new-{PASSWORD}")
+        user.save()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(user)}")
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    api_client.credentials(HTTP_AUTHORIZATION=f"JWT {get_access_token(user)}")
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_cached_session_authentication(
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+) -> None:
+    """Тест на аутентификацию по сессии через кэш пользователей."""
+    user = UserFactory.create()
+    user.set_password(PASSWORD)
+    user.save()
+    assert api_client.login(username=user.username, password=PASSWORD)
+
+    url = reverse_lazy("api:users-friends")
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    # Only the lists version for the ETag is read from the database.
+    with django_assert_num_queries(1):
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.set_password(f"new-{PASSWORD}")
+        user.save()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,171 @@
+import time
+
+import pytest
+from django.urls import reverse_lazy
+from rest_framework import status
+
+from apps.friends.factories import InviteFactory
+from apps.users.constants import FriendStatuses
+from apps.users.factories import UserFactory
+from apps.users.graph import FriendGraph, get_friend_graph, reset_friend_graph
+from apps.users.models import Friendship, FriendshipVersion
+from apps.users.services import add_friends, bulk_add_friends, find_path, remove_friends
+
+pytestmark = pytest.mark.django_db
+COUNT_USERS = 5
+COUNT_USERS_FRIENDS = 2
+
+
+@pytest.fixture
+def friend_graph(settings):
+    settings.FRIEND_GRAPH_ENABLED = True
+    # A reload thread would not see the data of the test transaction.
+    settings.FRIEND_GRAPH_CHECK_INTERVAL = 3600
+    reset_friend_graph()
+    yield
+    reset_friend_graph()
+
+
+def test_load_friend_graph() -> None:
+    """Тест на загрузку графа друзей из базы данных."""
+    users = UserFactory.create_batch(size=COUNT_USERS)
+    for user in users[1:]:
+        add_friends(users[0], user)
+    add_friends(users[4], users[1])
+    add_friends(users[2], users[1])
+
+    graph = FriendGraph.load()
+    assert list(graph.friend_ids(users[0].id)) == [user.id for user in users[1:]]
+    assert list(graph.friend_ids(users[1].id)) == [users[0].id, users[2].id, users[4].id]
+    assert graph.degree(users[4].id) == 2
+    assert graph.is_friend(users[1].id, users[4].id)
+    assert graph.is_friend(users[4].id, users[1].id)
+    assert not graph.is_friend(users[2].id, users[3].id)
+    assert graph.mutual_friend_ids(users[0].id, users[1].id) == [users[2].id, users[4].id]
+
+
+def test_update_friend_graph() -> None:
+    """Тест на изменение графа друзей."""
+    graph = FriendGraph()
+    graph.add_friends(5, [9, 1, 7])
+    graph.add_friends(1, [7])
+    assert list(graph.friend_ids(5)) == [1, 7, 9]
+    assert list(graph.friend_ids(7)) == [1, 5]
+    graph.remove_friends(5, [1, 9])
+    assert list(graph.friend_ids(5)) == [7]
+    assert list(graph.friend_ids(9)) == []
+    assert len(graph) == 3
+    graph.add_friends(5, [7, 3])
+    graph.remove_friends(5, [4])
+    assert list(graph.friend_ids(5)) == [3, 7]
+    assert list(graph.friend_ids(7)) == [1, 5]
+
+
+def test_friend_graph_versions() -> None:
+    """Тест на то, что версия шарда в графе растет только без пропусков."""
+    graph = FriendGraph(versions={1: 2})
+    graph.add_friends(1, [2], version=(1, 3))
+    graph.add_friends(1, [3], version=(2, 1))
+    assert graph.versions == {1: 3, 2: 1}
+    graph.remove_friends(1, [2], version=(1, 5))
+    graph.add_friends(2, [3], version=(2, 2))
+    assert graph.versions == {1: 3, 2: 2}
+
+
+def test_friend_graph_follows_friendships(friend_graph, django_capture_on_commit_callbacks) -> None:
+    """Тест на обновление графа друзей после изменения дружбы."""
+    user1, user2, user3 = UserFactory.create_batch(size=3)
+    graph = get_friend_graph()
+    with django_capture_on_commit_callbacks(execute=True):
+        add_friends(user1, user2)
+        bulk_add_friends(user3, [user1.id, user2.id])
+    assert list(graph.friend_ids(user1.id)) == [user2.id, user3.id]
+    with django_capture_on_commit_callbacks(execute=True):
+        remove_friends(user2, user1)
+    assert list(graph.friend_ids(user1.id)) == [user3.id]
+    assert graph.mutual_friend_ids(user1.id, user2.id) == [user3.id]
+
+
+def test_friend_graph_endpoints(friend_graph, api_client) -> None:
+    """Тест на эндпоинты, которые читают дружбу из графа друзей."""
+    user, other = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends:
+        add_friends(user, friend)
+    for friend in friends[1:4]:
+        add_friends(other, friend)
+    InviteFactory.create(owner=user, target=other)
+    api_client.force_authenticate(user=user)
+
+    ids = []
+    url = reverse_lazy("api:users-friends")
+    data = {"page_size": COUNT_USERS_FRIENDS}
+    while url:
+        response = api_client.get(url, data=data)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(map(lambda x: x["id"], response.data["results"]))
+        previous, url, data = response.data["previous"], response.data["next"], None
+    assert ids == list(map(lambda x: x.id, friends))
+    response = api_client.get(previous)
+    assert list(map(lambda x: x["id"], response.data["results"])) == [friends[2].id, friends[3].id]
+
+    response = api_client.get(reverse_lazy("api:users-mutual-friends", kwargs={"pk": other.id}))
+    assert response.data["count"] == 3
+    assert list(map(lambda x: x["id"], response.data["results"])) == list(map(lambda x: x.id, friends[1:4]))
+
+    response = api_client.get(reverse_lazy("api:users-friend-status", kwargs={"pk": friends[0].id}))
+    assert response.data["status"] == FriendStatuses.IS_FRIENDS
+    response = api_client.get(
+        reverse_lazy("api:users-friend-statuses"),
+        data={"ids": [friends[0].id, other.id]},
+    )
+    assert response.data == {friends[0].id: FriendStatuses.IS_FRIENDS, other.id: FriendStatuses.IS_OUTGOING}
+
+    response = api_client.post(reverse_lazy("api:invites-list"), data={"target": friends[0].id})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_find_path_in_friend_graph(friend_graph) -> None:
+    """Тест на поиск кратчайшего пути по графу друзей."""
+    users = UserFactory.create_batch(size=COUNT_USERS)
+    for user, friend in zip(users, users[1:]):
+        add_friends(user, friend)
+    add_friends(users[1], users[3])
+    ids = [user.id for user in users]
+    assert find_path(ids[0], ids[4], 3) == ([ids[0], ids[1], ids[3], ids[4]], False)
+    assert find_path(ids[4], ids[0], 3) == ([ids[4], ids[3], ids[1], ids[0]], False)
+    assert find_path(ids[0], ids[4], 2) == (None, False)
+    assert find_path(ids[0], ids[4], 3, max_edges=2) == (None, True)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_friend_graph_reload(friend_graph, settings, monkeypatch) -> None:
+    """Тест на фоновую перезагрузку графа друзей после изменений в другом процессе."""
+    settings.FRIEND_GRAPH_CHECK_INTERVAL = 0
+    user1, user2, user3 = UserFactory.create_batch(size=3)
+    graph = get_friend_graph()
+    add_friends(user1, user2)
+    assert graph.versions == FriendshipVersion.objects.current()
+    assert list(graph.versions.values()) == [1]
+
+    # Another process adds a friendship, then this one removes a friendship while the graph reloads.
+    Friendship.objects.create(user=user1, friend=user3)
+    FriendshipVersion.objects.bump(user3.id)
+    load = FriendGraph.load
+
+    def load_and_remove():
+        loaded = load()
+        remove_friends(user1, user2)
+        return loaded
+
+    monkeypatch.setattr(FriendGraph, "load", load_and_remove)
+    assert get_friend_graph() is graph
+    for _ in range(500):
+        if get_friend_graph() is not graph:
+            break
+        time.sleep(0.01)
+    reloaded = get_friend_graph()
+    assert reloaded is not graph
+    assert list(reloaded.friend_ids(user1.id)) == [user3.id]
+    assert reloaded.versions == FriendshipVersion.objects.current()
+    assert sum(reloaded.versions.values()) == 3
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_import_users_csv(tmp_path) -> None:
+    """Тест на импорт пользователей из CSV."""
+    UserFactory.create(username="existing", first_name="Старый")
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,password,email,first_name,last_name\n"
+        "ivan,secret-1,ivan@example.com,Иван,Петров\n"
+        "anna,,,Анна,\n"
+        ",secret-2,,Без,Имени\n"
+        f"{'x' * 151},secret-3,,,\n"
+        "existing,secret-4,,Новый,\n"
+        "oleg,secret-5,,Олег,Сидоров\n",
+        encoding="utf-8",
+    )
+
+    output = io.StringIO()
+    call_command("import_users", str(path), batch_size=2, workers=2, stdout=output)
+    assert "Imported 3 rows" in output.getvalue()
+    assert "skipped 1 existing and 2 invalid rows" in output.getvalue()
+    assert set(User.objects.values_list("username", flat=True)) == {"existing", "ivan", "anna", "oleg"}
+    ivan = User.objects.get(username="ivan")
+    assert (ivan.email, ivan.first_name, ivan.last_name) == ("ivan@example.com", "Иван", "Петров")
+    assert ivan.check_password("secret-1")
+    assert not User.objects.get(username="anna").has_usable_password()
+    assert User.objects.get(username="existing").first_name == "Старый"
+    assert not (tmp_path / "users.csv.checkpoint").exists()
+
+
+def test_import_users_resume(tmp_path) -> None:
+    """Тест на продолжение импорта пользователей с контрольной точки."""
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps({"username": f"user-{number}", "password": "secret", "last_name": f"\\{number}\tмл."})
+            for number in range(5)
+        ),
+        encoding="utf-8",
+    )
+    (tmp_path / "users.jsonl.checkpoint").write_text("3")
+
+    call_command("import_users", str(path), workers=1, stdout=io.StringIO())
+    assert sorted(User.objects.values_list("username", "last_name")) == [("user-3", "\\3\tмл."), ("user-4", "\\4\tмл.")]
+    assert not (tmp_path / "users.jsonl.checkpoint").exists()
+
+
+def test_import_users_invalid_jsonl(tmp_path) -> None:
+    """Тест на пропуск некорректных строк JSON Lines."""
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        "\n".join((
+            json.dumps({"username": "ivan", "password": "secret"}),
+            "{not json",
+            "[1, 2]",
+            json.dumps({"username": "anna", "password": 123}),
+            json.dumps({"username": "oleg", "first_name": ["Олег"]}),
+            json.dumps({"username": 42}),
+            json.dumps({"username": "petr"}),
+        )),
+        encoding="utf-8",
+    )
+
+    output = io.StringIO()
+    call_command("import_users", str(path), workers=1, stdout=output)
+    assert "Imported 2 rows" in output.getvalue()
+    assert "skipped 0 existing and 5 invalid rows" in output.getvalue()
+    assert set(User.objects.values_list("username", flat=True)) == {"ivan", "petr"}
+
+
+@pytest.mark.parametrize("options", ({"batch_size": 0}, {"workers": 0}))
+def test_import_users_invalid_options(tmp_path, options) -> None:
+    """Тест на отказ импорта с неверными размером пачки и числом процессов."""
+    path = tmp_path / "users.jsonl"
+    path.write_text(json.dumps({"username": "ivan"}), encoding="utf-8")
+    with pytest.raises(CommandError):
+        call_command("import_users", str(path), **options)
+    assert not User.objects.exists()
@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse_lazy
+from rest_framework import status
+
+from apps.core.serializers import ValuesSerializer
+from apps.friends.factories import InviteFactory
+from apps.friends.models import Invite
+from apps.friends.serializers import InviteSerializer
+from apps.users.factories import UserFactory
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from apps.users.services import add_friends
+
+pytestmark = pytest.mark.django_db
+COUNT_USERS = 5
+
+
+def test_values_serializer_matches_serializer() -> None:
+    """Тест на совпадение быстрой сериализации с обычной."""
+    UserFactory.create_batch(size=COUNT_USERS, last_name="Петров")
+    queryset = User.objects.order_by("id")
+    serializer = ValuesSerializer.compile(UserSerializer)
+    assert "password" not in serializer.fields
+    assert serializer.to_representation(serializer.values(queryset)) == UserSerializer(queryset, many=True).data
+
+    invites = InviteFactory.create_batch(size=COUNT_USERS)
+    InviteFactory(is_accept=True)
+    serializer = ValuesSerializer.compile(InviteSerializer, ("is_accept", "owner"))
+    assert serializer.to_representation(serializer.values(Invite.objects.order_by("id"))) == [
+        *({"is_accept": None, "owner": invite.owner_id} for invite in invites),
+        {"is_accept": True, "owner": Invite.objects.latest("id").owner_id},
+    ]
+
+
+def test_list_sparse_fields(api_client) -> None:
+    """Тест на выбор полей в списках пользователей."""
+    user = UserFactory.create()
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends:
+        add_friends(user, friend)
+    api_client.force_authenticate(user=user)
+
+    data = {"fields": "username,id"}
+    response = api_client.get(reverse_lazy("api:users-list"), data=data)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0] == {"id": user.id, "username": user.username}
+    response = api_client.get(reverse_lazy("api:users-friends"), data=data)
+    assert response.data["results"] == [{"id": friend.id, "username": friend.username} for friend in friends]
+    response = api_client.get(reverse_lazy("api:users-friends"))
+    assert response.data["results"][0]["friends_count"] == 1
+
+    response = api_client.get(reverse_lazy("api:users-list"), data={"fields": "id,password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"fields": ["Неизвестные поля: password"]}
+
+
+def test_invites_sparse_fields(api_client) -> None:
+    """Тест на выбор полей в списках заявок."""
+    user = UserFactory.create()
+    invite = Invite.objects.get(id=InviteFactory(target=user).id)
+    api_client.force_authenticate(user=user)
+    url = reverse_lazy("api:users-incoming-invites")
+
+    response = api_client.get(url, data={"fields": "id,owner"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [{"id": invite.id, "owner": UserSerializer(invite.owner).data}]
+    response = api_client.get(url)
+    assert response.data["results"] == [InviteSerializer(invite).data]
@@ -1,17 +1,37 @@
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse_lazy
 from rest_framework import status
 
+from apps.core.pagination import KeysetPagination
+from apps.events.constants import EventTypes
+from apps.events.models import OutboxEvent
+from apps.events.services import relay_events
 from apps.friends.factories import InviteFactory
 from apps.friends.models import Invite
 from apps.users.constants import FriendStatuses
 from apps.users.factories import UserFactory
-from apps.users.models import User
+from apps.users.models import Friendship, Suggestion, User
+from apps.users.services import (
+    add_friends,
+    bulk_add_friends,
+    iter_mutual_counts,
+    rebuild_user_suggestions,
+    remove_friends,
+)
 
 pytestmark = pytest.mark.django_db
 COUNT_USERS = 5
 COUNT_INVITES = 5
 COUNT_USERS_FRIENDS = 2
+# Removing a friend writes more than the shared QUERY_BUDGET of reads: user, lock
+# both users, delete the friendship, friends of both users, lock, shift and delete
+# emptied suggestions, friends counters, event.
+REMOVE_FRIEND_QUERY_BUDGET = 9
 
 
 def test_retrieve_user(api_client) -> None:
@@ -67,7 +87,7 @@ def test_get_incoming_invites_auth(api_client) -> None:
         reverse_lazy("api:users-incoming-invites"),
     )
     assert response.status_code == status.HTTP_200_OK
-    ids = list(map(lambda x: x["id"], response.json()))
+    ids = list(map(lambda x: x["id"], response.json()["results"]))
     assert len(ids) == len(invites)
     assert ids == list(map(lambda x: x.id, invites))
 
@@ -91,7 +111,7 @@ def test_get_outgoing_invites_auth(api_client) -> None:
         reverse_lazy("api:users-outgoing-invites"),
     )
     assert response.status_code == status.HTTP_200_OK
-    ids = list(map(lambda x: x["id"], response.json()))
+    ids = list(map(lambda x: x["id"], response.json()["results"]))
     assert len(ids) == len(invites)
     assert ids == list(map(lambda x: x.id, invites))
 
@@ -110,13 +130,14 @@ def test_get_friends_list_auth(api_client) -> None:
     """Тест на чтение списка друзей авторизированным пользователем."""
     user = UserFactory.create()
     friends = UserFactory.create_batch(size=COUNT_USERS)
-    user.friends.set(friends)
+    for friend in friends:
+        add_friends(user, friend)
     api_client.force_authenticate(user=user)
     response = api_client.get(
         reverse_lazy("api:users-friends"),
     )
     assert response.status_code == status.HTTP_200_OK
-    ids = list(map(lambda x: x["id"], response.json()))
+    ids = list(map(lambda x: x["id"], response.json()["results"]))
     assert len(ids) == len(friends)
     assert ids == list(map(lambda x: x.id, friends))
 
@@ -125,7 +146,8 @@ def test_get_friends_list_not_auth(api_client) -> None:
     """Тест на чтение списка друзей не авторизированным пользователем."""
     user = UserFactory.create()
     friends = UserFactory.create_batch(size=COUNT_USERS)
-    user.friends.set(friends)
+    for friend in friends:
+        add_friends(user, friend)
     response = api_client.get(
         reverse_lazy("api:users-friends"),
     )
@@ -245,8 +267,7 @@ def test_get_friend_status_not_accept(api_client) -> None:
 def test_delete_friends(api_client) -> None:
     """Тест на удаление из друзей."""
     user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
-    user1.friends.add(user2)
-    user2.friends.add(user1)
+    add_friends(user1, user2)
 
     api_client.force_authenticate(user=user1)
     response1 = api_client.get(
@@ -386,8 +407,7 @@ def test_mutual_accept_friend_invite_failed(api_client) -> None:
 def test_create_invite_to_user_that_already_friend(api_client) -> None:
     """Тест на отправку заявки пользователю, который уже является другом."""
     user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
-    user1.friends.add(user2)
-    user2.friends.add(user1)
+    add_friends(user1, user2)
 
     api_client.force_authenticate(user=user1)
     response1 = api_client.get(
@@ -430,3 +450,449 @@ def test_read_status_with_the_same_usr(api_client) -> None:
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert response.data["message"] == "Нельзя узнавать статус с самим собой"
+
+
+@pytest.mark.parametrize(
+    "relation,expected",
+    [
+        ("friends", FriendStatuses.IS_FRIENDS),
+        ("incoming", FriendStatuses.IS_INCOMING),
+        ("outgoing", FriendStatuses.IS_OUTGOING),
+        (None, FriendStatuses.NOT_FRIENDS),
+    ],
+)
+def test_get_friend_status_single_query(api_client, django_assert_num_queries, relation, expected) -> None:
+    """Тест на получение статуса дружбы одним запросом к базе."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    if relation == "friends":
+        add_friends(user1, user2)
+    elif relation == "incoming":
+        InviteFactory.create(owner=user2, target=user1)
+    elif relation == "outgoing":
+        InviteFactory.create(owner=user1, target=user2)
+
+    api_client.force_authenticate(user=user1)
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            reverse_lazy("api:users-friend-status", kwargs={"pk": user2.pk}),
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["status"] == expected
+
+
+def test_get_friend_statuses(api_client, django_assert_num_queries) -> None:
+    """Тест на получение статусов дружбы со многими пользователями сразу."""
+    user, friend, incoming, outgoing, stranger = UserFactory.create_batch(size=COUNT_USERS)
+    add_friends(user, friend)
+    InviteFactory.create(owner=incoming, target=user)
+    InviteFactory.create(owner=user, target=outgoing)
+
+    api_client.force_authenticate(user=user)
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            reverse_lazy("api:users-friend-statuses"),
+            data={"ids": [user.id, friend.id, incoming.id, outgoing.id, stranger.id, stranger.id + 1000]},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        friend.id: FriendStatuses.IS_FRIENDS,
+        incoming.id: FriendStatuses.IS_INCOMING,
+        outgoing.id: FriendStatuses.IS_OUTGOING,
+        stranger.id: FriendStatuses.NOT_FRIENDS,
+    }
+
+
+def test_get_friend_statuses_failed(api_client) -> None:
+    """Тест на получение статусов дружбы без списка пользователей."""
+    user = UserFactory.create()
+    response = api_client.get(reverse_lazy("api:users-friend-statuses"), data={"ids": [user.id]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse_lazy("api:users-friend-statuses"))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    ("url_name", "budget"),
+    [
+        ("api:users-list", 1),
+        # Lists of the current user also read its lists version for the ETag.
+        ("api:users-friends", 2),
+        ("api:users-incoming-invites", 2),
+        ("api:users-outgoing-invites", 2),
+    ],
+)
+def test_list_query_budget(api_client, assert_query_budget, url_name, budget) -> None:
+    """Тест на то, что число запросов к базе в списках не зависит от числа строк."""
+    user = UserFactory.create()
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends:
+        add_friends(user, friend)
+    InviteFactory.create_batch(size=COUNT_INVITES, target=user)
+    InviteFactory.create_batch(size=COUNT_INVITES, owner=user)
+
+    api_client.force_authenticate(user=user)
+    # Cached users are fetched in one more query on a cold cache.
+    with assert_query_budget(budget + 1):
+        response = api_client.get(reverse_lazy(url_name))
+    assert response.status_code == status.HTTP_200_OK
+    with assert_query_budget(budget):
+        response = api_client.get(reverse_lazy(url_name))
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize(
+    "url_name",
+    [
+        "api:users-friends",
+        "api:users-incoming-invites",
+        "api:users-outgoing-invites",
+    ],
+)
+def test_lists_conditional_get(api_client, django_assert_num_queries, url_name) -> None:
+    """Тест на ответ 304 для списков, которые не изменились."""
+    user = UserFactory.create()
+    for friend in UserFactory.create_batch(size=COUNT_USERS_FRIENDS):
+        add_friends(user, friend)
+    InviteFactory.create(target=user)
+    user.refresh_from_db()
+    api_client.force_authenticate(user=user)
+
+    url = reverse_lazy(url_name)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] == f'W/"{user.id}-{user.lists_version}"'
+    assert "Authorization" in response["Vary"]
+    assert "Last-Modified" not in response
+    with django_assert_num_queries(1):
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # The authenticated user is now a stale copy, as if read from the cache.
+    InviteFactory.create(owner=user)
+    modified = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert modified.status_code == status.HTTP_200_OK
+    assert modified["ETag"] != response["ETag"]
+
+
+def test_detail_query_budget(api_client, assert_query_budget) -> None:
+    """Тест на бюджет запросов к базе для действий над одним пользователем."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    add_friends(user1, user2)
+
+    api_client.force_authenticate(user=user1)
+    with assert_query_budget():
+        response = api_client.get(reverse_lazy("api:users-detail", kwargs={"pk": user2.pk}))
+    assert response.status_code == status.HTTP_200_OK
+    with assert_query_budget(REMOVE_FRIEND_QUERY_BUDGET):
+        response = api_client.delete(reverse_lazy("api:users-delete-friend", kwargs={"pk": user2.pk}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_get_friends_list_pagination(api_client) -> None:
+    """Тест на постраничное чтение списка друзей по курсору."""
+    user = UserFactory.create()
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends:
+        add_friends(user, friend)
+    api_client.force_authenticate(user=user)
+
+    ids = []
+    url = reverse_lazy("api:users-friends")
+    data = {"page_size": COUNT_USERS_FRIENDS}
+    while url:
+        response = api_client.get(url, data=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) <= COUNT_USERS_FRIENDS
+        ids.extend(map(lambda x: x["id"], response.data["results"]))
+        url, data = response.data["next"], None
+    assert ids == list(map(lambda x: x.id, friends))
+
+
+def test_read_list_users_page_size_bounded(api_client) -> None:
+    """Тест на ограничение размера страницы списка пользователей."""
+    user = UserFactory.create()
+    api_client.force_authenticate(user=user)
+    with mock.patch.object(KeysetPagination, "max_page_size", COUNT_USERS_FRIENDS):
+        UserFactory.create_batch(size=COUNT_USERS)
+        response = api_client.get(
+            reverse_lazy("api:users-list"),
+            data={"page_size": COUNT_USERS},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == COUNT_USERS_FRIENDS
+    assert response.data["next"] is not None
+    assert "count" not in response.data
+
+
+def test_friends_counters(api_client) -> None:
+    """Тест на поддержание счетчиков друзей и заявок."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    api_client.force_authenticate(user=user1)
+    response = api_client.post(reverse_lazy("api:invites-list"), data={"target": user2.id})
+    assert response.status_code == status.HTTP_201_CREATED
+    user1.refresh_from_db()
+    user2.refresh_from_db()
+    assert user1.outgoing_invites_count == user2.incoming_invites_count == 1
+
+    api_client.force_authenticate(user=user2)
+    response = api_client.patch(
+        reverse_lazy("api:invites-accept", kwargs={"pk": response.data["id"]}),
+        data={"is_accept": True},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.get(reverse_lazy("api:users-detail", kwargs={"pk": user1.pk}))
+    assert response.data["friends_count"] == 1
+    assert response.data["outgoing_invites_count"] == 0
+    user2.refresh_from_db()
+    assert (user2.friends_count, user2.incoming_invites_count) == (1, 0)
+
+    response = api_client.delete(reverse_lazy("api:users-delete-friend", kwargs={"pk": user1.pk}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    user1.refresh_from_db()
+    user2.refresh_from_db()
+    assert user1.friends_count == user2.friends_count == 0
+
+
+def test_friends_counters_mutual_invite(api_client) -> None:
+    """Тест на счетчики после взаимных заявок."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    InviteFactory.create(owner=user1, target=user2)
+    InviteFactory.create(owner=user2, target=user1)
+    for user in (user1, user2):
+        user.refresh_from_db()
+        assert user.friends_count == 1
+        assert user.incoming_invites_count == user.outgoing_invites_count == 0
+
+
+def test_recount_friends_counters() -> None:
+    """Тест на исправление рассинхронизированных счетчиков."""
+    user1, user2, user3 = UserFactory.create_batch(size=3)
+    add_friends(user1, user2)
+    InviteFactory.create(owner=user3, target=user1)
+    User.objects.update(friends_count=10, incoming_invites_count=0, outgoing_invites_count=0)
+
+    out = StringIO()
+    call_command("recount_friends_counters", batch_size=1, stdout=out)
+    assert "Repaired 3 users" in out.getvalue()
+    assert list(
+        User.objects.order_by("id").values_list("friends_count", "incoming_invites_count", "outgoing_invites_count"),
+    ) == [(1, 1, 0), (1, 0, 0), (0, 0, 1)]
+
+    out = StringIO()
+    call_command("recount_friends_counters", stdout=out)
+    assert "Repaired 0 users" in out.getvalue()
+
+
+def test_friendship_single_edge() -> None:
+    """Тест на хранение дружбы одной записью на пару пользователей."""
+    user1, user2 = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    assert add_friends(user2, user1)
+    assert not add_friends(user1, user2)
+    assert Friendship.objects.count() == 1
+    friendship = Friendship.objects.get()
+    assert (friendship.user_id, friendship.friend_id) == (min(user1.id, user2.id), max(user1.id, user2.id))
+    assert list(user1.friends) == [user2]
+    assert list(user2.friends) == [user1]
+
+    assert remove_friends(user1, user2)
+    assert not remove_friends(user2, user1)
+    assert not Friendship.objects.exists()
+
+
+def test_get_mutual_friends(api_client) -> None:
+    """Тест на чтение списка общих друзей двух пользователей."""
+    user, other = UserFactory.create_batch(size=COUNT_USERS_FRIENDS)
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends[:4]:
+        add_friends(user, friend)
+    for friend in friends[1:]:
+        add_friends(other, friend)
+    add_friends(user, other)
+    api_client.force_authenticate(user=user)
+
+    ids = []
+    url = reverse_lazy("api:users-mutual-friends", kwargs={"pk": other.id})
+    data = {"page_size": COUNT_USERS_FRIENDS}
+    while url:
+        response = api_client.get(url, data=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        ids.extend(map(lambda x: x["id"], response.data["results"]))
+        url, data = response.data["next"], None
+    assert ids == list(map(lambda x: x.id, friends[1:4]))
+
+
+def test_get_mutual_friends_failed(api_client) -> None:
+    """Тест на чтение списка общих друзей с неверными данными."""
+    user = UserFactory.create()
+    url = reverse_lazy("api:users-mutual-friends", kwargs={"pk": user.id})
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.get(reverse_lazy("api:users-mutual-friends", kwargs={"pk": user.id + 1}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_distance(api_client, assert_query_budget, settings) -> None:
+    """Тест на чтение расстояния между пользователями."""
+    users = UserFactory.create_batch(size=COUNT_USERS + 1)
+    for user, friend in zip(users, users[1:COUNT_USERS]):
+        add_friends(user, friend)
+    add_friends(users[0], users[2])
+    api_client.force_authenticate(user=users[0])
+
+    url = reverse_lazy("api:users-distance", kwargs={"pk": users[4].id})
+    with assert_query_budget():
+        response = api_client.get(url, data={"path": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["distance"] == 3
+    assert list(map(lambda x: x["id"], response.data["path"])) == [users[0].id, users[2].id, users[3].id, users[4].id]
+
+    response = api_client.get(url, data={"max_depth": 2})
+    assert response.data == {"distance": None, "too_far": False}
+    response = api_client.get(reverse_lazy("api:users-distance", kwargs={"pk": users[1].id}))
+    assert response.data == {"distance": 1, "too_far": False}
+    response = api_client.get(reverse_lazy("api:users-distance", kwargs={"pk": users[5].id}), data={"path": True})
+    assert response.data == {"distance": None, "too_far": False, "path": []}
+
+    settings.DISTANCE_MAX_EDGES = 2
+    # User and one query per level until the friendships run out.
+    with assert_query_budget(3):
+        response = api_client.get(url, data={"path": True})
+    assert response.data == {"distance": None, "too_far": True, "path": []}
+
+
+def test_get_distance_failed(api_client) -> None:
+    """Тест на чтение расстояния между пользователями с неверными данными."""
+    user = UserFactory.create()
+    url = reverse_lazy("api:users-distance", kwargs={"pk": user.id})
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.get(reverse_lazy("api:users-distance", kwargs={"pk": user.id + 1}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    other = UserFactory.create()
+    response = api_client.get(reverse_lazy("api:users-distance", kwargs={"pk": other.id}), data={"max_depth": 7})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def actual_suggestions() -> set:
+    return set(iter_mutual_counts(Friendship.objects.values_list("user", "friend")))
+
+
+def stored_suggestions() -> set:
+    return set(Suggestion.objects.values_list("user", "candidate", "mutual_count"))
+
+
+def test_suggestions_maintained() -> None:
+    """Тест на поддержание рекомендаций при добавлении и удалении друзей."""
+    users = UserFactory.create_batch(size=7)
+    add_friends(users[0], users[1])
+    add_friends(users[1], users[2])
+    add_friends(users[2], users[3])
+    assert stored_suggestions() == actual_suggestions()
+    bulk_add_friends(users[4], [user.id for user in users[:4]] + [users[5].id])
+    assert stored_suggestions() == actual_suggestions()
+    bulk_add_friends(users[6], [users[4].id, users[1].id, users[2].id])
+    assert stored_suggestions() == actual_suggestions()
+    remove_friends(users[2], users[4])
+    remove_friends(users[1], users[0])
+    assert stored_suggestions() == actual_suggestions()
+    add_friends(users[0], users[1])
+    assert stored_suggestions() == actual_suggestions()
+
+
+def test_suggestions_bounded(settings) -> None:
+    """Тест на удаление пустых рекомендаций и ограничение их числа у пользователя."""
+    settings.SUGGESTIONS_PER_USER = 3
+    hub, *friends = UserFactory.create_batch(size=7)
+    bulk_add_friends(hub, [friend.id for friend in friends[:3]])
+    for friend in friends[3:]:
+        add_friends(hub, friend)
+    assert not Suggestion.objects.filter(mutual_count=0).exists()
+    assert max(Counter(Suggestion.objects.values_list("user", flat=True)).values()) == 3
+    assert stored_suggestions() <= actual_suggestions()
+
+    for friend in friends[:4]:
+        remove_friends(hub, friend)
+    assert not Suggestion.objects.filter(mutual_count=0).exists()
+    assert stored_suggestions() <= actual_suggestions()
+
+    bulk_add_friends(friends[0], [friend.id for friend in friends[1:]])
+    call_command("rebuild_suggestions", stdout=StringIO())
+    assert max(Counter(Suggestion.objects.values_list("user", flat=True)).values()) == 3
+    assert stored_suggestions() == set(
+        iter_mutual_counts(Friendship.objects.values_list("user", "friend"), limit=3),
+    )
+    rebuild_user_suggestions([hub.id, friends[0].id])
+    assert not Suggestion.objects.filter(mutual_count=0).exists()
+    assert stored_suggestions() <= actual_suggestions()
+
+
+def test_suggestions_deferred_to_relay(settings) -> None:
+    """Тест на пересчет рекомендаций при релее событий для изменений с большим охватом."""
+    settings.SUGGESTIONS_MAX_FAN_OUT = 8
+    users = UserFactory.create_batch(size=6)
+    add_friends(users[0], users[1])
+    add_friends(users[1], users[2])
+    assert stored_suggestions() == actual_suggestions()
+    OutboxEvent.objects.all().delete()
+
+    bulk_add_friends(users[3], [users[0].id, users[2].id, users[4].id])
+    assert stored_suggestions() != actual_suggestions()
+    assert OutboxEvent.objects.filter(event_type=EventTypes.SUGGESTIONS_STALE).get().payload == {
+        "users": [users[3].id, users[0].id, users[2].id, users[4].id],
+    }
+    relay_events(batch_size=10)
+    assert stored_suggestions() == actual_suggestions()
+
+    remove_friends(users[1], users[2])
+    bulk_add_friends(users[5], [user.id for user in users[:5]])
+    remove_friends(users[3], users[0])
+    assert OutboxEvent.objects.filter(event_type=EventTypes.SUGGESTIONS_STALE).count() == 2
+    relay_events(batch_size=10)
+    assert stored_suggestions() == actual_suggestions()
+
+
+def test_get_suggestions(api_client) -> None:
+    """Тест на чтение рекомендаций друзей по количеству общих друзей."""
+    user, friend1, friend2, candidate1, candidate2, invited, inviter = UserFactory.create_batch(size=7)
+    for friend in (friend1, friend2):
+        add_friends(user, friend)
+        for other in (candidate1, invited, inviter):
+            add_friends(friend, other)
+    add_friends(friend1, candidate2)
+    InviteFactory.create(owner=user, target=invited)
+    InviteFactory.create(owner=inviter, target=user)
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse_lazy("api:users-suggestions"))
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (suggestion["candidate"]["id"], suggestion["mutual_count"]) for suggestion in response.data
+    ] == [(candidate1.id, 2), (candidate2.id, 1)]
+
+    response = api_client.get(reverse_lazy("api:users-suggestions"), data={"limit": 1})
+    assert len(response.data) == 1
+    response = api_client.get(reverse_lazy("api:users-suggestions"), data={"limit": 0})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_rebuild_suggestions() -> None:
+    """Тест на пересчет рекомендаций друзей."""
+    user1, user2, user3 = UserFactory.create_batch(size=3)
+    add_friends(user1, user2)
+    add_friends(user2, user3)
+    Suggestion.objects.update(mutual_count=5)
+
+    out = StringIO()
+    call_command("rebuild_suggestions", stdout=out)
+    assert "Rebuilt 2 suggestions" in out.getvalue()
+    assert stored_suggestions() == actual_suggestions() == {(user1.id, user3.id, 1), (user3.id, user1.id, 1)}
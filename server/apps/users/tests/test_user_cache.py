@@ -0,0 +1,136 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse_lazy
+from rest_framework import status
+
+from apps.users.factories import UserFactory
+from apps.users.services import add_friends, get_friend_ids, get_user_payloads
+from apps.users.services.cache import friend_ids_cache_key
+
+pytestmark = pytest.mark.django_db
+COUNT_USERS = 5
+
+
+def test_cached_user_payloads(django_assert_num_queries) -> None:
+    """Тест на чтение пользователей через кэш."""
+    users = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in users[1:]:
+        add_friends(users[0], friend)
+    ids = [user.id for user in users]
+    users[0].refresh_from_db()
+
+    with django_assert_num_queries(2):
+        payloads = get_user_payloads(ids + [ids[-1] + 1])
+        friend_ids = get_friend_ids(ids[0], users[0].lists_version)
+    assert sorted(payloads) == ids
+    assert payloads[ids[0]]["friends_count"] == COUNT_USERS - 1
+    assert friend_ids == ids[1:]
+    with django_assert_num_queries(0):
+        assert get_user_payloads(ids) == payloads
+        assert get_friend_ids(ids[0], users[0].lists_version) == friend_ids
+
+
+def test_friends_etag_matches_cached_list(api_client) -> None:
+    """Тест на то, что список друзей из кэша соответствует версии в ETag."""
+    user, friend, other = UserFactory.create_batch(size=3)
+    add_friends(user, friend)
+    api_client.force_authenticate(user=user)
+    url = reverse_lazy("api:users-friends")
+    response = api_client.get(url)
+    user.refresh_from_db()
+    old_version = user.lists_version
+
+    add_friends(user, other)
+    # A read that started before the change puts the old list back after the commit.
+    cache.set(friend_ids_cache_key(user.id, old_version), [friend.id], settings.USER_CACHE_TIMEOUT)
+    modified = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert modified.status_code == status.HTTP_200_OK
+    assert [payload["id"] for payload in modified.data["results"]] == [friend.id, other.id]
+    not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=modified["ETag"])
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_cached_endpoints(api_client, django_assert_num_queries) -> None:
+    """Тест на эндпоинты, которые отдают пользователей из кэша."""
+    user, other = UserFactory.create_batch(size=2)
+    friends = UserFactory.create_batch(size=COUNT_USERS)
+    for friend in friends:
+        add_friends(user, friend)
+    for friend in friends[1:4]:
+        add_friends(other, friend)
+    api_client.force_authenticate(user=user)
+
+    urls = (
+        reverse_lazy("api:users-detail", kwargs={"pk": other.id}),
+        reverse_lazy("api:users-friends"),
+    )
+    responses = [api_client.get(url) for url in urls]
+    # Only the lists version for the ETag of the friends is read from the database.
+    with django_assert_num_queries(1):
+        for url, response in zip(urls, responses):
+            assert api_client.get(url).data == response.data
+    assert responses[0].data["friends_count"] == 3
+    assert list(map(lambda x: x["id"], responses[1].data["results"])) == list(map(lambda x: x.id, friends))
+
+    response = api_client.get(reverse_lazy("api:users-mutual-friends", kwargs={"pk": other.id}))
+    assert response.data["count"] == 3
+    assert list(map(lambda x: x["id"], response.data["results"])) == list(map(lambda x: x.id, friends[1:4]))
+    response = api_client.get(reverse_lazy("api:users-detail", kwargs={"pk": "name"}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_user_cache_invalidation(api_client, django_capture_on_commit_callbacks) -> None:
+    """Тест на сброс кэша при заявках и удалении из друзей."""
+    user1, user2 = UserFactory.create_batch(size=2)
+    detail_url = reverse_lazy("api:users-detail", kwargs={"pk": user2.id})
+    friends_url = reverse_lazy("api:users-friends")
+    api_client.force_authenticate(user=user1)
+    assert api_client.get(detail_url).data["incoming_invites_count"] == 0
+    assert api_client.get(friends_url).data["results"] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse_lazy("api:invites-list"), data={"target": user2.id})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert api_client.get(detail_url).data["incoming_invites_count"] == 1
+
+    api_client.force_authenticate(user=user2)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.patch(
+            reverse_lazy("api:invites-accept", kwargs={"pk": response.data["id"]}),
+            data={"is_accept": True},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(detail_url)
+    assert response.data["incoming_invites_count"] == 0
+    assert response.data["friends_count"] == 1
+    assert list(map(lambda x: x["id"], api_client.get(friends_url).data["results"])) == [user2.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.delete(reverse_lazy("api:users-delete-friend", kwargs={"pk": user2.id}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert api_client.get(detail_url).data["friends_count"] == 0
+    assert api_client.get(friends_url).data["results"] == []
+
+
+def test_friends_pagination_over_index(api_client, settings) -> None:
+    """Тест на постраничное чтение большого списка друзей из базы без кэша."""
+    settings.FRIEND_IDS_CACHE_MAX_DEGREE = 2
+    # Friends with smaller ids are stored in the other direction of the edge.
+    smaller = UserFactory.create_batch(size=3)
+    user = UserFactory.create()
+    friends = [*smaller, *UserFactory.create_batch(size=4)]
+    for friend in friends:
+        add_friends(user, friend)
+    user.refresh_from_db()
+    api_client.force_authenticate(user=user)
+
+    ids, url, data = [], reverse_lazy("api:users-friends"), {"page_size": 2}
+    while url:
+        response = api_client.get(url, data=data)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(friend["id"] for friend in response.data["results"])
+        previous, url, data = response.data["previous"], response.data["next"], None
+    assert ids == [friend.id for friend in friends]
+    assert [friend["id"] for friend in api_client.get(previous).data["results"]] == ids[-3:-1]
@@ -0,0 +1,123 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse_lazy
+from rest_framework import status
+
+from apps.core.handlers import StreamingASGIHandler
+from apps.friends.factories import InviteFactory
+from apps.users.authentication import get_access_token
+from apps.users.factories import UserFactory
+from apps.users.models import Friendship
+from apps.users.services import add_friends
+from apps.users.viewsets.user import EXPORT_CHUNK_SIZE
+
+COUNT_FRIENDS = EXPORT_CHUNK_SIZE + 1
+
+
+def read(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_friends(api_client) -> None:
+    """Тест на выгрузку друзей в NDJSON и CSV."""
+    user = UserFactory.create()
+    friends = UserFactory.create_batch(size=COUNT_FRIENDS, first_name="Иван")
+    # Edges are inserted directly, counters and suggestions are not exported.
+    Friendship.objects.bulk_create(Friendship(user=user, friend=friend) for friend in friends)
+    UserFactory.create()
+    api_client.force_authenticate(user=user)
+    url = reverse_lazy("api:users-friends-export")
+
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert response["Content-Disposition"] == 'attachment; filename="friends.ndjson"'
+    rows = [json.loads(line) for line in read(response).splitlines()]
+    assert [row["id"] for row in rows] == [friend.id for friend in friends]
+    assert rows[0] == {"id": friends[0].id, "username": friends[0].username, "first_name": "Иван", "last_name": ""}
+
+    response = api_client.get(url, data={"format": "csv"})
+    assert response["Content-Disposition"] == 'attachment; filename="friends.csv"'
+    rows = list(csv.reader(io.StringIO(read(response))))
+    assert rows[0] == ["id", "username", "first_name", "last_name"]
+    assert rows[1] == [str(friends[0].id), friends[0].username, "Иван", ""]
+    assert len(rows) == COUNT_FRIENDS + 1
+
+    api_client.force_authenticate(user=None)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert json.loads(response.content) == {"detail": "Учетные данные не были предоставлены."}
+
+
+@pytest.mark.django_db
+def test_export_csv_formulas(api_client) -> None:
+    """Тест на то, что ячейки CSV, похожие на формулы, выгружаются как текст."""
+    user = UserFactory.create()
+    names = ["=HYPERLINK(\"http://example.com\")", "+1", "-1", "@SUM(A1)", "\tИван", "\rИван", "Иван-Петр"]
+    friends = [UserFactory.create(first_name=name, last_name=name) for name in names]
+    Friendship.objects.bulk_create(Friendship(user=user, friend=friend) for friend in friends)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse_lazy("api:users-friends-export"), data={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(read(response), newline="")))
+    assert [row["first_name"] for row in rows] == [f"'{name}" for name in names[:-1]] + ["Иван-Петр"]
+    assert [row["last_name"] for row in rows] == [row["first_name"] for row in rows]
+    assert [row["id"] for row in rows] == [str(friend.id) for friend in friends]
+
+
+@pytest.mark.django_db
+def test_export_invites(api_client) -> None:
+    """Тест на выгрузку истории заявок."""
+    user, other = UserFactory.create_batch(size=2)
+    invites = [
+        InviteFactory(owner=user, target=other, is_accept=True),
+        InviteFactory(owner=other, target=user, is_accept=False),
+        InviteFactory(owner=other, target=user),
+    ]
+    InviteFactory()
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse_lazy("api:users-invites-export"), data={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(read(response))))
+    assert [row["id"] for row in rows] == [str(invite.id) for invite in invites]
+    assert rows[0] == {
+        "id": str(invites[0].id),
+        "owner": str(user.id),
+        "owner_username": user.username,
+        "target": str(other.id),
+        "target_username": other.username,
+        "is_accept": "True",
+    }
+    assert [row["is_accept"] for row in rows[1:]] == ["False", ""]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_under_asgi() -> None:
+    """Тест на потоковую выгрузку под ASGI."""
+    user, friend = UserFactory.create_batch(size=2)
+    add_friends(user, friend)
+    token = get_access_token(user)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/users/friends/export/",
+        "query_string": b"",
+        "headers": [(b"authorization", f"JWT {token}".encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(StreamingASGIHandler()(scope, receive, send))
+    assert messages[0]["status"] == status.HTTP_200_OK
+    body = b"".join(message.get("body", b"") for message in messages[1:]).decode()
+    assert [json.loads(line)["id"] for line in body.splitlines()] == [friend.id]
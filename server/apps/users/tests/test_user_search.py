@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from django.db import connection
+from django.urls import reverse_lazy
+from rest_framework import status
+
+from apps.users.factories import UserFactory
+from apps.users.models import User
+from apps.users.search import PrefixIndex, get_prefix_index, reset_prefix_index
+from apps.users.services.search import has_trigram_search
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def prefix_index():
+    reset_prefix_index()
+    yield
+    reset_prefix_index()
+
+
+def search(api_client, **params):
+    return api_client.get(reverse_lazy("api:users-search"), data=params)
+
+
+def test_search_users(api_client) -> None:
+    """Тест на поиск пользователей по началу имени."""
+    viewer = UserFactory.create()
+    ivan = UserFactory.create(username="ivan_k", first_name="Пётр", last_name="Смирнов")
+    ivanova = UserFactory.create(username="anna", first_name="Анна", last_name="Иванова")
+    ivanov = UserFactory.create(username="petr", first_name="Иван", last_name="Петров")
+    UserFactory.create(username="other", first_name="Олег", last_name="Сидоров")
+    api_client.force_authenticate(user=viewer)
+
+    response = search(api_client, q="IVAN")
+    assert response.status_code == status.HTTP_200_OK
+    assert [user["id"] for user in response.data["results"]] == [ivan.id]
+    response = search(api_client, q=" иван")
+    assert [user["id"] for user in response.data["results"]] == [ivanov.id, ivanova.id]
+    assert response.data["results"][0]["username"] == "petr"
+
+    response = search(api_client, q="иван", limit=1)
+    assert [user["id"] for user in response.data["results"]] == [ivanov.id]
+    assert response.data["previous"] is None
+    response = api_client.get(response.data["next"])
+    assert [user["id"] for user in response.data["results"]] == [ivanova.id]
+    assert response.data["next"] is None
+    assert response.data["previous"] is not None
+
+    assert search(api_client, q="%").data["results"] == []
+    assert search(api_client).status_code == status.HTTP_400_BAD_REQUEST
+    assert search(api_client, q="иван", offset=-1).status_code == status.HTTP_400_BAD_REQUEST
+    api_client.force_authenticate(user=None)
+    assert search(api_client, q="иван").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Нужен pg_trgm PostgreSQL")
+def test_search_users_fuzzy(api_client) -> None:
+    """Тест на поиск пользователей с опечаткой."""
+    if not has_trigram_search():
+        pytest.skip("Нет расширения pg_trgm")
+    viewer = UserFactory.create()
+    petrov = UserFactory.create(username="pp", first_name="Pavel", last_name="Petrov")
+    UserFactory.create(username="sidorov", first_name="Oleg", last_name="Sidorov")
+    api_client.force_authenticate(user=viewer)
+
+    response = search(api_client, q="petrv")
+    assert [user["id"] for user in response.data["results"]] == [petrov.id]
+    response = search(api_client, q="p")
+    assert [user["id"] for user in response.data["results"]] == [petrov.id]
+
+
+def test_prefix_index(django_capture_on_commit_callbacks) -> None:
+    """Тест на индекс префиксов имен в памяти."""
+    users = [
+        UserFactory.create(username=username, first_name=first_name)
+        for username, first_name in (("bob", "Anna"), ("Annette", ""), ("ann", "Bob"))
+    ]
+    index = PrefixIndex.load()
+    assert len(index) == len(users)
+    assert index.search("username", "ann", 10) == [users[2].id, users[1].id]
+    assert index.search("username", "ann", 1) == [users[2].id]
+    assert index.search("first_name", "b", 10) == [users[2].id]
+    assert index.search("first_name", "", 10) == [users[1].id, users[0].id, users[2].id]
+
+    index.update(users[0].id, "annabel", "", "")
+    index.remove(users[2].id)
+    assert index.search("username", "ann", 10) == [users[0].id, users[1].id]
+    assert index.search("first_name", "a", 10) == []
+
+    index = get_prefix_index()
+    with django_capture_on_commit_callbacks(execute=True):
+        created = UserFactory.create(username="annika")
+        users[1].delete()
+    assert index.search("username", "ann", 10) == [users[2].id, created.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_prefix_index_reload(settings, monkeypatch) -> None:
+    """Тест на фоновую перезагрузку индекса префиксов после изменений в другом процессе."""
+    settings.USER_SEARCH_INDEX_TTL = 0
+    ann, bob = UserFactory.create(username="ann"), UserFactory.create(username="bob")
+    index = get_prefix_index()
+
+    # Another process renames a user, then this one deletes a user while the index reloads.
+    User.objects.filter(id=bob.id).update(username="annika")
+    load = PrefixIndex.load
+
+    def load_and_delete():
+        loaded = load()
+        ann.delete()
+        settings.USER_SEARCH_INDEX_TTL = 3600
+        return loaded
+
+    monkeypatch.setattr(PrefixIndex, "load", load_and_delete)
+    assert get_prefix_index() is index
+    for _ in range(500):
+        if get_prefix_index() is not index:
+            break
+        time.sleep(0.01)
+    reloaded = get_prefix_index()
+    assert reloaded is not index
+    assert reloaded.search("username", "ann", 10) == [bob.id]
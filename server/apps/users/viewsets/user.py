@@ -1,13 +1,71 @@
+from django.db.models import F, Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
+from apps.core.renderers import CSVRenderer, NDJSONRenderer
+from apps.core.serializers import ValuesSerializer, get_sparse_fields
 from apps.core.viewsets import CreateReadListViewSet
+from apps.friends.models import Invite
 from apps.friends.serializers import InviteSerializer
-from apps.users.constants import FriendStatuses
+from apps.users.graph import get_friend_graph
 from apps.users.models import User
 from apps.users.permissions import UserPermission
-from apps.users.serializers import UserSerializer
+from apps.users.serializers import (
+    DistanceQuerySerializer,
+    FriendStatusesQuerySerializer,
+    SuggestionSerializer,
+    SuggestionsQuerySerializer,
+    UserSearchQuerySerializer,
+    UserSerializer,
+)
+from apps.users.serializers.search import MAX_SEARCH_OFFSET
+from apps.users.services import (
+    annotate_friend_status,
+    find_path,
+    get_friend_id_window,
+    get_friend_statuses,
+    get_suggestions,
+    get_user_payloads,
+    remove_friends,
+    resolve_friend_status,
+    search_users,
+)
+
+# Rows read from the database and sent to the client at once by exports.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FRIEND_FIELDS = ("id", "username", "first_name", "last_name")
+EXPORT_INVITE_FIELDS = ("id", "owner", "owner_username", "target", "target_username", "is_accept")
+
+
+def project(payload: dict, fields: tuple[str, ...]) -> dict:
+    """Payload with only the fields, the same dict if it has no others."""
+    if len(fields) == len(payload):
+        return payload
+    return {name: payload[name] for name in fields}
+
+
+def lists_etag(request, *args, **kwargs) -> str:
+    # The authenticated user may be a cached copy, the version is read from
+    # its row so a stale copy never answers 304 for a changed list. The
+    # list is then read at the same version, so the body matches the ETag.
+    request.lists_version = User.objects.filter(id=request.user.id).values_list("lists_version", flat=True).first()
+    return f'W/"{request.user.id}-{request.lists_version}"'
+
+
+# Friend and invite lists of the current user are answered with 304 Not
+# Modified after one indexed read of its lists version, before any list
+# query or serialization. Profiles of other users inside the lists are not
+# versioned.
+conditional_lists = method_decorator((
+    vary_on_headers("Authorization"),
+    condition(etag_func=lists_etag),
+))
 
 
 class UserViewSet(CreateReadListViewSet):
@@ -16,6 +74,8 @@ class UserViewSet(CreateReadListViewSet):
     def get_serializer_class(self):
         if self.action in ("outgoing_invites", "incoming_invites"):
             return InviteSerializer
+        if self.action == "suggestions":
+            return SuggestionSerializer
         return UserSerializer
 
     def get_queryset(self):
@@ -23,21 +83,144 @@ class UserViewSet(CreateReadListViewSet):
             return self.request.user.incoming.filter(is_accept=None)
         elif self.action == "outgoing_invites":
             return self.request.user.outgoing.filter(is_accept=None)
-        elif self.action == "friends_list":
-            return self.request.user.friends.all()
+        elif self.action == "get_friend_status":
+            return annotate_friend_status(User.objects.all(), self.request.user)
         return User.objects.all()
 
+    def list(self, request, *args, **kwargs):
+        serializer = self._values_serializer(request)
+        page = self.paginate_queryset(serializer.values(self.get_queryset()))
+        return self.get_paginated_response(serializer.to_representation(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            user_id = int(kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+        payload = get_user_payloads((user_id,)).get(user_id)
+        if payload is None:
+            raise Http404
+        return Response(
+            data=payload,
+            status=status.HTTP_200_OK,
+        )
+
     @action(methods=('GET',), detail=False, url_path="incoming-invites")
+    @conditional_lists
     def incoming_invites(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self._paginated_invites(request)
 
     @action(methods=('GET',), detail=False, url_path="outgoing-invites")
+    @conditional_lists
     def outgoing_invites(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self._paginated_invites(request)
 
     @action(methods=('GET',), detail=False, url_path="friends", url_name="friends")
+    @conditional_lists
     def friends_list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        friend_ids = get_friend_id_window(
+            request.user,
+            request.lists_version,
+            *self.paginator.window_bounds(request),
+        )
+        return self._paginated_users(friend_ids, request)
+
+    @action(
+        methods=('GET',),
+        detail=False,
+        url_path="friends/export",
+        url_name="friends-export",
+        renderer_classes=(NDJSONRenderer, CSVRenderer),
+    )
+    def export_friends(self, request, *args, **kwargs):
+        rows = request.user.friends.order_by("id").values_list(*EXPORT_FRIEND_FIELDS)
+        return self._export(request, "friends", EXPORT_FRIEND_FIELDS, rows)
+
+    @action(
+        methods=('GET',),
+        detail=False,
+        url_path="invites/export",
+        url_name="invites-export",
+        renderer_classes=(NDJSONRenderer, CSVRenderer),
+    )
+    def export_invites(self, request, *args, **kwargs):
+        rows = (
+            Invite.objects
+            .filter(Q(owner=request.user) | Q(target=request.user))
+            .annotate(owner_username=F("owner__username"), target_username=F("target__username"))
+            .order_by("id")
+            .values_list(*EXPORT_INVITE_FIELDS)
+        )
+        return self._export(request, "invites", EXPORT_INVITE_FIELDS, rows)
+
+    @action(methods=('GET',), detail=False, url_path="suggestions", url_name="suggestions")
+    def suggestions(self, request, *args, **kwargs):
+        serializer = SuggestionsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        suggestions = get_suggestions(request.user, serializer.validated_data["limit"])
+        return Response(
+            data=self.get_serializer(suggestions, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(methods=('GET',), detail=False, url_path="search", url_name="search")
+    def search(self, request, *args, **kwargs):
+        serializer = UserSearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        limit, offset = serializer.validated_data["limit"], serializer.validated_data["offset"]
+        found = search_users(serializer.validated_data["q"], offset + limit + 1)
+        page = found[offset:offset + limit]
+        fields = self._values_serializer(request).fields
+        payloads = get_user_payloads(page)
+        url = request.build_absolute_uri()
+        has_next = len(found) > offset + limit and offset + limit <= MAX_SEARCH_OFFSET
+        return Response(
+            data={
+                "next": replace_query_param(url, "offset", offset + limit) if has_next else None,
+                "previous": replace_query_param(url, "offset", max(offset - limit, 0)) if offset else None,
+                "results": [project(payloads[user_id], fields) for user_id in page if user_id in payloads],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(methods=('GET',), detail=True, url_path="mutual-friends", url_name="mutual-friends")
+    def mutual_friends(self, request, *args, **kwargs):
+        user = self.get_object()
+        if request.user.id == user.id:
+            return Response(
+                data={"message": "Нельзя узнавать общих друзей с самим собой"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        graph = get_friend_graph()
+        if graph is not None:
+            mutual_friend_ids = graph.mutual_friend_ids(request.user.id, user.id)
+            response = self._paginated_users(mutual_friend_ids, request)
+            response.data["count"] = len(mutual_friend_ids)
+            return response
+        queryset = request.user.mutual_friends(user)
+        response = self._users_page(self.paginate_queryset(queryset.values_list("id", flat=True)), request)
+        response.data["count"] = queryset.count()
+        return response
+
+    @action(methods=('GET',), detail=True, url_path="distance", url_name="distance")
+    def get_distance(self, request, *args, **kwargs):
+        user = self.get_object()
+        if request.user.id == user.id:
+            return Response(
+                data={"message": "Нельзя узнавать расстояние до самого себя"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = DistanceQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        path, too_far = find_path(request.user.id, user.id, serializer.validated_data["max_depth"])
+        data = {"distance": len(path) - 1 if path else None, "too_far": too_far}
+        if serializer.validated_data["path"]:
+            users = User.objects.in_bulk(path or ())
+            data["path"] = self.get_serializer([users[user_id] for user_id in path or ()], many=True).data
+        return Response(
+            data=data,
+            status=status.HTTP_200_OK,
+        )
 
     @action(methods=('GET',), detail=True, url_path="status", url_name="friend-status")
     def get_friend_status(self, request, *args, **kwargs):
@@ -47,24 +230,24 @@ class UserViewSet(CreateReadListViewSet):
                 data={"message": "Нельзя узнавать статус с самим собой"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        friend_status = FriendStatuses.NOT_FRIENDS
-        if request.user.friends.filter(id=user.id).exists():
-            friend_status = FriendStatuses.IS_FRIENDS
-        elif request.user.incoming.filter(owner=user, target=request.user, is_accept=None).exists():
-            friend_status = FriendStatuses.IS_INCOMING
-        elif request.user.outgoing.filter(target=user, owner=request.user, is_accept=None).exists():
-            friend_status = FriendStatuses.IS_OUTGOING
         return Response(
-            data={"status": friend_status},
+            data={"status": resolve_friend_status(request.user, user)},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(methods=('GET',), detail=False, url_path="statuses", url_name="friend-statuses")
+    def get_friend_statuses(self, request, *args, **kwargs):
+        serializer = FriendStatusesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            data=get_friend_statuses(request.user, serializer.validated_data["ids"]),
             status=status.HTTP_200_OK,
         )
 
     @action(methods=('DELETE',), detail=True, url_path="delete-friend")
     def delete_friend(self, request, *args, **kwargs):
         user = self.get_object()
-        if request.user.friends.filter(id=user.id).exists():
-            request.user.friends.remove(user)
-            user.friends.remove(request.user)
+        if remove_friends(request.user, user):
             return Response(
                 status=status.HTTP_204_NO_CONTENT,
             )
@@ -72,3 +255,49 @@ class UserViewSet(CreateReadListViewSet):
             data={"message": "Пользователь не является вашим другом"},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+    def _export(self, request, name: str, fields: tuple[str, ...], rows) -> StreamingHttpResponse:
+        """Stream the rows in the negotiated format without holding more than a chunk of them.
+
+        ``iterator`` reads PostgreSQL through a server-side cursor.
+        """
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(fields, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{name}.{renderer.format}"'
+        return response
+
+    def _values_serializer(self, request) -> ValuesSerializer:
+        """Serializer of the fields asked for with ``?fields=``, all by default."""
+        serializer_class = self.get_serializer_class()
+        return ValuesSerializer.compile(
+            serializer_class,
+            get_sparse_fields(request, ValuesSerializer.compile(serializer_class).fields),
+        )
+
+    def _paginated_users(self, ids, request) -> Response:
+        """Page of ascending user ids kept in memory or in the cache."""
+        return self._users_page(self.paginator.paginate_ids(ids, request, self), request)
+
+    def _users_page(self, page, request) -> Response:
+        """Page of user ids rendered from cached payloads."""
+        fields = self._values_serializer(request).fields
+        payloads = get_user_payloads(page)
+        return self.get_paginated_response(
+            [project(payloads[user_id], fields) for user_id in page if user_id in payloads],
+        )
+
+    def _paginated_invites(self, request) -> Response:
+        """Page of invites read as ``values()`` rows with users from cached payloads."""
+        serializer = self._values_serializer(request)
+        page = self.paginate_queryset(serializer.values(self.get_queryset()))
+        data = serializer.to_representation(page)
+        nested = [name for name in ("target", "owner") if name in serializer.fields]
+        if nested:
+            users = get_user_payloads({invite[name] for invite in data for name in nested})
+            for invite in data:
+                for name in nested:
+                    invite[name] = users[invite[name]]
+        return self.get_paginated_response(data)
@@ -0,0 +1,249 @@
+"""Throughput, latency percentiles and queries per request of every API endpoint.
+
+Seeds a throwaway database with a synthetic social graph: ``--users``
+users with ``--mean-degree`` friends on average, drawn from a
+``--degree`` distribution, and ``--invite-ratio`` pending invites per
+friendship. Counters and suggestions are recomputed afterwards, as the
+maintenance commands would do. Then every endpoint of
+``config/api_router.py`` is called ``--requests`` times in-process,
+authenticated with a real access token, and reported one row per
+endpoint. Write endpoints get fresh arguments on every call, so every
+request succeeds.
+
+    DATABASE_URL=postgres://... python -m benchmarks.api --users 100000 --degree power
+
+The same ``--seed`` gives the same graph and the same requests.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import time
+from typing import Callable, NamedTuple, Optional
+
+from benchmarks.common import benchmark_database, bulk_insert, seed_users, setup_django
+
+PASSWORD = "benchmark-password"
+STATUSES_BATCH = 50
+BULK_TARGETS = 20
+
+
+class Case(NamedTuple):
+    url_name: str
+    method: str
+    # Builds the n-th request: ``(kwargs of the url, body or query, user id)``.
+    build: Callable[[int], tuple[dict, Optional[dict], Optional[int]]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--mean-degree", type=float, default=10)
+    parser.add_argument("--degree", choices=("uniform", "power"), default="power")
+    parser.add_argument("--invite-ratio", type=float, default=0.2, help="Pending invites per friendship.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    # Measure the production configuration, without the debug toolbar.
+    os.environ.setdefault("DJANGO_DEBUG", "False")
+    setup_django()
+    random.seed(args.seed)
+    with benchmark_database(keepdb=args.keepdb):
+        from apps.users.models import Friendship
+
+        if not Friendship.objects.exists():
+            started = time.perf_counter()
+            seed(args.users, args.mean_degree, args.degree, args.invite_ratio)
+            print(f"seeded in {time.perf_counter() - started:.0f} s")
+        cases = build_cases(args.requests)
+        missing = endpoint_names() - {case.url_name for case in cases}
+        if missing:
+            parser.error(f"no benchmark for {', '.join(sorted(missing))}")
+        results = [run_case(case, args.requests) for case in cases]
+
+    print(f"{'endpoint':<26} {'method':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for result in results:
+        print(
+            f"{result['endpoint']:<26} {result['method']:<6} {result['throughput']:>8.0f} "
+            f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} {result['queries']:>8.1f}"
+            + (f"  {result['failed']} failed" if result["failed"] else "")
+        )
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"arguments": vars(args), "results": results}, output, indent=2)
+
+
+def seed(users: int, mean_degree: float, degree: str, invite_ratio: float) -> None:
+    from django.core.management import call_command
+
+    from apps.friends.models import Invite
+    from apps.users.models import Friendship
+    from apps.users.services import rebuild_suggestions
+
+    ids = seed_users(users)
+    if degree == "power":
+        # Endpoints are drawn in proportion to Pareto weights, so a few
+        # users get thousands of friends and most get a handful.
+        weights = [random.paretovariate(2) for _ in ids]
+    else:
+        weights = None
+    pairs = set()
+    while len(pairs) < users * mean_degree // 2:
+        for user_id, friend_id in zip(random.choices(ids, weights, k=10_000), random.choices(ids, k=10_000)):
+            if user_id != friend_id:
+                pairs.add((min(user_id, friend_id), max(user_id, friend_id)))
+    pairs = set(list(pairs)[:int(users * mean_degree // 2)])
+    bulk_insert(Friendship, (Friendship(user_id=user_id, friend_id=friend_id) for user_id, friend_id in pairs))
+
+    invites = set()
+    while len(invites) < len(pairs) * invite_ratio:
+        owner_id, target_id = random.choices(ids, k=2)
+        if (
+            owner_id != target_id
+            and (min(owner_id, target_id), max(owner_id, target_id)) not in pairs
+            and (target_id, owner_id) not in invites
+        ):
+            invites.add((owner_id, target_id))
+    bulk_insert(Invite, (Invite(owner_id=owner_id, target_id=target_id) for owner_id, target_id in invites))
+
+    call_command("recount_friends_counters", stdout=io.StringIO())
+    rebuild_suggestions()
+
+
+def build_cases(requests: int) -> list[Case]:
+    from django.db.models import Count
+
+    from apps.friends.models import Invite
+    from apps.users.models import Friendship, User
+
+    ids = list(User.objects.values_list("id", flat=True))
+    # Users without friends or invites, so that invites from them are always valid.
+    fresh_ids = seed_users(2 * requests)[-2 * requests:]
+    token_user = User.objects.create_user(username="benchmark", password=PASSWORD)
+    friendships = random.sample(list(Friendship.objects.values_list("user", "friend")), requests)
+    pending = random.sample(list(Invite.objects.filter(is_accept=None).values_list("id", "target")), 2 * requests)
+    accepted_ids = {target_id for _, target_id in pending[:requests]}
+    bulk_targets = [
+        target_id
+        for target_id, _ in Invite.objects.filter(is_accept=None)
+        .exclude(target__in=accepted_ids)
+        .order_by()
+        .values_list("target")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)[:requests]
+    ]
+    invite_ids = [invite_id for invite_id, _ in pending[requests:]]
+    invite_owners = dict(Invite.objects.filter(id__in=invite_ids).values_list("id", "owner"))
+
+    def other_user(n: int) -> tuple[dict, None, int]:
+        user_id, other_id = random.sample(ids, 2)
+        return {"pk": other_id}, None, user_id
+
+    def refresh(n: int):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        return {}, {"refresh": str(RefreshToken.for_user(token_user))}, None
+
+    names = list(User.objects.values_list("username", flat=True)[:requests])
+
+    return [
+        Case("users-list", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-list", "post", lambda n: ({}, {"username": f"benchmark-{n}", "password": PASSWORD}, None)),
+        Case("users-detail", "get", lambda n: ({"pk": random.choice(ids)}, None, random.choice(ids))),
+        Case("users-friends", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-incoming-invites", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-outgoing-invites", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-suggestions", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-friends-export", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-invites-export", "get", lambda n: ({}, None, random.choice(ids))),
+        Case("users-search", "get", lambda n: ({}, {"q": names[n % len(names)][:6]}, random.choice(ids))),
+        Case("users-friend-status", "get", other_user),
+        Case(
+            "users-friend-statuses",
+            "get",
+            lambda n: ({}, {"ids": random.sample(ids, STATUSES_BATCH)}, random.choice(ids)),
+        ),
+        Case("users-mutual-friends", "get", other_user),
+        Case("users-distance", "get", other_user),
+        Case("users-delete-friend", "delete", lambda n: ({"pk": friendships[n][1]}, None, friendships[n][0])),
+        Case("invites-list", "post", lambda n: ({}, {"target": random.choice(ids)}, fresh_ids[n])),
+        Case(
+            "invites-bulk",
+            "post",
+            lambda n: ({}, {"targets": random.sample(ids, BULK_TARGETS)}, fresh_ids[requests + n]),
+        ),
+        Case(
+            "invites-detail",
+            "get",
+            lambda n: ({"pk": invite_ids[n]}, None, invite_owners[invite_ids[n]]),
+        ),
+        Case("invites-accept", "patch", lambda n: ({"pk": pending[n][0]}, {"is_accept": True}, pending[n][1])),
+        Case(
+            "invites-bulk-accept",
+            "patch",
+            lambda n: ({}, {"is_accept": True, "all": True}, bulk_targets[n % len(bulk_targets)]),
+        ),
+        Case("token_obtain_pair", "post", lambda n: ({}, {"username": "benchmark", "password": PASSWORD}, None)),
+        Case("token_refresh", "post", refresh),
+    ]
+
+
+def endpoint_names() -> set[str]:
+    from config.api_router import urlpatterns
+
+    # The browsable root only exists with DEBUG.
+    return {pattern.name for pattern in urlpatterns} - {"api-root"}
+
+
+def run_case(case: Case, requests: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from apps.users.authentication import get_access_token
+    from apps.users.models import User
+
+    client = APIClient()
+    tokens = {}
+    timings = []
+    queries = []
+    failed = 0
+    for n in range(requests):
+        kwargs, data, user_id = case.build(n)
+        if user_id is None:
+            client.credentials()
+        else:
+            if user_id not in tokens:
+                tokens[user_id] = get_access_token(User.objects.get(id=user_id))
+            client.credentials(HTTP_AUTHORIZATION=f"JWT {tokens[user_id]}")
+        url = reverse(f"api:{case.url_name}", kwargs=kwargs)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, case.method)(url, data=data, format=None if case.method == "get" else "json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            failed += 1
+    timings.sort()
+    return {
+        "endpoint": case.url_name,
+        "method": case.method.upper(),
+        "throughput": 1000 / statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[int(len(timings) * 0.95) - 1],
+        "p99": timings[int(len(timings) * 0.99) - 1],
+        "queries": statistics.fmean(queries),
+        "failed": failed,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Concurrency and memory of the hot read endpoints under WSGI and ASGI.
+
+Seeds a throwaway database and serves it in turn with Django's threaded
+WSGI server (the deployment before ASGI), with uvicorn running the sync
+views and with uvicorn running the async views (``ASYNC_VIEWS``). Each
+server gets ``--concurrency`` clients that request friend lists, invites
+and friend statuses of random users for ``--duration`` seconds. Reports
+requests per second, latency, failed requests, and the server memory and
+threads per request in flight.
+
+``--db-latency`` delays every query by that many milliseconds, standing in
+for the network round-trip to a database on another host.
+
+    DATABASE_URL=postgres://... python -m benchmarks.async_views --concurrency 200 --db-latency 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import benchmark_database, bulk_insert, seed_users, setup_django
+
+MODES = ("wsgi", "asgi-sync", "asgi-async")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--friends", type=int, default=50, help="Friends of every user.")
+    parser.add_argument("--invites", type=int, default=10, help="Pending invites of every user.")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--db-latency", type=float, default=0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--serve", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--database-name", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port, args.database_name, args.db_latency)
+        return
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb) as connection:
+        from apps.users.authentication import get_access_token
+        from apps.users.models import Friendship, User
+
+        if not Friendship.objects.exists():
+            seed(args.users, args.friends, args.invites)
+        ids = list(User.objects.values_list("id", flat=True))
+        tokens = [
+            str(get_access_token(user))
+            for user in User.objects.filter(id__in=random.sample(ids, min(len(ids), 1000)))
+        ]
+        requests = [
+            (path, token)
+            for token in tokens
+            for path in (
+                "/api/users/friends/",
+                "/api/users/incoming-invites/",
+                "/api/users/outgoing-invites/",
+                f"/api/users/{random.choice(ids)}/status/",
+            )
+        ]
+        print(
+            f"{len(ids)} users, {args.concurrency} clients for {args.duration:.0f} s, "
+            f"{args.db_latency:g} ms added to every query"
+        )
+        for mode in MODES:
+            report(mode, run_mode(mode, args, connection.settings_dict["NAME"], requests), args.concurrency)
+
+
+def seed(users: int, friends: int, invites: int) -> None:
+    from apps.friends.models import Invite
+    from apps.users.models import Friendship
+
+    ids = seed_users(users)
+    pairs = set()
+    while len(pairs) < users * friends // 2:
+        pairs.add(tuple(sorted(random.sample(ids, 2))))
+    bulk_insert(Friendship, (Friendship(user_id=user_id, friend_id=friend_id) for user_id, friend_id in pairs))
+    invited = set()
+    while len(invited) < users * invites:
+        owner_id, target_id = random.sample(ids, 2)
+        if tuple(sorted((owner_id, target_id))) not in pairs and (target_id, owner_id) not in invited:
+            invited.add((owner_id, target_id))
+    bulk_insert(Invite, (Invite(owner_id=owner_id, target_id=target_id) for owner_id, target_id in invited))
+
+
+def serve(mode: str, port: int, database_name: str, db_latency: float) -> None:
+    os.environ["DJANGO_DEBUG"] = "False"
+    os.environ["ASYNC_VIEWS"] = str(mode == "asgi-async")
+    setup_django()
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+
+    settings.DATABASES["default"]["NAME"] = database_name
+    if db_latency:
+        def delay(execute, sql, params, many, context):
+            time.sleep(db_latency / 1000)
+            return execute(sql, params, many, context)
+
+        def add_delay(connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(add_delay, weak=False)
+
+    if mode == "wsgi":
+        from django.core.servers.basehttp import WSGIRequestHandler, run
+        from django.core.wsgi import get_wsgi_application
+
+        # Silence the request log of the development server.
+        WSGIRequestHandler.log_message = lambda *args: None
+        run("127.0.0.1", port, get_wsgi_application(), threading=True)
+    else:
+        import uvicorn
+
+        uvicorn.run("config.asgi:application", port=port, lifespan="off", log_level="warning", backlog=4096)
+
+
+def run_mode(mode: str, args, database_name: str, requests: list[tuple[str, str]]) -> dict:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.async_views",
+            "--serve", mode,
+            "--port", str(args.port),
+            "--database-name", database_name,
+            "--db-latency", str(args.db_latency),
+        ],
+    )
+    try:
+        wait_for_port(args.port)
+        asyncio.run(load(args.port, requests[:args.concurrency], args.concurrency, 2))
+        idle = status(server.pid)
+        sampler = Sampler(server.pid)
+        sampler.start()
+        results = asyncio.run(load(args.port, requests, args.concurrency, args.duration))
+        sampler.stop()
+    finally:
+        server.terminate()
+        server.wait()
+    return {"idle": idle, "peak": sampler.peak, **results}
+
+
+def report(mode: str, results: dict, concurrency: int) -> None:
+    latencies = sorted(results["latencies"])
+    memory = results["peak"]["rss"] - results["idle"]["rss"]
+    print(
+        f"{mode}: {len(latencies) / results['elapsed']:.0f} requests/s, "
+        f"p50 {latencies[len(latencies) // 2]:.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms, "
+        f"{results['failed']} failed; "
+        f"memory {results['idle']['rss'] / 2 ** 20:.0f} MiB idle, "
+        f"+{memory / 2 ** 20:.1f} MiB under load ({memory / concurrency / 1024:.0f} KiB per request in flight), "
+        f"{results['peak']['threads']} threads"
+    )
+
+
+async def load(port: int, requests: list[tuple[str, str]], concurrency: int, duration: float) -> dict:
+    deadline = time.perf_counter() + duration
+    latencies = []
+    failed = 0
+
+    async def client(offset: int) -> None:
+        nonlocal failed
+        index = offset
+        while time.perf_counter() < deadline:
+            path, token = requests[index % len(requests)]
+            index += concurrency
+            started = time.perf_counter()
+            try:
+                code = await get(port, path, token)
+            except OSError:
+                code = 0
+            if code == 200:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    return {"latencies": latencies, "failed": failed, "elapsed": time.perf_counter() - started}
+
+
+async def get(port: int, path: str, token: str) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: JWT {token}\r\n"
+            f"Connection: close\r\n\r\n".encode(),
+        )
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1]) if response else 0
+
+
+def wait_for_port(port: int) -> None:
+    for _ in range(300):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def status(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/status") as lines:
+        for line in lines:
+            name, _, value = line.partition(":")
+            if name == "VmRSS":
+                values["rss"] = int(value.split()[0]) * 1024
+            elif name == "Threads":
+                values["threads"] = int(value)
+    return values
+
+
+class Sampler(threading.Thread):
+    """Peak memory and threads of a process, sampled every 50 ms."""
+
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak = status(pid)
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(0.05):
+            current = status(self.pid)
+            self.peak = {name: max(value, current[name]) for name, value in self.peak.items()}
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+if __name__ == "__main__":
+    main()
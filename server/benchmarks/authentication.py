@@ -0,0 +1,132 @@
+"""Queries and latency that authentication adds to ``/api/users/friends/``.
+
+Seeds ``--users`` users with ``--friends`` friends each and calls the
+friend list of random users ``--requests`` times, authenticated in turn
+by a JWT read from the database on every request (the setup before the
+principal cache), by a JWT read through the principal cache, by a
+database session with the model backend and by a cached session with the
+cached backend. Every mode warms the caches with one pass over the users
+first, so the rows show the steady state where friend lists and
+payloads are cached and only authentication differs.
+
+    DATABASE_URL=postgres://... python -m benchmarks.authentication --users 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from benchmarks.common import benchmark_database, bulk_insert, seed_users, setup_django
+
+MODES = {
+    "jwt": {
+        "authentication": "rest_framework_simplejwt.authentication.JWTAuthentication",
+    },
+    "cached-jwt": {
+        "authentication": "apps.users.authentication.CachedJWTAuthentication",
+    },
+    "session": {
+        "authentication": "rest_framework.authentication.SessionAuthentication",
+        "backend": "django.contrib.auth.backends.ModelBackend",
+        "engine": "django.contrib.sessions.backends.db",
+    },
+    "cached-session": {
+        "authentication": "rest_framework.authentication.SessionAuthentication",
+        "backend": "apps.users.authentication.CachedModelBackend",
+        "engine": "django.contrib.sessions.backends.cached_db",
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--friends", type=int, default=20, help="Friends of every user.")
+    parser.add_argument("--clients", type=int, default=500, help="Users sending the requests.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_DEBUG", "False")
+    setup_django()
+    from django.conf import settings
+
+    if not settings.CACHES["default"]["BACKEND"].endswith("RedisCache"):
+        # The local memory cache keeps 300 keys by default, fewer than the payloads of the clients.
+        settings.CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": 10 * args.users}
+    with benchmark_database(keepdb=args.keepdb):
+        from apps.users.models import Friendship, User
+
+        if not Friendship.objects.exists():
+            seed(args.users, args.friends)
+        clients = list(User.objects.order_by("?")[:args.clients])
+        print(f"{args.users} users, {args.friends} friends each, {len(clients)} clients")
+        print(f"{'mode':<16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for mode, options in MODES.items():
+            result = run_mode(options, clients, args.requests)
+            print(
+                f"{mode:<16} {result['throughput']:>8.0f} {result['p50']:>8.2f} "
+                f"{result['p99']:>8.2f} {result['queries']:>8.2f}"
+            )
+
+
+def seed(users: int, friends: int) -> None:
+    from apps.users.models import Friendship
+
+    ids = seed_users(users)
+    pairs = set()
+    while len(pairs) < users * friends // 2:
+        pairs.add(tuple(sorted(random.sample(ids, 2))))
+    bulk_insert(Friendship, (Friendship(user_id=user_id, friend_id=friend_id) for user_id, friend_id in pairs))
+
+
+def run_mode(options: dict, users: list, requests: int) -> dict:
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.utils.module_loading import import_string
+    from rest_framework.test import APIClient
+
+    from apps.users.authentication import get_access_token
+    from apps.users.viewsets import UserViewSet
+
+    cache.clear()
+    UserViewSet.authentication_classes = (import_string(options["authentication"]),)
+    with override_settings(
+        AUTHENTICATION_BACKENDS=[options.get("backend", "django.contrib.auth.backends.ModelBackend")],
+        SESSION_ENGINE=options.get("engine", "django.contrib.sessions.backends.db"),
+    ):
+        clients = []
+        for user in users:
+            client = APIClient()
+            if "backend" in options:
+                client.force_login(user, backend=options["backend"])
+            else:
+                client.credentials(HTTP_AUTHORIZATION=f"JWT {get_access_token(user)}")
+            clients.append(client)
+        for client in clients:
+            client.get("/api/users/friends/")
+
+        timings = []
+        queries = []
+        for _ in range(requests):
+            client = random.choice(clients)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get("/api/users/friends/")
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            assert response.status_code == 200, response.status_code
+    timings.sort()
+    return {
+        "throughput": 1000 / statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[int(len(timings) * 0.99) - 1],
+        "queries": statistics.fmean(queries),
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+import django
+
+from apps.core.constants import BATCH_SIZE
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb: bool = False):
+    """Run the benchmark inside a throwaway test database.
+
+    The database configured by ``DATABASE_URL`` is never touched: a
+    ``test_<name>`` database is created next to it, migrated and dropped
+    at the end unless ``keepdb`` is set.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def seed_users(count: int) -> list[int]:
+    """Insert ``count`` users with unusable passwords and return their ids."""
+    from apps.users.models import User
+
+    start = User.objects.count()
+    for offset in range(0, count, BATCH_SIZE):
+        User.objects.bulk_create(
+            User(username=f"bench{start + number}", password="!")
+            for number in range(offset, min(offset + BATCH_SIZE, count))
+        )
+    return list(User.objects.order_by("id").values_list("id", flat=True))
+
+
+def bulk_insert(model, rows) -> None:
+    """Insert model instances from an iterable in ``BATCH_SIZE`` chunks."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def measure(function: Callable, repeat: int) -> dict:
+    """Call ``function`` ``repeat`` times and return latency stats in ms."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def explain(queryset) -> str:
+    from django.db import connection
+
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
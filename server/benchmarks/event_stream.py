@@ -0,0 +1,142 @@
+"""Thousands of idle event streams held by one ASGI process.
+
+Starts uvicorn with the event stream app in a thread of this process and
+opens ``--connections`` streams from a child process, one user per stream.
+Reports the memory of the server per open stream after ``--idle`` seconds
+and the delay of one event published to every user, measured from the
+publish call until each client has read it.
+
+    python -m benchmarks.event_stream --connections 5000 --idle 30
+
+Streams authenticate their users once when they open, so ``--connections``
+users are seeded into a throwaway database first. The limit of open files (``ulimit -n``) has to be above the number of
+connections.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import threading
+import time
+
+from benchmarks.common import benchmark_database, seed_users, setup_django
+
+CONNECT_CONCURRENCY = 200
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--idle", type=float, default=30)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        run(args)
+
+
+def run(args) -> None:
+    import uvicorn
+    from django.conf import settings
+
+    from apps.events.brokers import get_broker
+    from apps.events.streams import EventStream
+    from apps.users.authentication import get_access_token
+    from apps.users.models import User
+
+    async def not_found(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    settings.EVENTS_BROKER = "apps.events.brokers.InProcessBroker"
+    broker = get_broker()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            EventStream(not_found),
+            port=args.port,
+            lifespan="off",
+            log_level="warning",
+            backlog=CONNECT_CONCURRENCY * 2,
+        ),
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    if User.objects.count() < args.connections:
+        seed_users(args.connections - User.objects.count())
+    users = list(User.objects.order_by("id")[:args.connections])
+    tokens = [str(get_access_token(user)) for user in users]
+    baseline = rss()
+
+    # Spawned, not forked: this process already runs the server thread.
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    clients = context.Process(target=run_clients, args=(args.port, tokens, child))
+    clients.start()
+    started = time.perf_counter()
+    parent.recv()
+    while len(broker) < args.connections:
+        time.sleep(0.01)
+    print(f"{args.connections} streams opened in {time.perf_counter() - started:.1f} s")
+    time.sleep(args.idle)
+    held = rss() - baseline
+    print(
+        f"server memory {held / 2 ** 20:.1f} MiB after {args.idle:.0f} s idle, "
+        f"{held / args.connections / 1024:.1f} KiB per stream"
+    )
+
+    published = time.time()
+    broker.publish([user.id for user in users], {"type": "benchmark"})
+    delays = sorted((received - published) * 1000 for received in parent.recv())
+    clients.join()
+    print(
+        f"event to {len(delays)} streams: "
+        f"p50 {statistics.median(delays):.1f} ms, "
+        f"p99 {delays[int(len(delays) * 0.99) - 1]:.1f} ms, "
+        f"max {delays[-1]:.1f} ms"
+    )
+    while len(broker):
+        time.sleep(0.01)
+    server.should_exit = True
+
+
+def run_clients(port: int, tokens: list[str], pipe) -> None:
+    asyncio.run(hold_streams(port, tokens, pipe))
+
+
+async def hold_streams(port: int, tokens: list[str], pipe) -> None:
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    streams = await asyncio.gather(*(open_stream(port, token, semaphore) for token in tokens))
+    pipe.send("ready")
+    pipe.send(await asyncio.gather(*(read_event(reader) for reader, _ in streams)))
+    for _, writer in streams:
+        writer.close()
+
+
+async def open_stream(port: int, token: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET /api/events/?token={token} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await reader.readuntil(b"\r\n\r\n")
+        return reader, writer
+
+
+async def read_event(reader: asyncio.StreamReader) -> float:
+    while b"event: " not in await reader.readline():
+        pass
+    return time.time()
+
+
+def rss() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+if __name__ == "__main__":
+    main()
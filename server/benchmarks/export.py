@@ -0,0 +1,76 @@
+"""Memory and speed of the friend list export for users with many friends.
+
+Seeds one hub user per ``--friends`` size, friends with that many users,
+and exports the friends of every hub as NDJSON and CSV through the API.
+For comparison the same friends are serialized at once with
+``UserSerializer`` and rendered to JSON, as a list endpoint without
+pagination would. Reports the peak of memory allocated by Python while
+the response is produced, and the rows per second of another run without
+memory tracing, which slows allocations down.
+
+    DATABASE_URL=postgres://... python -m benchmarks.export --friends 1000 10000 100000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from benchmarks.common import benchmark_database, bulk_insert, seed_users, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--friends", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_DEBUG", "False")
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        from apps.users.models import Friendship, User
+
+        sizes = sorted(args.friends)
+        if not Friendship.objects.exists():
+            seed(sizes)
+        hubs = list(User.objects.order_by("id")[:len(sizes)])
+        print(f"{'friends':>8} {'method':<8} {'peak MiB':>9} {'rows/s':>9}")
+        for size, hub in zip(sizes, hubs):
+            for method in ("list", "ndjson", "csv"):
+                started = time.perf_counter()
+                produce(method, hub)
+                elapsed = time.perf_counter() - started
+                tracemalloc.start()
+                produce(method, hub)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{size:>8} {method:<8} {peak / 2 ** 20:>9.1f} {size / elapsed:>9.0f}")
+
+
+def seed(sizes: list[int]) -> None:
+    from apps.users.models import Friendship
+
+    hubs, ids = seed_users(len(sizes))[:len(sizes)], seed_users(max(sizes))[len(sizes):]
+    bulk_insert(
+        Friendship,
+        (Friendship(user_id=hub, friend_id=friend_id) for hub, size in zip(hubs, sizes) for friend_id in ids[:size]),
+    )
+
+
+def produce(method: str, hub) -> None:
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    from apps.users.serializers import UserSerializer
+
+    if method == "list":
+        JSONRenderer().render(UserSerializer(hub.friends.order_by("id"), many=True).data)
+        return
+    client = APIClient()
+    client.force_authenticate(user=hub)
+    response = client.get("/api/users/friends/export/", data={"format": method})
+    for _ in response.streaming_content:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Memory footprint and lookup latency of the in-memory friend graph.
+
+Seeds a throwaway database with ``--users`` users and ``--edges`` random
+friendships, loads them into ``FriendGraph`` under ``tracemalloc`` and
+reports the bytes per friendship, then compares graph lookups with the
+equivalent database queries.
+
+    DATABASE_URL=postgres://... python -m benchmarks.friend_graph --edges 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import benchmark_database, bulk_insert, measure, seed_users, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        from apps.users.graph import FriendGraph
+        from apps.users.models import Friendship, User
+
+        if not Friendship.objects.exists():
+            seed(args.users, args.edges)
+        edges = Friendship.objects.count()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        graph = FriendGraph.load()
+        load_time = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{edges} friendships of {len(graph)} users loaded in {load_time:.2f} s")
+        print(f"graph size {size / 2 ** 20:.1f} MiB, {size / edges:.1f} bytes per friendship")
+
+        ids = list(User.objects.values_list("id", flat=True))
+        pairs = [random.sample(ids, 2) for _ in range(args.repeat)]
+        lookups = {
+            "is friend (graph)": lambda: [graph.is_friend(user_id, other_id) for user_id, other_id in pairs],
+            "is friend (database)": lambda: [
+                Friendship.objects.between(user_id, other_id).exists() for user_id, other_id in pairs
+            ],
+            "mutual friends (graph)": lambda: [
+                graph.mutual_friend_ids(user_id, other_id) for user_id, other_id in pairs
+            ],
+            "mutual friends (database)": lambda: [
+                list(User(id=user_id).mutual_friends(User(id=other_id)).values_list("id"))
+                for user_id, other_id in pairs
+            ],
+        }
+        for name, lookup in lookups.items():
+            stats = measure(lookup, 1)
+            print(f"{name}: {stats['mean'] * 1000 / args.repeat:.1f} us per lookup")
+
+
+def seed(users: int, edges: int) -> None:
+    from apps.users.models import Friendship
+
+    ids = seed_users(users)
+    pairs = set()
+    while len(pairs) < edges:
+        pairs.add(tuple(sorted(random.sample(ids, 2))))
+    bulk_insert(Friendship, (Friendship(user_id=user_id, friend_id=friend_id) for user_id, friend_id in pairs))
+
+
+if __name__ == "__main__":
+    main()
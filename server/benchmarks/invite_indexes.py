@@ -0,0 +1,103 @@
+"""Query plans of pending-invite lookups with and without the partial indexes.
+
+Seeds a throwaway database with ``--invites`` invites, of which only
+``--pending-ratio`` are still waiting for an answer, then runs the hot
+pending-invite queries twice: with the indexes and the unique constraint
+from ``Invite.Meta`` and, inside a rolled back transaction, without them.
+
+    DATABASE_URL=postgres://... python -m benchmarks.invite_indexes --invites 3000000
+"""
+import argparse
+import random
+
+from benchmarks.common import benchmark_database, bulk_insert, explain, measure, seed_users, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--invites", type=int, default=3_000_000)
+    parser.add_argument("--pending-ratio", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        parser.error("the benchmark compares PostgreSQL query plans, point DATABASE_URL to a PostgreSQL server")
+    with benchmark_database(keepdb=args.keepdb) as connection:
+        from apps.friends.models import Invite
+
+        if not Invite.objects.exists():
+            seed(args.users, args.invites, args.pending_ratio)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE friends_invite")
+
+        pending = Invite.objects.filter(is_accept=None).order_by("id").first()
+        queries = {
+            "incoming list": lambda: Invite.objects.filter(target_id=pending.target_id, is_accept=None).order_by("id"),
+            "outgoing list": lambda: Invite.objects.filter(owner_id=pending.owner_id, is_accept=None).order_by("id"),
+            "pending pair": lambda: Invite.objects.filter(
+                owner_id=pending.owner_id,
+                target_id=pending.target_id,
+                is_accept=None,
+            ),
+        }
+        with_indexes = run(queries, args.repeat)
+        without_indexes = run_without_indexes(connection, Invite, queries, args.repeat)
+
+    for name in queries:
+        print(f"=== {name}")
+        for label, results in (("with indexes", with_indexes), ("without indexes", without_indexes)):
+            plan, stats = results[name]
+            print(f"--- {label}: mean {stats['mean']:.3f} ms, p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms")
+            print(plan)
+        print()
+
+
+def seed(users: int, invites: int, pending_ratio: float) -> None:
+    from apps.friends.models import Invite
+
+    ids = seed_users(users)
+    pending_pairs = set()
+
+    def rows():
+        for _ in range(invites):
+            owner_id, target_id = random.sample(ids, 2)
+            is_accept = None
+            if random.random() >= pending_ratio or (owner_id, target_id) in pending_pairs:
+                is_accept = random.random() < 0.5
+            else:
+                pending_pairs.add((owner_id, target_id))
+            yield Invite(owner_id=owner_id, target_id=target_id, is_accept=is_accept)
+
+    bulk_insert(Invite, rows())
+
+
+def run(queries: dict, repeat: int) -> dict:
+    return {
+        name: (explain(build()), measure(lambda: list(build()), repeat))
+        for name, build in queries.items()
+    }
+
+
+def run_without_indexes(connection, model, queries: dict, repeat: int) -> dict:
+    from django.db import transaction
+
+    # PostgreSQL stores partial unique constraints as plain unique indexes,
+    # so every one of them can be dropped by name.
+    names = [index.name for index in model._meta.indexes] + [constraint.name for constraint in model._meta.constraints]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+            cursor.execute("ANALYZE friends_invite")
+        results = run(queries, repeat)
+        transaction.set_rollback(True)
+    return results
+
+
+if __name__ == "__main__":
+    main()
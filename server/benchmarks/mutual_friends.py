@@ -0,0 +1,73 @@
+"""Latency of the mutual-friends list for users with many friends.
+
+Builds a synthetic graph with ``UserFactory``: two hub users with
+``--friends`` friends each, ``--mutual`` of them shared, and random edges
+between the other users up to ``--edges``. Then measures the first page,
+a deep page and the count of the hubs' mutual friends.
+
+    DATABASE_URL=postgres://... python -m benchmarks.mutual_friends --friends 30000
+"""
+import argparse
+import random
+
+from benchmarks.common import benchmark_database, bulk_insert, explain, measure, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--friends", type=int, default=30_000)
+    parser.add_argument("--mutual", type=int, default=5_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+    if args.mutual > args.friends or 2 * args.friends - args.mutual > args.users - 2:
+        parser.error("the hubs need more users than --users provides")
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb) as connection:
+        from apps.users.models import Friendship, User
+
+        if not Friendship.objects.exists():
+            seed(args.users, args.friends, args.mutual, args.edges)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        hub, other = User.objects.order_by("id")[:2]
+        queryset = hub.mutual_friends(other).order_by("id")
+        count = queryset.count()
+        middle = queryset.values_list("id", flat=True)[count // 2]
+        queries = {
+            "first page": lambda: list(queryset[:args.page_size + 1]),
+            "middle page": lambda: list(queryset.filter(id__gt=middle)[:args.page_size + 1]),
+            "count": queryset.count,
+        }
+        print(f"{count} mutual friends of users with {hub.friends_count} and {other.friends_count} friends")
+        for name, query in queries.items():
+            stats = measure(query, args.repeat)
+            print(f"{name}: mean {stats['mean']:.3f} ms, p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms")
+        print(explain(queryset[:args.page_size + 1]))
+
+
+def seed(users: int, friends: int, mutual: int, edges: int) -> None:
+    from apps.users.factories import UserFactory
+    from apps.users.models import Friendship, User
+
+    bulk_insert(User, (UserFactory.build(password="!") for _ in range(users)))
+    hub, other, *ids = User.objects.order_by("id").values_list("id", flat=True)
+    sample = random.sample(ids, 2 * friends - mutual)
+    pairs = {(hub, friend) for friend in sample[:friends]}
+    pairs |= {(other, friend) for friend in sample[friends - mutual:]}
+    pairs.add((hub, other))
+    while len(pairs) < edges:
+        pairs.add(tuple(sorted(random.sample(ids, 2))))
+    bulk_insert(Friendship, (Friendship(user_id=user, friend_id=friend) for user, friend in pairs))
+    for user_id in (hub, other):
+        User.objects.filter(id=user_id).update(friends_count=Friendship.objects.of(user_id).count())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Rows per second of list serialization on responses of ``--rows`` rows.
+
+Seeds ``--rows`` users and as many invites between them, then renders all
+of them to JSON as a list endpoint would: with ``UserSerializer`` and
+``InviteSerializer`` over model instances (the setup before values-based
+serialization), with ``ValuesSerializer`` over ``values()`` rows, and with
+``ValuesSerializer`` over the columns of a sparse fieldset as requested by
+``?fields=id,username``. Invite users are nested from payloads fetched in
+bulk, as the invite lists do. The fetch is part of the timing.
+
+    DATABASE_URL=postgres://... python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import os
+
+from benchmarks.common import benchmark_database, bulk_insert, measure, seed_users, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_DEBUG", "False")
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        from apps.friends.models import Invite
+
+        if not Invite.objects.exists():
+            seed(args.rows)
+        print(f"{args.rows} rows per response, {args.repeat} runs")
+        print(f"{'case':<24} {'rows/s':>10} {'p50 ms':>8}")
+        for name, function in cases(args.rows).items():
+            result = measure(function, args.repeat)
+            print(f"{name:<24} {args.rows / result['p50'] * 1000:>10.0f} {result['p50']:>8.1f}")
+
+
+def seed(rows: int) -> None:
+    from apps.friends.models import Invite
+
+    ids = seed_users(rows)
+    bulk_insert(Invite, (Invite(owner_id=owner, target_id=ids[index - 1]) for index, owner in enumerate(ids)))
+
+
+def cases(rows: int) -> dict:
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.core.serializers import ValuesSerializer
+    from apps.friends.models import Invite
+    from apps.friends.serializers import InviteSerializer
+    from apps.users.models import User
+    from apps.users.serializers import UserSerializer
+
+    users = User.objects.order_by("id")[:rows]
+    invites = Invite.objects.order_by("id")[:rows]
+    renderer = JSONRenderer()
+
+    def payloads(user_ids) -> dict:
+        # The invite lists read them from the cache, which is left out here.
+        serializer = ValuesSerializer.compile(UserSerializer)
+        rows = serializer.values(User.objects.filter(id__in=user_ids))
+        return {row["id"]: row for row in serializer.to_representation(rows)}
+
+    def users_serializer():
+        renderer.render(UserSerializer(users, many=True).data)
+
+    def users_values(fields=None):
+        serializer = ValuesSerializer.compile(UserSerializer, fields)
+        renderer.render(serializer.to_representation(serializer.values(users)))
+
+    def invites_serializer():
+        page = list(invites)
+        context = {"users": payloads({user_id for invite in page for user_id in (invite.owner_id, invite.target_id)})}
+        renderer.render(InviteSerializer(page, many=True, context=context).data)
+
+    def invites_values():
+        serializer = ValuesSerializer.compile(InviteSerializer)
+        data = serializer.to_representation(serializer.values(invites))
+        nested = payloads({invite[name] for invite in data for name in ("owner", "target")})
+        for invite in data:
+            invite["owner"], invite["target"] = nested[invite["owner"]], nested[invite["target"]]
+        renderer.render(data)
+
+    return {
+        "users serializer": users_serializer,
+        "users values": users_values,
+        "users values id,username": lambda: users_values(("id", "username")),
+        "invites serializer": invites_serializer,
+        "invites values": invites_values,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Latency of the user search for short prefixes, long prefixes and typos.
+
+Seeds ``--users`` users with names from Faker, then searches for random
+two-letter and five-letter prefixes of their names and for names with one
+letter dropped, which only the trigram search finds. On databases other
+than PostgreSQL the in-memory prefix index is measured instead, after it
+is loaded once.
+
+    DATABASE_URL=postgres://... python -m benchmarks.user_search --users 1000000
+"""
+import argparse
+
+from benchmarks.common import benchmark_database, bulk_insert, measure, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb) as connection:
+        from apps.users.models import User
+        from apps.users.search import get_prefix_index
+        from apps.users.services import search_users
+
+        if not User.objects.exists():
+            seed(args.users)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE users_user")
+        else:
+            get_prefix_index()
+
+        names = [
+            name.lower()
+            for name in User.objects.order_by("?").values_list("last_name", flat=True)[:args.repeat]
+        ]
+        typos = [name[:2] + name[3:] for name in names if len(name) > 4]
+        queries = {
+            "prefix of 2 letters": [name[:2] for name in names],
+            "prefix of 5 letters": [name[:5] for name in names],
+            "typo": typos,
+        }
+        print(f"{User.objects.count()} users, {args.limit} results per search")
+        for name, terms in queries.items():
+            terms = iter(terms * (args.repeat // len(terms) + 1))
+            stats = measure(lambda: search_users(next(terms), args.limit), args.repeat)
+            print(f"{name}: mean {stats['mean']:.3f} ms, p50 {stats['p50']:.3f} ms, p99 {stats['p99']:.3f} ms")
+
+
+def seed(users: int) -> None:
+    from faker import Faker
+
+    from apps.users.models import User
+
+    faker = Faker(["ru_RU", "en_US"])
+    bulk_insert(
+        User,
+        (
+            User(
+                username=f"{faker.user_name()}{number}",
+                first_name=faker.first_name(),
+                last_name=faker.last_name(),
+                password="!",
+            )
+            for number in range(users)
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from django.conf import settings
-from django.urls import path
+from django.urls import URLPattern, path
 from rest_framework.routers import DefaultRouter, SimpleRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from apps.core.views import async_view
 from apps.friends.viewsets import InviteViewSet
+from apps.users.authentication import VersionedTokenObtainPairSerializer
 from apps.users.viewsets import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
@@ -11,8 +13,28 @@ router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 router.register("users", UserViewSet, basename="users")
 router.register("invites", InviteViewSet, basename="invites")
 
+# Hot read endpoints served by async views when ASYNC_VIEWS is on.
+ASYNC_URL_NAMES = (
+    "users-friend-status",
+    "users-friend-statuses",
+    "users-friends",
+    "users-incoming-invites",
+    "users-outgoing-invites",
+)
+
 app_name = "api"
 urlpatterns = router.urls + [
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path(
+        'token/',
+        TokenObtainPairView.as_view(serializer_class=VersionedTokenObtainPairSerializer),
+        name='token_obtain_pair',
+    ),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        URLPattern(pattern.pattern, async_view(pattern.callback), pattern.default_args, pattern.name)
+        if pattern.name in ASYNC_URL_NAMES else pattern
+        for pattern in urlpatterns
+    ]
@@ -1,6 +1,13 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# Imported once Django is set up.
+from apps.core.handlers import StreamingASGIHandler  # noqa E402
+from apps.events.streams import EventStream  # noqa E402
+
+django_application = StreamingASGIHandler()
+application = EventStream(django_application)
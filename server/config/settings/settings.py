@@ -30,11 +30,86 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 DATABASES = {'default': dj_database_url.config(conn_max_age=60)}
 
+# CACHES
+# ------------------------------------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                # Reads fall back to the database while Redis is down,
+                # invalidations missed meanwhile expire with USER_CACHE_TIMEOUT.
+                "IGNORE_EXCEPTIONS": True,
+            },
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", "300"))
+# Friend id lists of users with more friends are paginated in the database instead of cached whole.
+FRIEND_IDS_CACHE_MAX_DEGREE = int(os.getenv("FRIEND_IDS_CACHE_MAX_DEGREE", "1000"))
+# Users authenticating requests, 0 reads them from the database every time.
+AUTH_CACHE_TIMEOUT = int(os.getenv("AUTH_CACHE_TIMEOUT", "60"))
+
+# FRIEND GRAPH
+# ------------------------------------------------------------------------------
+FRIEND_GRAPH_ENABLED = os.getenv("FRIEND_GRAPH_ENABLED", "False") == "True"
+# Seconds between comparisons of the graph version with the database.
+FRIEND_GRAPH_CHECK_INTERVAL = float(os.getenv("FRIEND_GRAPH_CHECK_INTERVAL", "1"))
+# Rows the friendship version is spread over, transactions of users in one shard wait for each other.
+FRIEND_GRAPH_VERSION_SHARDS = int(os.getenv("FRIEND_GRAPH_VERSION_SHARDS", "64"))
+
+# DISTANCE
+# ------------------------------------------------------------------------------
+# Friendships a distance search may read before it answers "too far".
+DISTANCE_MAX_EDGES = int(os.getenv("DISTANCE_MAX_EDGES", "200000"))
+
+# USER SEARCH
+# ------------------------------------------------------------------------------
+# Reload interval of the in-memory prefix index used instead of the
+# PostgreSQL indexes on other databases.
+USER_SEARCH_INDEX_TTL = int(os.getenv("USER_SEARCH_INDEX_TTL", "300"))
+
+# SUGGESTIONS
+# ------------------------------------------------------------------------------
+# Friendship changes that read or shift more suggestion rows are recomputed
+# by the events relay instead of the request.
+SUGGESTIONS_MAX_FAN_OUT = int(os.getenv("SUGGESTIONS_MAX_FAN_OUT", "10000"))
+# Best candidates kept per user. More than the largest suggestions page,
+# because friends and invited users are skipped when suggestions are read.
+SUGGESTIONS_PER_USER = int(os.getenv("SUGGESTIONS_PER_USER", "200"))
+
+# EVENTS
+# ------------------------------------------------------------------------------
+# The relay and the streams run in different processes, relay_events refuses
+# to start unless the broker is "apps.events.brokers.RedisBroker".
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "apps.events.brokers.InProcessBroker")
+EVENTS_KEEPALIVE = int(os.getenv("EVENTS_KEEPALIVE", "15"))
+EVENTS_QUEUE_SIZE = 100
+EVENTS_RELAY_BATCH_SIZE = int(os.getenv("EVENTS_RELAY_BATCH_SIZE", "500"))
+EVENTS_RELAY_INTERVAL = float(os.getenv("EVENTS_RELAY_INTERVAL", "0.5"))
+# Events not relayed within this many seconds are deleted by prune_events and
+# by relay_events --follow.
+EVENTS_RETENTION = int(os.getenv("EVENTS_RETENTION", "86400"))
+
+# ASYNC VIEWS
+# ------------------------------------------------------------------------------
+# Serve hot read endpoints as async views under ASGI, see apps.core.views.async_view.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+ASYNC_VIEW_THREADS = int(os.getenv("ASYNC_VIEW_THREADS", "16"))
+
 # AUTHENTICATION
 # ------------------------------------------------------------------------------
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    "apps.users.authentication.CachedModelBackend",
 ]
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 
 # PASSWORDS
 # ------------------------------------------------------------------------------
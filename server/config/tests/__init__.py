@@ -1 +1,11 @@
 from config.settings import *  # noqa F401 F403
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+# Pool threads of async views close their connections after every request,
+# so none of them is left open when the test database is dropped.
+DATABASES["default"]["CONN_MAX_AGE"] = 0  # noqa F405
@@ -1,14 +1,27 @@
 import pytest
+from django.core.cache import cache
 from rest_framework import test
 
 from apps.users.factories import UserFactory
 
+# Queries a read endpoint may run. Writes that make or break friendships
+# declare their own budgets next to their tests.
+QUERY_BUDGET = 8
+
 
 @pytest.fixture(autouse=True)
 def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached users must not outlive the test database rows."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(django_db_setup, django_db_blocker):
     """Module-level fixture for user."""
@@ -22,3 +35,11 @@ def user(django_db_setup, django_db_blocker):
 def api_client() -> test.APIClient:
     """Create api client."""
     return test.APIClient()
+
+
+@pytest.fixture
+def assert_query_budget(django_assert_max_num_queries):
+    """Fail the test if the wrapped block runs more queries than the budget."""
+    def _assert_query_budget(budget: int = QUERY_BUDGET):
+        return django_assert_max_num_queries(budget)
+    return _assert_query_budget
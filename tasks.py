@@ -1,8 +1,9 @@
 from invoke import Collection
 
-from provision import django, docker, git, linters, project, tests
+from provision import benchmarks, django, docker, git, linters, project, tests
 
 ns = Collection(
+    benchmarks,
     django,
     docker,
     linters,